@@ -0,0 +1,10 @@
+"""
+Benchmarks for the TariffIQ tariff and peak hot paths.
+
+Runs offline against synthetic statistics and a stubbed recorder, no Home
+Assistant instance is needed, only the packages in requirements.txt.
+
+    python -m benchmarks                      # run and print timings
+    python -m benchmarks --save base.json     # store a baseline
+    python -m benchmarks --compare base.json  # compare against a baseline
+"""
@@ -0,0 +1,51 @@
+"""Run the TariffIQ benchmarks."""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+from benchmarks import runner
+from benchmarks.cases import BENCHMARK_GROUPS
+from benchmarks.recorder import TIME_ZONE
+
+
+def main() -> int:
+    """Run the benchmarks, optionally saving or comparing a baseline."""
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument("--save", type=Path, help="write the results as a baseline")
+    parser.add_argument("--compare", type=Path, help="compare against a baseline")
+    parser.add_argument(
+        "--filter", default="", help="only run benchmarks whose name contains this"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=None,
+        help="median ratio reported as a regression",
+    )
+    args = parser.parse_args()
+
+    # Same host timezone as the Home Assistant one, like a typical install
+    os.environ["TZ"] = TIME_ZONE
+    time.tzset()
+
+    results = runner.run(BENCHMARK_GROUPS, args.filter)
+
+    if args.save:
+        runner.save_baseline(args.save, results)
+        print(f"\nBaseline written to {args.save}")
+
+    if args.compare:
+        threshold = args.threshold or runner.REGRESSION_THRESHOLD
+        if runner.compare_baseline(args.compare, results, threshold):
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+"""The benchmarked operations."""
+
+from __future__ import annotations
+
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+from homeassistant.util import dt as dt_util
+
+from benchmarks.fixtures import FIXTURE_SIZES, synthetic_statistics
+from benchmarks.recorder import TIME_ZONE, create_coordinator, stubbed_home_assistant
+from benchmarks.runner import Benchmark
+from custom_components.tariffiq.dso import (
+    get_available_dsos,
+    get_dso_class,
+    get_dso_fuse_sizes,
+)
+from custom_components.tariffiq.dso.backtest import (
+    BacktestSeries,
+    backtest,
+    backtest_series,
+)
+from custom_components.tariffiq.dso.helpers.columnar import NUMPY_AVAILABLE
+from custom_components.tariffiq.dso.helpers.hourly_series import HourlySeries
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+
+# One DSO of each pricing model
+HOURS_MODEL_DSO = "Kungälv Energi - Standard"
+DAYS_MODEL_DSO = "Ellevio Hus"
+
+# Fixed moment for the schedule lookups, a winter weekday evening
+SCHEDULE_TIME = datetime(2025, 1, 15, 20, 30, tzinfo=dt_util.get_time_zone(TIME_ZONE))
+
+
+def _fixtures() -> dict[str, HourlySeries]:
+    """Return the statistics fixture of each size, as the recorder helper does."""
+    return {
+        size: HourlySeries.from_rows(synthetic_statistics(hours))
+        for size, hours in FIXTURE_SIZES.items()
+    }
+
+
+def _series_benchmarks() -> list[Benchmark]:
+    """Return the benchmarks of turning recorder rows into a series."""
+    benchmarks = []
+    for size, hours in FIXTURE_SIZES.items():
+        rows = synthetic_statistics(hours)
+        benchmarks.append(
+            Benchmark(
+                f"hourly_series.from_rows[{size}]",
+                lambda rows=rows: HourlySeries.from_rows(rows),
+            )
+        )
+    return benchmarks
+
+
+def _model_benchmarks(fixtures: dict[str, HourlySeries]) -> list[Benchmark]:
+    """Return the peak model benchmarks for every fixture size."""
+    hours_dso = get_dso_class(HOURS_MODEL_DSO)
+    days_dso = get_dso_class(DAYS_MODEL_DSO)
+
+    benchmarks = []
+    for size, rows in fixtures.items():
+        # The two ways the models narrow rows down to the scheduled ones
+        if NUMPY_AVAILABLE:
+            benchmarks.append(
+                Benchmark(
+                    f"peak_candidates[{size}]",
+                    lambda rows=rows: hours_dso._peak_candidates(rows),  # noqa: SLF001
+                )
+            )
+        benchmarks += [
+            Benchmark(
+                f"filter_scheduled_statistics[{size}]",
+                lambda rows=rows: hours_dso._filter_scheduled_statistics(  # noqa: SLF001
+                    rows
+                ),
+            ),
+            Benchmark(
+                f"hours_model.peak_value[{size}]",
+                lambda rows=rows: hours_dso.peak_value(rows),
+            ),
+            Benchmark(
+                f"hours_model.observed_peak[{size}]",
+                lambda rows=rows: hours_dso.observed_peak(rows),
+            ),
+            Benchmark(
+                f"days_model.peak_value[{size}]",
+                lambda rows=rows: days_dso.peak_value(rows),
+            ),
+            Benchmark(
+                f"days_model.observed_peak[{size}]",
+                lambda rows=rows: days_dso.observed_peak(rows),
+            ),
+        ]
+
+    # A tick adds the hour that closed since the previous one
+    month = fixtures["month"]
+    for label, dso_class in (("hours", hours_dso), ("days", days_dso)):
+        tracker = dso_class.create_peak_tracker()
+        dso_class.track_statistics(tracker, month[:-1])
+        benchmarks.append(
+            Benchmark(
+                f"peak_tracker.add_hour[{label}]",
+                lambda dso_class=dso_class, tracker=tracker: (
+                    dso_class.track_statistics(tracker, month[-1:])
+                ),
+            )
+        )
+    return benchmarks
+
+
+def _schedule_benchmarks() -> list[Benchmark]:
+    """Return the schedule and fixed cost benchmarks."""
+    benchmarks = []
+    for label, dso_name in (("hours", HOURS_MODEL_DSO), ("days", DAYS_MODEL_DSO)):
+        dso_class = get_dso_class(dso_name)
+        schedule = dso_class.current_schedule(SCHEDULE_TIME)
+        dso = dso_class(get_dso_fuse_sizes(dso_name)[0])
+        benchmarks += [
+            Benchmark(
+                f"schedule.starts_at[{label}]",
+                lambda schedule=schedule: schedule.starts_at(SCHEDULE_TIME),
+            ),
+            Benchmark(
+                f"schedule.ends_at[{label}]",
+                lambda schedule=schedule: schedule.ends_at(SCHEDULE_TIME),
+            ),
+            Benchmark(
+                f"schedule.active_timepattern[{label}]",
+                lambda schedule=schedule: schedule.active_timepattern(SCHEDULE_TIME),
+            ),
+            Benchmark(f"dso.fixed_cost[{label}]", dso.fixed_cost),
+        ]
+    return benchmarks
+
+
+def _backtest_benchmarks(fixtures: dict[str, HourlySeries]) -> list[Benchmark]:
+    """Return the backtest and comparison benchmarks."""
+    dso_name = DAYS_MODEL_DSO
+    dso = get_dso_class(dso_name)(get_dso_fuse_sizes(dso_name)[0])
+    candidates = [
+        get_dso_class(name)(fuse_size)
+        for name in get_available_dsos()
+        for fuse_size in get_dso_fuse_sizes(name)
+    ]
+
+    def compare(rows: HourlySeries) -> None:
+        series = BacktestSeries(rows)
+        for candidate in candidates:
+            backtest_series(candidate, series)
+
+    return [
+        Benchmark("backtest[year]", lambda: backtest(dso, fixtures["year"])),
+        Benchmark(
+            "backtest[multi_year]", lambda: backtest(dso, fixtures["multi_year"])
+        ),
+        Benchmark("compare[year]", lambda: compare(fixtures["year"])),
+    ]
+
+
+@asynccontextmanager
+async def offline_benchmarks() -> AsyncIterator[list[Benchmark]]:
+    """Yield the benchmarks that need no Home Assistant core."""
+    dt_util.set_default_time_zone(dt_util.get_time_zone(TIME_ZONE))
+    fixtures = _fixtures()
+    yield (
+        _series_benchmarks()
+        + _model_benchmarks(fixtures)
+        + _schedule_benchmarks()
+        + _backtest_benchmarks(fixtures)
+    )
+
+
+@asynccontextmanager
+async def coordinator_benchmarks() -> AsyncIterator[list[Benchmark]]:
+    """
+    Yield full coordinator ticks against a stubbed recorder.
+
+    A cold tick fetches and tracks the whole month, a warm tick only the
+    hours the month cache reconciles.
+    """
+    rows = synthetic_statistics(FIXTURE_SIZES["year"])
+    async with stubbed_home_assistant(rows) as (hass, _recorder):
+        benchmarks = []
+        for label, dso_name in (("hours", HOURS_MODEL_DSO), ("days", DAYS_MODEL_DSO)):
+            coordinator = create_coordinator(
+                hass, dso_name, get_dso_fuse_sizes(dso_name)[0]
+            )
+
+            async def cold_tick(coordinator=coordinator) -> None:  # noqa: ANN001
+                coordinator.month_statistics.clear()
+                await coordinator._async_update_data()  # noqa: SLF001
+
+            async def warm_tick(coordinator=coordinator) -> None:  # noqa: ANN001
+                await coordinator._async_update_data()  # noqa: SLF001
+
+            benchmarks += [
+                Benchmark(f"coordinator.tick_cold[{label}]", cold_tick),
+                Benchmark(f"coordinator.tick_warm[{label}]", warm_tick),
+            ]
+        yield benchmarks
+
+
+BENCHMARK_GROUPS = [offline_benchmarks, coordinator_benchmarks]
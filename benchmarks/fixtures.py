@@ -0,0 +1,68 @@
+"""Synthetic hourly statistics for the benchmarks."""
+
+from __future__ import annotations
+
+import random
+from datetime import UTC, datetime, timedelta
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from homeassistant.components.recorder.statistics import StatisticsRow
+
+HOURS_PER_MONTH = 31 * 24
+HOURS_PER_YEAR = 365 * 24
+
+# Fixture sizes in hours
+FIXTURE_SIZES = {
+    "month": HOURS_PER_MONTH,
+    "year": HOURS_PER_YEAR,
+    "multi_year": 3 * HOURS_PER_YEAR,
+}
+
+SEED = 20240101
+
+
+def synthetic_statistics(
+    hours: int, end: datetime | None = None, seed: int = SEED
+) -> list[StatisticsRow]:
+    """
+    Return reproducible hourly energy statistics.
+
+    Consumption follows a daily profile with random noise, occasional high
+    hours and a few hours without data, like a house with an electric car.
+
+    Args:
+        hours: Number of hourly rows
+        end: End of the last row, default the start of the current hour
+        seed: Seed of the random generator
+
+    Returns:
+        Rows sorted by start with start, end, change, state and sum
+
+    """
+    if end is None:
+        end = datetime.now(UTC).replace(minute=0, second=0, microsecond=0)
+    first = end - timedelta(hours=hours)
+    rng = random.Random(seed)
+
+    rows: list[StatisticsRow] = []
+    total = 10000.0
+    for index in range(hours):
+        start = (first + timedelta(hours=index)).timestamp()
+        hour = (index + first.hour) % 24
+        change: float | None = 0.3 + 0.4 * (7 <= hour <= 21) + rng.random() * 0.8
+        if rng.random() < 0.02:
+            change = (change or 0.0) + rng.uniform(2.0, 6.0)  # Car charging
+        if rng.random() < 0.005:
+            change = None  # Missing hour
+        total += change or 0.0
+        rows.append(
+            {
+                "start": start,
+                "end": start + 3600,
+                "change": change,
+                "state": total,
+                "sum": total,
+            }
+        )
+    return rows
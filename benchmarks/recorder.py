@@ -0,0 +1,152 @@
+"""Stubbed recorder and a bare Home Assistant core for the coordinator tick."""
+
+from __future__ import annotations
+
+import inspect
+import tempfile
+from bisect import bisect_left
+from contextlib import asynccontextmanager
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any
+
+from homeassistant import config_entries
+from homeassistant.core import HomeAssistant
+
+from custom_components.tariffiq.const import (
+    CONF_DSO_AND_MODEL,
+    CONF_ENERGY_SENSOR,
+    CONF_FUSE_SIZE,
+    CONF_NAME,
+    CONF_POWER_SENSOR,
+    CONF_PRICING_ENTITY,
+    DOMAIN,
+    NONE,
+)
+from custom_components.tariffiq.coordinator import TariffIQDataCoordinator
+from custom_components.tariffiq.helpers import statistics as statistics_module
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Callable
+    from datetime import datetime
+
+    from homeassistant.components.recorder.statistics import StatisticsRow
+
+ENERGY_SENSOR = "sensor.benchmark_energy"
+POWER_SENSOR = "sensor.benchmark_power"
+TIME_ZONE = "Europe/Stockholm"
+
+
+class StubRecorder:
+    """Recorder stand-in serving statistics from an in-memory series."""
+
+    def __init__(self, hass: HomeAssistant, rows: list[StatisticsRow]) -> None:
+        """Initialize the recorder with the rows of every statistic id."""
+        self.hass = hass
+        self.rows = rows
+        self.queries = 0
+
+    async def async_add_executor_job(self, target: Callable, *args: Any) -> Any:
+        """Run a job in the executor like the recorder does."""
+        return await self.hass.loop.run_in_executor(None, target, *args)
+
+    def statistics_during_period(
+        self,
+        _hass: HomeAssistant,
+        start_time: datetime | None,
+        end_time: datetime | None,
+        statistic_ids: set[str],
+        _period: str,
+        _units: dict[str, str] | None,
+        types: set[str],
+    ) -> dict[str, list[StatisticsRow]]:
+        """Return the rows within the window with only the requested types."""
+        self.queries += 1
+        first = (
+            bisect_left(self.rows, start_time.timestamp(), key=lambda r: r["start"])
+            if start_time is not None
+            else 0
+        )
+        end = (
+            bisect_left(self.rows, end_time.timestamp(), key=lambda r: r["start"])
+            if end_time is not None
+            else len(self.rows)
+        )
+        keys = {"start", "end", *types}
+        rows = [
+            {key: value for key, value in row.items() if key in keys}
+            for row in self.rows[first:end]
+        ]
+        return dict.fromkeys(statistic_ids, rows)
+
+
+def _config_entry(dso_name: str, fuse_size: str) -> config_entries.ConfigEntry:
+    """Return a config entry, passing only the arguments this core accepts."""
+    arguments = {
+        "data": {
+            CONF_NAME: "Benchmark",
+            CONF_DSO_AND_MODEL: dso_name,
+            CONF_FUSE_SIZE: fuse_size,
+            CONF_ENERGY_SENSOR: ENERGY_SENSOR,
+            CONF_POWER_SENSOR: POWER_SENSOR,
+            CONF_PRICING_ENTITY: NONE,
+        },
+        "discovery_keys": MappingProxyType({}),
+        "domain": DOMAIN,
+        "minor_version": 1,
+        "options": {},
+        "source": config_entries.SOURCE_USER,
+        "subentries_data": None,
+        "title": "Benchmark",
+        "unique_id": None,
+        "version": 1,
+    }
+    accepted = inspect.signature(config_entries.ConfigEntry).parameters
+    return config_entries.ConfigEntry(
+        **{key: value for key, value in arguments.items() if key in accepted}
+    )
+
+
+@asynccontextmanager
+async def stubbed_home_assistant(
+    rows: list[StatisticsRow],
+) -> AsyncIterator[tuple[HomeAssistant, StubRecorder]]:
+    """
+    Yield a bare Home Assistant core whose recorder serves rows.
+
+    The energy and power sensors are set from the last row, and the batching
+    delay of the statistics broker is removed so a tick is not padded by it.
+    """
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        await hass.config.async_set_time_zone(TIME_ZONE)
+        recorder = StubRecorder(hass, rows)
+
+        patched = {
+            "get_instance": lambda _hass: recorder,
+            "statistics_during_period": recorder.statistics_during_period,
+            "STATISTICS_BATCH_DELAY": 0,
+        }
+        originals = {name: getattr(statistics_module, name) for name in patched}
+        for name, value in patched.items():
+            setattr(statistics_module, name, value)
+
+        hass.states.async_set(ENERGY_SENSOR, str(rows[-1]["state"] + 0.4))
+        hass.states.async_set(POWER_SENSOR, "2300")
+        try:
+            yield hass, recorder
+        finally:
+            for name, value in originals.items():
+                setattr(statistics_module, name, value)
+            await hass.async_stop(force=True)
+
+
+def create_coordinator(
+    hass: HomeAssistant, dso_name: str, fuse_size: str
+) -> TariffIQDataCoordinator:
+    """Create a coordinator for a DSO as config entry setup would."""
+    entry = _config_entry(dso_name, fuse_size)
+    token = config_entries.current_entry.set(entry)
+    try:
+        return TariffIQDataCoordinator(hass, entry)
+    finally:
+        config_entries.current_entry.reset(token)
@@ -0,0 +1,195 @@
+"""Timing, memory measurement and baselines for the benchmarks."""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+    from contextlib import AbstractAsyncContextManager
+    from pathlib import Path
+
+# Each measurement runs the operation for at least this long
+MIN_MEASUREMENT_TIME = 0.2
+REPEATS = 5
+# A median this much slower than the baseline is reported as a regression
+REGRESSION_THRESHOLD = 1.25
+
+
+@dataclass(frozen=True, slots=True)
+class Benchmark:
+    """An operation to measure, sync or async."""
+
+    name: str
+    operation: Callable[[], Any] | Callable[[], Awaitable[Any]]
+
+
+@dataclass(frozen=True, slots=True)
+class Result:
+    """Timings per call in microseconds and peak traced memory in KiB."""
+
+    name: str
+    calls: int
+    min_us: float
+    median_us: float
+    peak_kib: float
+
+
+async def _call(operation: Callable[[], Any]) -> None:
+    """Call an operation, awaiting it when it is a coroutine function."""
+    result = operation()
+    if inspect.isawaitable(result):
+        await result
+
+
+async def _time(operation: Callable[[], Any], number: int) -> float:
+    """Return the seconds a number of calls take."""
+    start = time.perf_counter()
+    for _ in range(number):
+        await _call(operation)
+    return time.perf_counter() - start
+
+
+async def measure(benchmark: Benchmark) -> Result:
+    """Measure the time per call and the peak memory of one call."""
+    operation = benchmark.operation
+
+    # Find a call count that takes long enough to time reliably
+    number = 1
+    while (elapsed := await _time(operation, number)) < MIN_MEASUREMENT_TIME:
+        number = max(number * 2, int(number * MIN_MEASUREMENT_TIME / elapsed) + 1)
+
+    timings = [await _time(operation, number) / number for _ in range(REPEATS)]
+
+    tracemalloc.start()
+    try:
+        await _call(operation)
+        _current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return Result(
+        name=benchmark.name,
+        calls=number,
+        min_us=min(timings) * 1e6,
+        median_us=statistics.median(timings) * 1e6,
+        peak_kib=peak / 1024,
+    )
+
+
+def run(
+    groups: list[Callable[[], AbstractAsyncContextManager[list[Benchmark]]]],
+    name_filter: str = "",
+) -> list[Result]:
+    """
+    Measure groups of benchmarks and print each result as it completes.
+
+    Each group is an async context manager factory, so groups that need a
+    running event loop, like a Home Assistant core, can set it up and tear
+    it down around their benchmarks.
+
+    Args:
+        groups: Factories of the benchmark groups
+        name_filter: Only measure benchmarks whose name contains this
+
+    Returns:
+        The results in the order they were measured
+
+    """
+
+    async def _run() -> list[Result]:
+        results = []
+        for group in groups:
+            async with group() as benchmarks:
+                for benchmark in benchmarks:
+                    if name_filter not in benchmark.name:
+                        continue
+                    result = await measure(benchmark)
+                    print(format_result(result))
+                    results.append(result)
+        return results
+
+    print(f"{'benchmark':<44} {'min':>12} {'median':>12} {'peak mem':>12}")
+    return asyncio.run(_run())
+
+
+def format_result(result: Result) -> str:
+    """Return one line of the result table."""
+    return (
+        f"{result.name:<44} {result.min_us:>10.1f}us {result.median_us:>10.1f}us"
+        f" {result.peak_kib:>9.1f}KiB"
+    )
+
+
+def environment() -> dict[str, str]:
+    """Return what a baseline was measured on."""
+    try:
+        import numpy as np  # noqa: PLC0415
+
+        numpy_version = np.__version__
+    except ImportError:
+        numpy_version = "not installed"
+
+    return {
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "numpy": numpy_version,
+    }
+
+
+def save_baseline(path: Path, results: list[Result]) -> None:
+    """Write results and the environment to a baseline file."""
+    baseline = {
+        "environment": environment(),
+        "results": {result.name: asdict(result) for result in results},
+    }
+    path.write_text(json.dumps(baseline, indent=2) + "\n", encoding="utf-8")
+
+
+def compare_baseline(
+    path: Path, results: list[Result], threshold: float = REGRESSION_THRESHOLD
+) -> list[str]:
+    """
+    Print results next to a baseline and return the regressed benchmarks.
+
+    Args:
+        path: Baseline file written by save_baseline
+        results: Results of this run
+        threshold: Median ratio above which a benchmark has regressed
+
+    Returns:
+        Names of the benchmarks whose median is slower than the threshold
+
+    """
+    baseline = json.loads(path.read_text(encoding="utf-8"))
+    if baseline["environment"] != environment():
+        print(f"Baseline environment differs: {baseline['environment']}")
+
+    regressions = []
+    print(f"\n{'benchmark':<44} {'baseline':>12} {'now':>12} {'ratio':>7}")
+    for result in results:
+        previous = baseline["results"].get(result.name)
+        if previous is None:
+            print(f"{result.name:<44} {'-':>12} {result.median_us:>10.1f}us")
+            continue
+
+        ratio = result.median_us / previous["median_us"]
+        flag = ""
+        if ratio > threshold:
+            regressions.append(result.name)
+            flag = "  REGRESSION"
+        print(
+            f"{result.name:<44} {previous['median_us']:>10.1f}us"
+            f" {result.median_us:>10.1f}us {ratio:>6.2f}x{flag}"
+        )
+    return regressions
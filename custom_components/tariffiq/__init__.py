@@ -15,7 +15,9 @@ from homeassistant.helpers import config_validation as cv
 
 from custom_components.tariffiq.coordinator import TariffIQDataCoordinator
 
-from .const import DATA_HASS_CONFIG, DOMAIN
+from .const import CONF_DSO_AND_MODEL, DATA_HASS_CONFIG, DOMAIN
+from .dso import async_load_dso_class
+from .helpers.ledger import PeakLedger
 from .services import async_setup_services
 
 if TYPE_CHECKING:
@@ -46,29 +48,67 @@ async def async_setup_entry(
     config_entry: ConfigEntry,
 ) -> bool:
     """Set up TariffIQ."""
+    config_entry.async_on_unload(config_entry.add_update_listener(async_update_options))
+
+    # Import the selected DSO module outside the event loop
+    await async_load_dso_class(hass, config_entry.data[CONF_DSO_AND_MODEL])
+
+    # Create coordinator
+    coordinator = TariffIQDataCoordinator(hass, config_entry)
+    # Statistics batches wait for the refreshes of all loaded entries
+    config_entry.async_on_unload(
+        coordinator.statistics_helper.broker.async_register(config_entry.entry_id)
+    )
+
+    # With the peak ledger of the last run the entities come up at once, the
+    # first refresh then only back-fills the hours since it was saved
+    restored = await coordinator.async_restore_ledger()
+    if restored:
+        await _setup_platforms(hass, config_entry, coordinator)
+
     # Check if Home Assistant has already started
     if hass.is_running:
         # HA already started, setup coordinator immediately
-        await _setup_coordinator(hass, config_entry)
+        await _setup_coordinator(hass, config_entry, coordinator, restored=restored)
     else:
         # Wait for HA to fully start before setting up coordinator
         async def setup_on_start(_event: object) -> None:
             """Set up coordinator when HA starts."""
-            await _setup_coordinator(hass, config_entry)
+            await _setup_coordinator(hass, config_entry, coordinator, restored=restored)
 
         hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STARTED, setup_on_start)
 
     return True
 
 
-async def _setup_coordinator(hass: HomeAssistant, config_entry: ConfigEntry) -> None:
-    """Set up the coordinator and platforms."""
-    # Create coordinator
-    coordinator = TariffIQDataCoordinator(hass, config_entry)
-
+async def _setup_coordinator(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    coordinator: TariffIQDataCoordinator,
+    *,
+    restored: bool,
+) -> None:
+    """Refresh the coordinator and set up the platforms if not done already."""
     # Fetch initial data using the newer method
     await coordinator.async_refresh()
 
+    # Follow tariff boundaries and full hours with timers instead of polling
+    coordinator.async_start_schedule_timers()
+    config_entry.async_on_unload(coordinator.async_stop_schedule_timers)
+    coordinator.async_start_push_updates()
+    config_entry.async_on_unload(coordinator.async_stop_push_updates)
+    config_entry.async_on_unload(coordinator.async_stop_profiler)
+
+    if not restored:
+        await _setup_platforms(hass, config_entry, coordinator)
+
+
+async def _setup_platforms(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    coordinator: TariffIQDataCoordinator,
+) -> None:
+    """Store the coordinator and set up the platforms."""
     # Store coordinator
     hass.data.setdefault(DOMAIN, {})
     hass.data[DOMAIN][config_entry.entry_id] = coordinator
@@ -84,9 +124,18 @@ async def async_update_options(hass: HomeAssistant, config_entry: ConfigEntry) -
 
 async def async_unload_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> bool:
     """Unload a config entry."""
+    coordinator = hass.data.get(DOMAIN, {}).get(config_entry.entry_id)
+    if coordinator is not None:
+        await coordinator.async_flush_ledger()
+
     if unload_ok := await hass.config_entries.async_unload_platforms(
         config_entry, PLATFORMS
     ):
         hass.data[DOMAIN].pop(config_entry.entry_id)
 
     return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> None:
+    """Remove the peak ledger of a deleted config entry."""
+    await PeakLedger(hass, config_entry.entry_id).async_remove()
@@ -11,6 +11,7 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 
 from homeassistant.components.binary_sensor import BinarySensorEntity
+from homeassistant.core import callback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from custom_components.tariffiq.const import (
@@ -35,6 +36,8 @@ class BinarySensorBase(CoordinatorEntity[TariffIQDataCoordinator], BinarySensorE
 
     hass: HomeAssistant
     _entry: ConfigEntry
+    # Coordinator data keys the entity shows, None to write on every update
+    _coordinator_keys: frozenset[str] | None = None
 
     def __init__(
         self,
@@ -70,6 +73,12 @@ class BinarySensorBase(CoordinatorEntity[TariffIQDataCoordinator], BinarySensorE
             ),
         }
 
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state only if the data the entity shows changed."""
+        if self.coordinator.data_changed(self._coordinator_keys):
+            super()._handle_coordinator_update()
+
     @property
     def available(self) -> bool:
         """Return if entity is available."""
@@ -20,6 +20,12 @@ if TYPE_CHECKING:
 class TariffIQTariffActiveBinarySensor(BinarySensorBase):
     """Tariff active binary sensor."""
 
+    _coordinator_keys = frozenset(
+        {"tariff_active", "tariff_starts_at", "tariff_ends_at", "tariff_schedule"}
+    )
+    # The schedule only changes with a new tariff version
+    _unrecorded_attributes = frozenset({"schedule"})
+
     def __init__(
         self,
         entry: ConfigEntry,
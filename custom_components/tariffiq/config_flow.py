@@ -6,7 +6,13 @@ import secrets
 from typing import Any
 
 import voluptuous as vol
-from homeassistant.config_entries import ConfigFlow, ConfigFlowResult
+from homeassistant.config_entries import (
+    ConfigEntry,
+    ConfigFlow,
+    ConfigFlowResult,
+    OptionsFlow,
+)
+from homeassistant.core import callback
 from homeassistant.helpers import selector, template
 
 from .const import (
@@ -15,11 +21,15 @@ from .const import (
     CONF_FUSE_SIZE,
     CONF_NAME,
     CONF_POWER_SENSOR,
+    CONF_PUSH_DEBOUNCE,
+    CONF_PUSH_UPDATES,
+    CONF_TIMING_SENSORS,
+    DEFAULT_PUSH_DEBOUNCE,
     DOMAIN,
     NONE,
     PRICING_INTEGRATIONS,
 )
-from .dso import get_available_dsos, get_dso_fuse_sizes
+from .dso import async_get_dso_index, get_available_dsos, get_dso_fuse_sizes
 from .helpers import LOGGER
 
 
@@ -30,6 +40,12 @@ class TariffIQConfigFlow(ConfigFlow, domain=DOMAIN):
     data: dict[str, Any] = {}  # noqa: RUF012
     options: dict[str, Any] = {}  # noqa: RUF012
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: ConfigEntry) -> TariffIQOptionsFlow:  # noqa: ARG004
+        """Get the options flow for this handler."""
+        return TariffIQOptionsFlow()
+
     def _get_pricing_entities(self) -> list[str]:
         """Get pricing entities for the config flow."""
         _pricing_entities = [NONE]
@@ -65,6 +81,7 @@ class TariffIQConfigFlow(ConfigFlow, domain=DOMAIN):
         default_name = f"TariffIQ_{secrets.token_hex(4)}"
 
         # Get available DSOs from registry
+        await async_get_dso_index(self.hass)
         available_dsos = sorted(get_available_dsos())
 
         _schema = vol.Schema(
@@ -114,6 +131,7 @@ class TariffIQConfigFlow(ConfigFlow, domain=DOMAIN):
         _errors: dict[str, str] = {}
 
         # Get available fuse sizes for the selected DSO and model
+        await async_get_dso_index(self.hass)
         available_fuses = get_dso_fuse_sizes(self.data[CONF_DSO_AND_MODEL])
 
         _schema = vol.Schema(
@@ -233,3 +251,43 @@ class TariffIQConfigFlow(ConfigFlow, domain=DOMAIN):
             errors=_errors,
             last_step=True,
         )
+
+
+class TariffIQOptionsFlow(OptionsFlow):
+    """Options flow for TariffIQ."""
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Manage the options."""
+        if user_input is not None:
+            return self.async_create_entry(data=user_input)
+
+        _schema = vol.Schema(
+            {
+                vol.Required(
+                    CONF_PUSH_UPDATES,
+                    default=self.config_entry.options.get(CONF_PUSH_UPDATES, False),
+                ): selector.BooleanSelector(),
+                vol.Required(
+                    CONF_PUSH_DEBOUNCE,
+                    default=self.config_entry.options.get(
+                        CONF_PUSH_DEBOUNCE, DEFAULT_PUSH_DEBOUNCE
+                    ),
+                ): selector.NumberSelector(
+                    selector.NumberSelectorConfig(
+                        min=1,
+                        max=300,
+                        step=1,
+                        unit_of_measurement="s",
+                        mode=selector.NumberSelectorMode.BOX,
+                    )
+                ),
+                vol.Required(
+                    CONF_TIMING_SENSORS,
+                    default=self.config_entry.options.get(CONF_TIMING_SENSORS, False),
+                ): selector.BooleanSelector(),
+            }
+        )
+
+        return self.async_show_form(step_id="init", data_schema=_schema)
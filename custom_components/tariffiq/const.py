@@ -5,6 +5,7 @@ from logging import Logger, getLogger
 LOGGER: Logger = getLogger(__package__)
 
 DATA_HASS_CONFIG = "tariffiq_hass_config"
+DATA_STATISTICS_BROKER = "tariffiq_statistics_broker"
 DOMAIN = "tariffiq"
 ATTRIBUTION = "Data provided by http://jsonplaceholder.typicode.com/"
 
@@ -28,3 +29,19 @@ CONF_ENERGY_SENSOR = "energy_sensor"
 CONF_DSO_AND_MODEL = "dso_and_model"
 CONF_FUSE_SIZE = "fuse_size"
 CONF_PRICING_ENTITY = "pricing_entity"
+
+# Options flow constants
+CONF_PUSH_UPDATES = "push_updates"
+CONF_PUSH_DEBOUNCE = "push_debounce"
+DEFAULT_PUSH_DEBOUNCE = 10  # seconds
+CONF_TIMING_SENSORS = "timing_sensors"
+
+# Services
+SERVICE_BACKTEST = "backtest"
+SERVICE_COMPARE = "compare"
+SERVICE_PROFILE = "profile"
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_START = "start"
+ATTR_END = "end"
+ATTR_REFRESHES = "refreshes"
+ATTR_BETWEEN_REFRESHES = "between_refreshes"
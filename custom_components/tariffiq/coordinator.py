@@ -2,16 +2,49 @@
 
 from __future__ import annotations
 
-from datetime import timedelta
+import asyncio
+from contextlib import contextmanager
+from datetime import UTC, datetime, timedelta
+from time import perf_counter
 from typing import TYPE_CHECKING, Any
 
 from homeassistant.const import (
     UnitOfEnergy,
+    UnitOfPower,
+)
+from homeassistant.core import callback
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.event import (
+    async_track_point_in_time,
+    async_track_state_change_event,
+    async_track_time_change,
 )
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 from homeassistant.util import dt as dt_util
 
-from custom_components.tariffiq.helpers.statistics import TariffIQStatisticsHelper
+from custom_components.tariffiq.dso.helpers.local_calendar import SECONDS_PER_HOUR
+from custom_components.tariffiq.dso.helpers.quarter_hours import (
+    QUARTER_HOUR_SECONDS,
+    SHORT_TERM_SECONDS,
+    QuarterHourBuffer,
+)
+from custom_components.tariffiq.helpers.ledger import PeakLedger
+from custom_components.tariffiq.helpers.profiler import RefreshProfiler
+from custom_components.tariffiq.helpers.statistics import (
+    TariffIQStatisticsCache,
+    TariffIQStatisticsHelper,
+)
+from custom_components.tariffiq.helpers.timings import (
+    STAGE_COST,
+    STAGE_ENTITY_UPDATE,
+    STAGE_LOOP_BLOCKED,
+    STAGE_MODEL,
+    STAGE_RECORDER_FETCH,
+    STAGE_SENSOR_READ,
+    STAGE_TOTAL,
+    RefreshTimer,
+    RefreshTimings,
+)
 
 from .const import (
     CONF_DSO_AND_MODEL,
@@ -19,18 +52,37 @@ from .const import (
     CONF_FUSE_SIZE,
     CONF_NAME,
     CONF_POWER_SENSOR,
+    CONF_PUSH_DEBOUNCE,
+    CONF_PUSH_UPDATES,
+    DEFAULT_PUSH_DEBOUNCE,
 )
 from .dso import get_dso_class
-from .helpers import LOGGER
+from .helpers import LOGGER, nametoid
 
 if TYPE_CHECKING:
-    from homeassistant.components.recorder.statistics import (
-        StatisticsRow,
-    )
+    from collections.abc import Callable, Iterator
+
+    from homeassistant.components.recorder.statistics import StatisticsRow
     from homeassistant.config_entries import ConfigEntry
-    from homeassistant.core import HomeAssistant
+    from homeassistant.core import Event, EventStateChangedData, HomeAssistant, State
 
     from custom_components.tariffiq.dso.dsobase import DSOBase
+    from custom_components.tariffiq.dso.helpers.hourly_series import HourlySeries
+
+# Second past every full hour when peaks are refreshed. The recorder compiles
+# the statistics of the hour that just closed a few seconds after the hour.
+HOURLY_REFRESH_SECOND = 30
+
+# Peak model updates estimated to block the event loop longer than this many
+# seconds run in the executor instead
+MODEL_INLINE_BUDGET = 0.005
+# Seconds per row assumed until an update has been measured
+DEFAULT_MODEL_ROW_COST = 5e-6
+# Fewest rows an update needs to refine the per row cost
+MODEL_COST_MIN_ROWS = 24
+
+# Seconds after its end a quarter-hour still missing 5-minute rows is completed
+QUARTER_HOUR_CLOSE_DELAY = QUARTER_HOUR_SECONDS
 
 
 class TariffIQDataCoordinator(DataUpdateCoordinator):
@@ -39,17 +91,62 @@ class TariffIQDataCoordinator(DataUpdateCoordinator):
     entry: ConfigEntry
     dso_instance: DSOBase
     statistics_helper: TariffIQStatisticsHelper
+    month_statistics: TariffIQStatisticsCache
+    quarter_hours: QuarterHourBuffer | None
+    timings: RefreshTimings
+    profiler: RefreshProfiler | None
+    ledger: PeakLedger
+    changed_keys: set[str] | None
+    _published_data: dict[str, Any] | None
+    _published_success: bool
+    _model_row_cost: float
+    _ledger_last_start: float | None
+    _schedule_data: dict[str, Any] | None
+    _next_boundary: datetime | None
+    _unsub_boundary: Callable[[], None] | None
+    _unsub_hourly: Callable[[], None] | None
+    push_updates: bool
+    _unsub_push: Callable[[], None] | None
+    _push_debouncer: Debouncer | None
+    _hour_start: datetime | None
+    _hour_consumption: float
+    _energy_value: float | None
+    _power_value: float
 
     def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
         """Initialize the coordinator."""
+        self.push_updates = entry.options.get(CONF_PUSH_UPDATES, False)
+
         super().__init__(
             hass,
             LOGGER,
             name="TariffIQ",
-            update_interval=timedelta(minutes=5),
+            # With push updates the sensors and timers drive all refreshes
+            update_interval=None if self.push_updates else timedelta(minutes=5),
         )
         self.entry = entry
-        self.statistics_helper = TariffIQStatisticsHelper(hass)
+        self.statistics_helper = TariffIQStatisticsHelper(hass, entry.entry_id)
+        self.month_statistics = TariffIQStatisticsCache(
+            self.statistics_helper, self.entry.data[CONF_ENERGY_SENSOR]
+        )
+        self.timings = RefreshTimings()
+        self.profiler = None
+        self.ledger = PeakLedger(hass, entry.entry_id)
+        self._ledger_last_start = None
+        self.changed_keys = None
+        self._published_data = None
+        self._published_success = False
+        self._model_row_cost = DEFAULT_MODEL_ROW_COST
+        self._schedule_data = None
+        self._next_boundary = None
+        self._unsub_boundary = None
+        self._unsub_hourly = None
+        self._unsub_push = None
+        self._push_debouncer = None
+        self._hour_start = None
+        self._hour_consumption = 0.0
+        self._energy_value = None
+        self._power_value = 0.0
 
         try:
             # Initialize DSO class instance
@@ -64,6 +161,10 @@ class TariffIQDataCoordinator(DataUpdateCoordinator):
             LOGGER.error("Error initializing DSO instance: %s", error)
             raise
 
+        self.quarter_hours = (
+            QuarterHourBuffer() if self.dso_instance.tracks_quarter_hours else None
+        )
+
     def _get_energy_sensor_value(self) -> float:
         """Fetch and validate energy sensor value."""
         energy_sensor_entity_id = self.entry.data[CONF_ENERGY_SENSOR]
@@ -115,78 +216,473 @@ class TariffIQDataCoordinator(DataUpdateCoordinator):
             return 0
 
     async def _get_energy_statistics_for_current_month(
-        self,
-    ) -> list[StatisticsRow]:
-        """Fetch energy statistics for the past day."""
+        self, now: datetime
+    ) -> HourlySeries:
+        """Fetch energy statistics for the current month."""
+        return await self.month_statistics.async_get_month(now)
+
+    async def async_get_energy_statistics(
+        self, start_date: datetime, end_date: datetime | None = None
+    ) -> HourlySeries:
+        """Fetch hourly energy statistics of the energy sensor for a period."""
         return await self.statistics_helper.get_hourly_stats(
-            self.entry.data[CONF_ENERGY_SENSOR],
-            dt_util.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0),
-            None,
+            self.entry.data[CONF_ENERGY_SENSOR], start_date, end_date
         )
 
-    async def _get_energy_statistics_12_months(self) -> list[StatisticsRow]:
-        """Fetch energy statistics for the past 12 months."""
-        return await self.statistics_helper.get_hourly_stats(
-            self.entry.data[CONF_ENERGY_SENSOR],
-            dt_util.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-            - timedelta(days=365),
-            None,
+    def _period_start(self) -> datetime:
+        """Return the start of the current peak period, an hour or a quarter-hour."""
+        now = dt_util.now()
+        minutes = 60 // self.dso_instance.peak_periods_per_hour
+        return now.replace(
+            minute=now.minute - now.minute % minutes, second=0, microsecond=0
         )
 
-    async def _get_current_hour_consumption(self) -> float:
-        # Fetch current hour consumption from recorder statistics
-        return self._get_energy_sensor_value() - (
-            await self.statistics_helper.get_latest(self.entry.data[CONF_ENERGY_SENSOR])
-            or 0.0
+    def _get_current_hour_consumption(self, energy_value: float) -> float:
+        """
+        Return consumption in the current peak period.
+
+        The period is the hour, or the quarter-hour for quarter-hour models,
+        measured from the latest meter reading in the statistics.
+        """
+        hour_start = self._period_start()
+        buffer = self.quarter_hours
+        if buffer is not None:
+            # The latest reading comes with the 5-minute rows
+            reading, compiled_until = buffer.reading, buffer.reading_until
+            earlier = buffer.open_energy(hour_start.timestamp())
+        else:
+            # The latest reading comes with the month statistics fetch
+            latest_start = self.month_statistics.latest_start
+            reading = self.month_statistics.latest_state
+            compiled_until = (
+                latest_start + SECONDS_PER_HOUR if latest_start is not None else None
+            )
+            earlier = 0.0
+
+        if (
+            self.push_updates
+            and self._hour_start == hour_start
+            and (compiled_until or 0.0) < hour_start.timestamp()
+        ):
+            # The recorder has not compiled the closed period yet, keep counting
+            return self._hour_consumption
+
+        consumption = energy_value - (reading or 0.0) + earlier
+        self._hour_start = hour_start
+        self._hour_consumption = consumption
+        self._energy_value = energy_value
+        return consumption
+
+    @callback
+    def async_start_push_updates(self) -> None:
+        """Follow the energy and power sensors if push updates are enabled."""
+        if not self.push_updates:
+            return
+
+        self._push_debouncer = Debouncer(
+            self.hass,
+            LOGGER,
+            cooldown=self.entry.options.get(CONF_PUSH_DEBOUNCE, DEFAULT_PUSH_DEBOUNCE),
+            immediate=False,
+            function=self._async_push_update,
+        )
+        self._unsub_push = async_track_state_change_event(
+            self.hass,
+            [self.entry.data[CONF_ENERGY_SENSOR], self.entry.data[CONF_POWER_SENSOR]],
+            self._async_handle_sensor_event,
         )
 
-    async def _async_update_data(self) -> dict[str, Any]:
-        """Fetch data from the DSO."""
+    @callback
+    def async_stop_push_updates(self) -> None:
+        """Stop following the energy and power sensors."""
+        if self._unsub_push is not None:
+            self._unsub_push()
+            self._unsub_push = None
+        if self._push_debouncer is not None:
+            self._push_debouncer.async_shutdown()
+            self._push_debouncer = None
+
+    @staticmethod
+    def _state_value(state: State | None) -> float | None:
+        """Return the numeric value of a sensor state, None if invalid."""
+        if state is None:
+            return None
         try:
-            LOGGER.debug(
-                "Fetching data from DSO instance %s, %s",
-                self.entry.data[CONF_NAME],
-                self.entry.entry_id,
+            return float(state.state)
+        except (ValueError, TypeError):
+            return None
+
+    @callback
+    def _async_handle_sensor_event(self, event: Event[EventStateChangedData]) -> None:
+        """Accumulate the consumption of the current period from sensor changes."""
+        value = self._state_value(event.data["new_state"])
+        if value is None:
+            return
+
+        if event.data["entity_id"] == self.entry.data[CONF_POWER_SENSOR]:
+            self._power_value = value
+        else:
+            hour_start = self._period_start()
+            if hour_start != self._hour_start:
+                # A new period started, the recorder is read at the next refresh
+                self._hour_start = hour_start
+                self._hour_consumption = 0.0
+            if self._energy_value is not None and value >= self._energy_value:
+                self._hour_consumption += value - self._energy_value
+            self._energy_value = value
+
+        if self._push_debouncer is not None:
+            self._push_debouncer.async_schedule_call()
+
+    async def _async_push_update(self) -> None:
+        """Publish the consumption derived data after sensor changes."""
+        if self.data is None:
+            return
+
+        with self._profile_between_refreshes():
+            self.async_set_updated_data(
+                {
+                    **self.data,
+                    **self._get_consumption_data(
+                        self._hour_consumption, self._power_value
+                    ),
+                }
             )
 
-            # Fetch energy sensor value
-            energy_value = self._get_energy_sensor_value()
-            power_value = self._get_power_sensor_value()
+    @callback
+    def async_start_schedule_timers(self) -> None:
+        """Start the timers for tariff boundaries and hourly peak refreshes."""
+        self._unsub_hourly = async_track_time_change(
+            self.hass,
+            self._async_hourly_refresh,
+            # Quarter-hour peaks are refreshed after every quarter-hour
+            minute="/15" if self.quarter_hours is not None else 0,
+            second=HOURLY_REFRESH_SECOND,
+        )
+        self._schedule_boundary_timer()
+
+    @callback
+    def async_stop_schedule_timers(self) -> None:
+        """Stop the timers for tariff boundaries and hourly peak refreshes."""
+        if self._unsub_hourly is not None:
+            self._unsub_hourly()
+            self._unsub_hourly = None
+        if self._unsub_boundary is not None:
+            self._unsub_boundary()
+            self._unsub_boundary = None
+
+    @callback
+    def _schedule_boundary_timer(self) -> None:
+        """Schedule a one-shot timer at the next tariff start or end."""
+        if self._unsub_boundary is not None:
+            self._unsub_boundary()
+            self._unsub_boundary = None
+
+        if self._next_boundary is not None:
+            self._unsub_boundary = async_track_point_in_time(
+                self.hass, self._async_handle_boundary, self._next_boundary
+            )
+
+    @callback
+    def _async_handle_boundary(self, _now: datetime) -> None:
+        """Update the schedule derived data when a tariff starts or ends."""
+        self._unsub_boundary = None
+        self._schedule_data = None
+
+        if self.data is None:
+            self._get_schedule_data()
+            return
+
+        LOGGER.debug("Tariff boundary reached for %s", self.entry.data[CONF_NAME])
+        with self._profile_between_refreshes():
+            self.async_set_updated_data(
+                {
+                    **self.data,
+                    **self._get_schedule_data(),
+                    **self._get_consumption_data(
+                        self.data["current_hour_consumption"], self.data["power_value"]
+                    ),
+                }
+            )
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update all listeners, timing the entity state writes."""
+        start = perf_counter()
+        self._diff_data()
+        super().async_update_listeners()
+        self.timings.add_sample(STAGE_ENTITY_UPDATE, perf_counter() - start)
+
+    @callback
+    def _diff_data(self) -> None:
+        """Find the data keys that changed since the listeners were last updated."""
+        previous = self._published_data
+        if (
+            previous is None
+            or self.data is None
+            or self.last_update_success != self._published_success
+        ):
+            self.changed_keys = None
+        else:
+            self.changed_keys = {
+                key
+                for key in self.data.keys() | previous.keys()
+                if self.data.get(key) != previous.get(key)
+            }
+        self._published_data = self.data
+        self._published_success = self.last_update_success
+
+    def data_changed(self, keys: frozenset[str] | None) -> bool:
+        """
+        Return if any of the data keys changed in the latest listener update.
+
+        Args:
+            keys: Data keys an entity shows, None for an entity that is updated
+                  on every listener update
+
+        """
+        return (
+            keys is None
+            or self.changed_keys is None
+            or not self.changed_keys.isdisjoint(keys)
+        )
+
+    @callback
+    def async_start_profiler(self, refreshes: int, *, between_refreshes: bool) -> str:
+        """
+        Profile the next refreshes and return the file the profile is written to.
+
+        Args:
+            refreshes: Number of refreshes to profile
+            between_refreshes: Also profile the tariff boundary and push updates
+                               between the refreshes
+
+        Returns:
+            Path of the profile in the configuration directory
+
+        """
+        timestamp = dt_util.now().strftime("%Y%m%d_%H%M%S")
+        path = self.hass.config.path(
+            f"tariffiq_{nametoid(self.entry.data[CONF_NAME])}_{timestamp}.prof"
+        )
+
+        def _on_stop() -> None:
+            self.profiler = None
+
+        self.profiler = RefreshProfiler(
+            self.hass,
+            path,
+            refreshes,
+            between_refreshes=between_refreshes,
+            on_stop=_on_stop,
+        )
+        LOGGER.info(
+            "Profiling the next %s refreshes of %s",
+            refreshes,
+            self.entry.data[CONF_NAME],
+        )
+        return path
+
+    @callback
+    def async_stop_profiler(self) -> None:
+        """Stop a running profiler and write what it captured."""
+        if self.profiler is not None:
+            self.profiler.async_stop()
+
+    @contextmanager
+    def _profile_between_refreshes(self) -> Iterator[None]:
+        """Profile an update between refreshes if the profiler asks for it."""
+        if self.profiler is not None and self.profiler.between_refreshes:
+            with self.profiler.capture():
+                yield
+        else:
+            yield
 
-            stats_current_month = await self._get_energy_statistics_for_current_month()
+    async def _async_hourly_refresh(self, _now: datetime) -> None:
+        """Refresh everything once the statistics of the closed hour exist."""
+        await self.async_refresh()
 
-            current_hour_consumption = await self._get_current_hour_consumption()
-            predicted_consumption = self.dso_instance.predicted_consumption(
-                current_hour_consumption, power_value
+    def _get_schedule_data(self) -> dict[str, Any]:
+        """Return the tariff schedule data, recalculated only after a boundary."""
+        if self._schedule_data is not None and (
+            self._next_boundary is None or dt_util.now() < self._next_boundary
+        ):
+            return self._schedule_data
+
+        now = dt_util.now()
+        starts_at = self.dso_instance.tariff_starts_at(now)
+        ends_at = self.dso_instance.tariff_ends_at(now)
+        self._schedule_data = {
+            "tariff_active": self.dso_instance.tariff_active(now),
+            "tariff_starts_at": starts_at,
+            "tariff_ends_at": ends_at,
+            "tariff_schedule": self.dso_instance.get_tariff_schedule(now),
+        }
+        # A new tariff version may change the schedule without a transition
+        version_start = self.dso_instance.next_version_at(now)
+        self._next_boundary = min(
+            (
+                boundary
+                for boundary in (starts_at, ends_at, version_start)
+                if boundary is not None
+            ),
+            default=None,
+        )
+        if self._unsub_hourly is not None:
+            self._schedule_boundary_timer()
+
+        return self._schedule_data
+
+    def _get_consumption_data(
+        self, current_hour_consumption: float, power_value: float
+    ) -> dict[str, Any]:
+        """Return the data derived from the consumption of the current hour."""
+        predicted_consumption = self.dso_instance.predicted_consumption(
+            current_hour_consumption, power_value
+        )
+        peak_unit = (
+            UnitOfPower.KILO_WATT
+            if self.dso_instance.peaks_as_power()
+            else UnitOfEnergy.KILO_WATT_HOUR
+        )
+        return {
+            "current_hour_consumption": current_hour_consumption,
+            "current_hour_consumption_formatted": (
+                f"{round(current_hour_consumption, 1)} {UnitOfEnergy.KILO_WATT_HOUR}"
+            ),
+            "predicted_consumption": predicted_consumption,
+            "predicted_consumption_formatted": (
+                f"{round(predicted_consumption, 1)} {peak_unit}"
+            ),
+            "calculated_peak": self.dso_instance.calculated_peak(
+                current_hour_consumption
+            ),
+        }
+
+    async def _async_update_peaks(
+        self, timer: RefreshTimer, statistics: HourlySeries
+    ) -> None:
+        """
+        Feed the hours closed since the last refresh to the peak model.
+
+        Usually only an hour or two is added and that runs inline. A whole
+        month, after a restart without ledger or when the recorder corrected
+        rows, is estimated from the measured cost per row and runs in the
+        executor if it would block the event loop for too long.
+        """
+        generation = self.month_statistics.generation
+        rows = self.dso_instance.pending_peak_rows(statistics, generation)
+        if rows == 0:
+            return
+
+        start = perf_counter()
+        if rows * self._model_row_cost > MODEL_INLINE_BUDGET:
+            LOGGER.debug("Updating the peaks of %s rows in the executor", rows)
+            with timer.stage(STAGE_MODEL, awaited=True):
+                # The series is immutable, the next fetch replaces it
+                tracker = await self.hass.async_add_executor_job(
+                    self.dso_instance.updated_peak_tracker, statistics, generation
+                )
+            self.dso_instance.peak_tracker = tracker
+        else:
+            with timer.stage(STAGE_MODEL):
+                self.dso_instance.update_peaks(statistics, generation)
+
+        if rows >= MODEL_COST_MIN_ROWS:
+            self._model_row_cost = (perf_counter() - start) / rows
+
+    async def _async_fetch_short_term(self, now: datetime) -> list[StatisticsRow]:
+        """
+        Fetch the 5-minute rows the quarter-hour buffer has not seen yet.
+
+        Rows are read from the last one in the buffer, or from the start of the
+        month for an empty buffer. Without quarter-hour tracking nothing is read.
+        """
+        buffer = self.quarter_hours
+        if buffer is None:
+            return []
+
+        month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        if buffer.period_start != month_start.timestamp():
+            # A new billing period starts without quarter-hours and peaks
+            buffer.clear(month_start.timestamp())
+            self.dso_instance.update_quarter_hours((), rebuild=True)
+
+        fetch_start = (
+            month_start
+            if buffer.last_start is None
+            else datetime.fromtimestamp(buffer.last_start + SHORT_TERM_SECONDS, UTC)
+        )
+        return await self.statistics_helper.get_short_term_stats(
+            self.entry.data[CONF_ENERGY_SENSOR],
+            fetch_start,
+            types={"change", "state"},
+            batch=True,
+        )
+
+    def _update_quarter_hours(
+        self,
+        timer: RefreshTimer,
+        statistics: HourlySeries,
+        rows: list[StatisticsRow],
+    ) -> None:
+        """
+        Feed the quarter-hours completed since the last refresh to the peak model.
+
+        The recorder only keeps 5-minute rows for about ten days, so the hours
+        of the month before the first 5-minute row are estimated from the
+        hourly statistics.
+        """
+        buffer = self.quarter_hours
+        if buffer is None:
+            return
+
+        with timer.stage(STAGE_MODEL):
+            completed = []
+            if buffer.last_start is None:
+                completed += buffer.fill_hours(statistics, rows)
+            completed += buffer.extend(rows)
+            completed += buffer.close_before(
+                dt_util.utcnow().timestamp() - QUARTER_HOUR_CLOSE_DELAY
             )
-            peaks = self.dso_instance.peak_value(stats_current_month)  # pyright: ignore[reportAttributeAccessIssue]
-            peaks_dict = self.dso_instance.observed_peak(stats_current_month)  # pyright: ignore[reportAttributeAccessIssue]
+            if buffer.revised:
+                # A late row changed a completed quarter-hour the peaks hold
+                buffer.revised = False
+                self.dso_instance.update_quarter_hours(buffer, rebuild=True)
+            else:
+                self.dso_instance.update_quarter_hours(completed)
 
+    def _build_data(
+        self,
+        timer: RefreshTimer,
+        energy_value: float,
+        power_value: float,
+        current_hour_consumption: float,
+        statistics: HourlySeries | None = None,
+    ) -> dict[str, Any]:
+        """
+        Return the data of the tracked peaks and the sensor readings.
+
+        statistics are the closed hours of the month, priced at the tariff
+        version of each hour, without them all energy is priced at today's.
+        """
+        with timer.stage(STAGE_MODEL):
+            peaks = self.dso_instance.tracked_peak_value()
+            peaks_dict = self.dso_instance.tracked_observed_peak()
+
+        with timer.stage(STAGE_COST):
             fixed_cost = self.dso_instance.fixed_cost()
-            variable_cost = self.dso_instance.variable_cost(energy_value)
+            variable_cost = self.dso_instance.variable_cost(energy_value, statistics)
             peaks_cost = self.dso_instance.tariff_cost() * peaks
             total_dso_cost = fixed_cost + variable_cost + peaks_cost
 
-            data = {
+        with timer.stage(STAGE_MODEL):
+            return {
                 # Tariff Active Binary Sensor
-                "tariff_active": self.dso_instance.tariff_active(),
-                "tariff_starts_at": self.dso_instance.tariff_starts_at(),
-                "tariff_ends_at": self.dso_instance.tariff_ends_at(),
-                "tariff_schedule": self.dso_instance.get_tariff_schedule(),
+                **self._get_schedule_data(),
                 "peaks": peaks,
-                "current_hour_consumption": current_hour_consumption,
-                "current_hour_consumption_formatted": (
-                    f"{round(current_hour_consumption, 1)} "
-                    f"{UnitOfEnergy.KILO_WATT_HOUR}"
-                ),
-                "predicted_consumption": predicted_consumption,
-                "predicted_consumption_formatted": (
-                    f"{round(predicted_consumption, 1)} {UnitOfEnergy.KILO_WATT_HOUR}"
-                ),
+                **self._get_consumption_data(current_hour_consumption, power_value),
                 "peaks_dictionary": peaks_dict,
-                "calculated_peak": self.dso_instance.calculated_peak(
-                    current_hour_consumption
-                ),
                 "fixed_cost": fixed_cost,
                 "variable_cost": variable_cost,
                 "peaks_cost": peaks_cost,
@@ -195,13 +691,200 @@ class TariffIQDataCoordinator(DataUpdateCoordinator):
                 "energy_value": energy_value,  # Current energy reading
                 "power_value": power_value,  # Current power reading
                 # Misc States
-                "fees": self.dso_instance.selected_fees,
+                "fees": dict(self.dso_instance.selected_fees),
                 "currency": self.dso_instance.currency,
                 "fuse_size": self.entry.data[CONF_FUSE_SIZE],
             }
+
+    def _ledger_data(self) -> dict[str, Any]:
+        """Return the peak ledger of the current billing period."""
+        tracker = self.dso_instance.peak_tracker
+        month_start = self.month_statistics.month_start
+        return {
+            "dso": self.entry.data[CONF_DSO_AND_MODEL],
+            "fuse_size": self.entry.data[CONF_FUSE_SIZE],
+            "period_start": month_start.isoformat() if month_start else None,
+            "latest_state": self.month_statistics.latest_state,
+            "reconcile_rows": self.month_statistics.reconcile_rows(),
+            "energy_value": self._energy_value,
+            "power_value": self._power_value,
+            "tracker": tracker.as_dict() if tracker is not None else None,
+            "quarter_hours": (
+                self.quarter_hours.as_dict() if self.quarter_hours is not None else None
+            ),
+        }
+
+    def _ledger_position(self) -> float | None:
+        """Return the start of the latest row the peak model has processed."""
+        if self.quarter_hours is not None:
+            return self.quarter_hours.last_start
+        tracker = self.dso_instance.peak_tracker
+        return tracker.last_start if tracker is not None else None
+
+    @callback
+    def _async_save_ledger(self) -> None:
+        """Save the peak ledger once the processed hours changed."""
+        position = self._ledger_position()
+        if (
+            self.dso_instance.peak_tracker is None
+            or position == self._ledger_last_start
+        ):
+            return
+
+        self._ledger_last_start = position
+        self.ledger.async_save(self._ledger_data)
+
+    async def async_flush_ledger(self) -> None:
+        """Write the peak ledger now, so no delayed write lands after an unload."""
+        if self.dso_instance.peak_tracker is None or self._ledger_position() is None:
+            return
+        await self.ledger.async_flush(self._ledger_data)
+
+    async def async_restore_ledger(self) -> bool:
+        """
+        Publish data from the peak ledger saved before a restart.
+
+        The next refresh then only reads the hours since the last processed
+        one from the recorder.
+
+        Returns:
+            True if the ledger was restored, False if there was none or it
+            belongs to another billing period, DSO or fuse size
+
+        """
+        tracker = self.dso_instance.peak_tracker
+        ledger = await self.ledger.async_load()
+        if tracker is None or ledger is None:
+            return False
+
+        month_start = dt_util.now().replace(
+            day=1, hour=0, minute=0, second=0, microsecond=0
+        )
+        if (
+            ledger.get("dso") != self.entry.data[CONF_DSO_AND_MODEL]
+            or ledger.get("fuse_size") != self.entry.data[CONF_FUSE_SIZE]
+            or ledger.get("period_start") != month_start.isoformat()
+        ):
+            LOGGER.debug("Discarding the peak ledger of %s", self.entry.data[CONF_NAME])
+            return False
+
+        try:
+            if self.quarter_hours is not None:
+                # The buffer holds every quarter-hour, the peaks are rebuilt
+                self.quarter_hours.restore(ledger["quarter_hours"])
+                self.dso_instance.update_quarter_hours(self.quarter_hours, rebuild=True)
+            else:
+                tracker.restore(ledger["tracker"])
+            position = self._ledger_position()
+            if position is not None:
+                self.month_statistics.resume(
+                    month_start,
+                    position,
+                    ledger.get("latest_state"),
+                    ledger.get("reconcile_rows"),
+                )
+        except (KeyError, TypeError, ValueError) as error:
+            LOGGER.warning("Could not restore the peak ledger: %s", error)
+            tracker.clear()
+            if self.quarter_hours is not None:
+                self.quarter_hours.clear()
+            self.month_statistics.clear()
+            return False
+        if position is None:
+            return False
+
+        tracker.generation = self.month_statistics.generation
+        self._ledger_last_start = position
+
+        # Sensors may not have a state yet this early in the startup
+        energy_value = self._state_value(
+            self.hass.states.get(self.entry.data[CONF_ENERGY_SENSOR])
+        )
+        if energy_value is None:
+            energy_value = ledger.get("energy_value") or 0.0
+        power_value = self._state_value(
+            self.hass.states.get(self.entry.data[CONF_POWER_SENSOR])
+        )
+        if power_value is None:
+            power_value = ledger.get("power_value") or 0.0
+        self._power_value = power_value
+
+        self.async_set_updated_data(
+            self._build_data(
+                RefreshTimer(),
+                energy_value,
+                power_value,
+                self._get_current_hour_consumption(energy_value),
+            )
+        )
+        LOGGER.debug(
+            "Restored the peak ledger of %s until %s",
+            self.entry.data[CONF_NAME],
+            datetime.fromtimestamp(position, dt_util.DEFAULT_TIME_ZONE),
+        )
+        return True
+
+    async def _async_update_data(self) -> dict[str, Any]:
+        """Fetch data from the DSO."""
+        profiler = self.profiler
+        timer = self.timings.start(profiler.capture if profiler is not None else None)
+        try:
+            LOGGER.debug(
+                "Fetching data from DSO instance %s, %s",
+                self.entry.data[CONF_NAME],
+                self.entry.entry_id,
+            )
+
+            # Fetch energy sensor value
+            with timer.stage(STAGE_SENSOR_READ):
+                energy_value = self._get_energy_sensor_value()
+                power_value = self._get_power_sensor_value()
+                self._power_value = power_value
+
+            # Both reads join the same statistics batch, so the refresh waits once
+            now = dt_util.now()
+            with timer.stage(STAGE_RECORDER_FETCH, awaited=True):
+                stats_current_month, short_term_rows = await asyncio.gather(
+                    self._get_energy_statistics_for_current_month(now),
+                    self._async_fetch_short_term(now),
+                )
+            timer.add_rows(
+                STAGE_RECORDER_FETCH,
+                self.month_statistics.fetched_rows + len(short_term_rows),
+            )
+
+            if self.quarter_hours is not None:
+                self._update_quarter_hours(timer, stats_current_month, short_term_rows)
+            else:
+                await self._async_update_peaks(timer, stats_current_month)
+            with timer.stage(STAGE_MODEL):
+                # After the quarter-hour update, which reads the latest meter state
+                current_hour_consumption = self._get_current_hour_consumption(
+                    energy_value
+                )
+
+            data = self._build_data(
+                timer,
+                energy_value,
+                power_value,
+                current_hour_consumption,
+                stats_current_month,
+            )
+            self._async_save_ledger()
             LOGGER.debug("Fetched data: %s", data)
         except Exception as error:
+            self.timings.record(timer, success=False)
             LOGGER.error("Error fetching data from DSO: %s", error)
             raise
         else:
+            self.timings.record(timer)
+            LOGGER.debug(
+                "Refresh of %s took %s ms, %s ms blocking the event loop",
+                self.entry.data[CONF_NAME],
+                self.timings.last_ms(STAGE_TOTAL),
+                self.timings.last_ms(STAGE_LOOP_BLOCKED),
+            )
             return data
+        finally:
+            if profiler is not None:
+                profiler.async_refresh_done()
@@ -0,0 +1,67 @@
+"""Diagnostics support for TariffIQ."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from .const import DOMAIN
+from .dso.helpers import local_calendar
+
+if TYPE_CHECKING:
+    from homeassistant.config_entries import ConfigEntry
+    from homeassistant.core import HomeAssistant
+
+    from .coordinator import TariffIQDataCoordinator
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    diagnostics: dict[str, Any] = {
+        "entry": {"data": dict(entry.data), "options": dict(entry.options)},
+    }
+
+    coordinator: TariffIQDataCoordinator | None = hass.data.get(DOMAIN, {}).get(
+        entry.entry_id
+    )
+    if coordinator is None:
+        # The coordinator is set up once Home Assistant has started
+        return diagnostics
+
+    month_statistics = coordinator.month_statistics
+    diagnostics["dso"] = {
+        "class": type(coordinator.dso_instance).__name__,
+        "name": coordinator.dso_instance.name,
+        "fuse_size": coordinator.dso_instance.fuse_size,
+    }
+    diagnostics["refresh"] = {
+        "last_update_success": coordinator.last_update_success,
+        "push_updates": coordinator.push_updates,
+        "update_interval": (
+            coordinator.update_interval.total_seconds()
+            if coordinator.update_interval is not None
+            else None
+        ),
+    }
+    diagnostics["statistics_cache"] = {
+        "month_start": month_statistics.month_start,
+        "rows": len(month_statistics.rows),
+        "fetched_rows": month_statistics.fetched_rows,
+        "generation": month_statistics.generation,
+        "latest_start": month_statistics.latest_start,
+        "resumed_start": month_statistics.resumed_start,
+    }
+    if (quarter_hours := coordinator.quarter_hours) is not None:
+        diagnostics["quarter_hours"] = {
+            "period_start": quarter_hours.period_start,
+            "buckets": len(quarter_hours),
+            "bytes": quarter_hours.nbytes(),
+            "last_start": quarter_hours.last_start,
+            "estimated_until": quarter_hours.estimated_until,
+        }
+    diagnostics["timings"] = coordinator.timings.as_dict()
+    diagnostics["local_calendar_cache"] = local_calendar.cache_info()
+    diagnostics["data"] = coordinator.data
+
+    return diagnostics
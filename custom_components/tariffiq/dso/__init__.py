@@ -2,103 +2,118 @@
 
 from __future__ import annotations
 
-import importlib
-import inspect
-from pathlib import Path
-from typing import Any
+from functools import cache
+from typing import TYPE_CHECKING, Any
+
+import voluptuous as vol
 
 from custom_components.tariffiq.helpers import LOGGER
 
-# Simple DSO registry
-DSO_REGISTRY: dict[str, dict[str, Any]] = {}
+from .index import DSOIndexEntry, scan_definitions
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+    from .dsobase import DSOBase
+
+
+@cache
+def get_dso_index() -> dict[str, DSOIndexEntry]:
+    """
+    Return the DSO index keyed by DSO name, built once per process.
+
+    The first call scans the definition files, from the event loop use
+    async_get_dso_index to do that in the executor.
+    """
+    return {entry.name: entry for entry in scan_definitions()}
+
+
+async def async_get_dso_index(hass: HomeAssistant) -> dict[str, DSOIndexEntry]:
+    """Return the DSO index, scanning the definition files in the executor."""
+    if get_dso_index.cache_info().currsize:
+        return get_dso_index()
+    return await hass.async_add_executor_job(get_dso_index)
+
 
+# DSO classes compiled from their definitions, keyed by DSO name
+_LOADED_CLASSES: dict[str, type[DSOBase]] = {}
 
-def _discover_and_import_dso_classes() -> list[Any]:
-    """Dynamically discover and import DSO classes."""
-    dso_classes = []
+
+def _load_dso_class(dso_name: str) -> type[DSOBase] | None:
+    """Load and compile the tariff definition of a DSO."""
+    entry = get_dso_index().get(dso_name)
+    if entry is None:
+        return None
+
+    from .definition import load_dso_class  # noqa: PLC0415
 
     try:
-        # Import base class first
-        from .dsobase import DSOBase  # noqa: PLC0415
-
-        # Get the current package directory
-        current_dir = Path(__file__).parent
-
-        # Find all *_dso.py files
-        for file_path in current_dir.glob("*_dso.py"):
-            module_name = file_path.stem  # filename without .py
-
-            try:
-                # Import the module-this happens at module load time, not in event loop
-                module = importlib.import_module(f".{module_name}", package=__package__)
-
-                # Find DSO classes in the module
-                for attr_name in dir(module):
-                    attr = getattr(module, attr_name)
-                    if (
-                        inspect.isclass(attr)
-                        and issubclass(attr, DSOBase)
-                        and attr != DSOBase
-                    ):
-                        dso_classes.append(attr)
-                        LOGGER.debug(
-                            "Discovered DSO class: %s from %s", attr.name, module_name
-                        )
-
-            except (ImportError, AttributeError, ModuleNotFoundError) as e:
-                LOGGER.warning("Could not import DSO module %s: %s", module_name, e)
-
-    except (ImportError, OSError) as e:
-        LOGGER.error("Error during DSO discovery: %s", e)
-
-    return dso_classes
-
-
-def _populate_registry() -> None:
-    """Populate the registry from discovered DSO classes."""
-    dso_classes = _discover_and_import_dso_classes()
-
-    for dso_class in dso_classes:
-        try:
-            DSO_REGISTRY[dso_class.name] = {
-                "name": getattr(dso_class, "name", "Unknown DSO"),
-                "currency": getattr(dso_class, "currency", "SEK"),
-                "fees": getattr(dso_class, "fees", {}),
-                "class": dso_class,
-            }
-        except (AttributeError, TypeError) as e:
-            LOGGER.warning("Error registering DSO %s: %s", dso_class.name, e)
+        dso_class = load_dso_class(entry.definition, entry.class_name)
+    except (OSError, ValueError, vol.Invalid) as e:
+        LOGGER.warning("Could not load DSO definition %s: %s", entry.definition, e)
+        return None
+
+    if (
+        dso_class.name != entry.name
+        or tuple(dso_class.get_fuse_sizes()) != entry.fuse_sizes
+    ):
+        LOGGER.warning(
+            "DSO index entry for %s does not match definition %s",
+            entry.name,
+            entry.definition,
+        )
+        return None
+
+    LOGGER.debug("Loaded DSO class: %s from %s", entry.name, entry.definition)
+    _LOADED_CLASSES[dso_name] = dso_class
+    return dso_class
 
 
 def get_dso_data(name: str) -> dict[str, Any] | None:
-    """Get DSO data by name."""
-    return DSO_REGISTRY.get(name)
+    """Get DSO data by name without loading the DSO definition."""
+    entry = get_dso_index().get(name)
+    if entry is None:
+        return None
+
+    return {
+        "name": entry.name,
+        "currency": entry.currency,
+        "fuse_sizes": list(entry.fuse_sizes),
+    }
 
 
 def get_available_dsos() -> list[str]:
     """Get list of available DSO names."""
-    return list(DSO_REGISTRY.keys())
+    return list(get_dso_index())
 
 
 def get_dso_fuse_sizes(dso_name: str) -> list[str]:
     """Get fuse sizes for a specific DSO."""
-    dso_data = DSO_REGISTRY.get(dso_name, {})
-    fees = dso_data.get("fees", {})
-    return list(fees.keys())
+    entry = get_dso_index().get(dso_name)
+    if entry is None:
+        return []
+    return list(entry.fuse_sizes)
 
 
 def get_dso_class(dso_name: str) -> Any:
-    """Get DSO class by name."""
-    dso_data = DSO_REGISTRY.get(dso_name, {})
-    return dso_data.get("class")
+    """Get DSO class by name, loading only the definition of that DSO."""
+    if (dso_class := _LOADED_CLASSES.get(dso_name)) is not None:
+        return dso_class
+    return _load_dso_class(dso_name)
+
+
+async def async_load_dso_class(hass: HomeAssistant, dso_name: str) -> Any:
+    """
+    Get DSO class by name, loading its definition in the executor.
+
+    The definition file is read again on every call so that a reloaded config
+    entry picks up edits, it is only recompiled when its content changed.
+    """
+    return await hass.async_add_import_executor_job(_load_dso_class, dso_name)
 
 
 def get_fuse_sizes_for_dso_class(dso_class: Any) -> list[str]:
     """Get fuse sizes directly from a DSO class."""
-    if hasattr(dso_class, "fees"):
-        return list(dso_class.fees.keys())
+    if hasattr(dso_class, "get_fuse_sizes"):
+        return dso_class.get_fuse_sizes()
     return []
-
-
-# Populate registry on module import
-_populate_registry()
@@ -0,0 +1,266 @@
+"""
+Historical bill backtesting for TariffIQ.
+
+Prices a series of hourly statistics month by month with a DSO: fixed cost,
+variable cost and the peak cost with the peaks that set it. The series is
+split into months, summed and turned into columns with its calendar fields
+once, and can then be priced with any number of DSOs. Chunks and months are
+views of the series, only the peak candidates of a month are copied. Every
+month only selects its peak candidates and feeds those to a fresh peak
+tracker.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from itertools import accumulate
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.util import dt as dt_util
+
+from custom_components.tariffiq.dso.helpers.columnar import (
+    NUMPY_AVAILABLE,
+    StatisticsColumns,
+)
+from custom_components.tariffiq.dso.helpers.hourly_series import HourlySeries
+from custom_components.tariffiq.dso.helpers.local_calendar import SECONDS_PER_HOUR
+from custom_components.tariffiq.dso.models.modelbase import ModelBase
+
+if TYPE_CHECKING:
+    from datetime import tzinfo
+
+    from homeassistant.components.recorder.statistics import StatisticsRow
+
+    from custom_components.tariffiq.dso.dsobase import DSOBase
+
+# Months priced per executor job
+BACKTEST_CHUNK_MONTHS = 12
+
+
+@dataclass(slots=True)
+class MonthlyBill:
+    """The DSO bill of one month."""
+
+    month_start: datetime
+    hours: int  # Hours with statistics, less than the month for partial months
+    energy: float
+    fixed_cost: float
+    variable_cost: float
+    peak_value: float = 0.0
+    peaks_cost: float = 0.0
+    peaks: list[dict[datetime, float]] = field(default_factory=list)
+
+    @property
+    def total_cost(self) -> float:
+        """Return the sum of the fixed, variable and peak cost."""
+        return self.fixed_cost + self.variable_cost + self.peaks_cost
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the bill as a JSON serializable dict."""
+        return {
+            "month": self.month_start.strftime("%Y-%m"),
+            "hours": self.hours,
+            "energy": self.energy,
+            "fixed_cost": self.fixed_cost,
+            "variable_cost": self.variable_cost,
+            "peak_value": self.peak_value,
+            "peaks_cost": self.peaks_cost,
+            "total_cost": self.total_cost,
+            "peaks": [
+                {"start": start.isoformat(), "value": value}
+                for peak in self.peaks
+                for start, value in peak.items()
+            ],
+        }
+
+
+def _month_start(moment: datetime) -> datetime:
+    """Return local midnight of the first day of the month of moment."""
+    return moment.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _next_month(month_start: datetime) -> datetime:
+    """Return the start of the month after month_start."""
+    if month_start.month == 12:  # noqa: PLR2004
+        return month_start.replace(year=month_start.year + 1, month=1)
+    return month_start.replace(month=month_start.month + 1)
+
+
+def month_slices(
+    statistics: HourlySeries, tz: tzinfo | None = None
+) -> list[tuple[datetime, int, int]]:
+    """
+    Split chronological hourly rows by local calendar month.
+
+    Args:
+        statistics: Hourly rows sorted by start
+        tz: Timezone of the months, default the Home Assistant timezone
+
+    Returns:
+        (month start, first, end) for each month with rows, where
+        statistics[first:end] are the rows of that month
+
+    """
+    if not statistics:
+        return []
+    if tz is None:
+        tz = dt_util.DEFAULT_TIME_ZONE
+
+    result = []
+    month = _month_start(datetime.fromtimestamp(statistics.start[0], tz))
+    first = 0
+    while first < len(statistics):
+        next_month = _next_month(month)
+        end = statistics.index_at(next_month.timestamp())
+        if end > first:
+            result.append((month, first, end))
+        first = end
+        month = next_month
+
+    return result
+
+
+def chunk_statistics(
+    statistics: HourlySeries, months: int = BACKTEST_CHUNK_MONTHS
+) -> list[HourlySeries]:
+    """Split chronological hourly rows into views of whole months."""
+    slices = month_slices(statistics)
+    return [
+        statistics[slices[index][1] : slices[min(index + months, len(slices)) - 1][2]]
+        for index in range(0, len(slices), months)
+    ]
+
+
+def _hours_between(start: datetime, end: datetime) -> float:
+    """Return the number of hours between two aware datetimes."""
+    return (end.timestamp() - start.timestamp()) / SECONDS_PER_HOUR
+
+
+class BacktestSeries:
+    """
+    Hourly statistics prepared once for pricing with any number of DSOs.
+
+    Holds the month split, prefix sums of the change and the columns with
+    their calendar fields. Schedule masks are cached per distinct schedule,
+    so DSOs sharing a schedule share the mask. The calendar fields are built
+    up front, so a series can be priced from several threads at once.
+    """
+
+    def __init__(self, statistics: HourlySeries | list[StatisticsRow]) -> None:
+        """
+        Prepare the series.
+
+        Args:
+            statistics: Closed hourly rows sorted by start
+
+        """
+        statistics = HourlySeries.from_rows(statistics)
+        self.statistics = statistics
+        self.months = month_slices(statistics)
+        # Prefix sums of the change, so the energy of any slice is one subtraction
+        self.energy = list(accumulate(statistics.change, initial=0.0))
+        self.columns: StatisticsColumns | None = None
+        if NUMPY_AVAILABLE and statistics:
+            self.columns = StatisticsColumns.from_series(statistics)
+            self.columns.calendar()
+        self._masks: dict[tuple[tuple[float | None, bytes], ...], Any] = {}
+
+    def scheduled_mask(self, model: type[ModelBase]) -> Any:
+        """Return the schedule mask of a model, None without columns."""
+        if self.columns is None:
+            return None
+
+        key = tuple(
+            (version.valid_from, version.tariff_schedule.filter_table)
+            for version in model.tariff_versions.versions
+        )
+        if (mask := self._masks.get(key)) is None:
+            mask = model.scheduled_mask(self.columns, self.statistics)
+            self._masks[key] = mask
+        return mask
+
+
+def backtest(
+    dso: DSOBase, statistics: HourlySeries | list[StatisticsRow]
+) -> list[MonthlyBill]:
+    """Price hourly statistics month by month, see backtest_series."""
+    return backtest_series(dso, BacktestSeries(statistics))
+
+
+def backtest_series(dso: DSOBase, series: BacktestSeries) -> list[MonthlyBill]:
+    """
+    Price a prepared series month by month.
+
+    Each hour is priced with the tariff version in effect at its start, the
+    fixed fee and peak cost of a month with the version at the month start.
+    The fixed fee is the yearly fee spread over the hours of the year, charged
+    for the hours from the first to the last row of the month, so partial
+    months at the ends of the series pay only for the span they cover.
+
+    Args:
+        dso: DSO instance for the fuse size to price with
+        series: Prepared hourly statistics
+
+    Returns:
+        One bill per month with rows, in order
+
+    """
+    versions = dso.tariff_versions
+    statistics = series.statistics
+    energy = series.energy
+    columns = series.columns
+
+    mask = None
+    model = type(dso) if isinstance(dso, ModelBase) else None
+    if model is not None:
+        mask = series.scheduled_mask(model)
+
+    bills = []
+    for month_start, first, end in series.months:
+        month_rows = statistics[first:end]
+        fees = versions.at(month_start).fees[dso.fuse_size]
+        year_start = month_start.replace(month=1)
+        covered_hours = (
+            statistics.start[end - 1] + SECONDS_PER_HOUR - statistics.start[first]
+        ) / SECONDS_PER_HOUR
+
+        variable_cost = dso.variable_cost_of_statistics(
+            month_rows, energy[first : end + 1]
+        )
+        bill = MonthlyBill(
+            month_start=month_start,
+            hours=end - first,
+            energy=energy[end] - energy[first],
+            fixed_cost=fees.get("fixed_fee", 0)
+            * covered_hours
+            / _hours_between(year_start, year_start.replace(year=year_start.year + 1)),
+            variable_cost=variable_cost,
+        )
+
+        if model is not None:
+            tracker = model.create_peak_tracker()
+            if columns is not None and mask is not None:
+                rows = mask[first:end].nonzero()[0] + first
+                candidates = model.candidate_indices(columns, rows)
+                model.track_statistics(tracker, statistics.take(candidates))
+            else:
+                model.track_statistics(tracker, month_rows)
+
+            bill.peak_value = tracker.peak_value()
+            bill.peaks = tracker.observed_peak()
+            bill.peaks_cost = fees.get("tariff_cost", 0.0) * bill.peak_value
+
+        bills.append(bill)
+
+    return bills
+
+
+def summarize(bills: list[MonthlyBill]) -> dict[str, float]:
+    """Return the cost totals of a list of monthly bills."""
+    return {
+        "fixed_cost": sum(bill.fixed_cost for bill in bills),
+        "variable_cost": sum(bill.variable_cost for bill in bills),
+        "peaks_cost": sum(bill.peaks_cost for bill in bills),
+        "total_cost": sum(bill.total_cost for bill in bills),
+    }
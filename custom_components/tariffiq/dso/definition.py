@@ -0,0 +1,230 @@
+"""
+Declarative tariff definitions for TariffIQ.
+
+A DSO is described by a JSON file in the tariffs folder with its fees per
+fuse size, time patterns, pricing model and model parameters. Later versions
+of fees and time patterns are listed under versions with the local date they
+take effect, a version without fees or time patterns keeps those of the
+version before it. The file is validated and compiled once into a DSO class
+with compiled TariffSchedules, and compiled classes are cached by the hash of
+the file content.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from datetime import date, datetime, time
+from typing import TYPE_CHECKING, Any
+
+import voluptuous as vol
+from homeassistant.util import dt as dt_util
+
+from custom_components.tariffiq.dso.dsobase import DSOBase
+from custom_components.tariffiq.dso.helpers.tariff_schedule import (
+    CalendarPeriods,
+    TariffSchedule,
+    TimePattern,
+)
+from custom_components.tariffiq.dso.helpers.tariff_versions import (
+    TariffVersion,
+    TariffVersions,
+    freeze_fees,
+)
+from custom_components.tariffiq.dso.index import TARIFFS_DIR
+from custom_components.tariffiq.dso.models.average_of_x_days_model import (
+    AverageOfXDaysModel,
+)
+from custom_components.tariffiq.dso.models.average_of_x_hours_model import (
+    AverageOfXHoursModel,
+)
+from custom_components.tariffiq.dso.models.average_of_x_quarter_hours_model import (
+    AverageOfXQuarterHoursModel,
+)
+
+if TYPE_CHECKING:
+    from custom_components.tariffiq.dso.models.modelbase import ModelBase
+
+
+MODELS: dict[str, type[ModelBase]] = {
+    "average_of_x_days": AverageOfXDaysModel,
+    "average_of_x_hours": AverageOfXHoursModel,
+    "average_of_x_quarter_hours": AverageOfXQuarterHoursModel,
+}
+
+# Model parameters a definition can set, and the models that have them
+MODEL_PARAMETERS: dict[str, tuple[type[ModelBase], ...]] = {
+    "count_top_peaks": tuple(MODELS.values()),
+    "one_peak_per_day": (AverageOfXQuarterHoursModel,),
+}
+
+FEES_SCHEMA = vol.Schema(
+    {
+        vol.Optional("fixed_fee", default=0.0): vol.Coerce(float),
+        vol.Optional("transfer_fee", default=0.0): vol.Coerce(float),
+        vol.Optional("tariff_cost", default=0.0): vol.Coerce(float),
+    }
+)
+
+TIME_PATTERN_SCHEMA = vol.Schema(
+    {
+        vol.Optional("tariff_factor", default=1.0): vol.Coerce(float),
+        vol.Optional(CalendarPeriods.Hour.value): [vol.All(int, vol.Range(0, 23))],
+        vol.Optional(CalendarPeriods.Weekday.value): [vol.All(int, vol.Range(0, 6))],
+        vol.Optional(CalendarPeriods.Month.value): [vol.All(int, vol.Range(1, 12))],
+    }
+)
+
+VERSION_SCHEMA = vol.Schema(
+    {
+        vol.Required("valid_from"): vol.Date(),
+        vol.Optional("fees"): {str: FEES_SCHEMA},
+        vol.Optional("time_patterns"): [TIME_PATTERN_SCHEMA],
+    }
+)
+
+TARIFF_DEFINITION_SCHEMA = vol.Schema(
+    {
+        vol.Required("name"): vol.All(str, vol.Length(min=1)),
+        vol.Required("currency"): vol.All(str, vol.Length(min=1)),
+        vol.Optional("model"): vol.In(MODELS),
+        vol.Optional("count_top_peaks"): vol.All(int, vol.Range(min=1)),
+        vol.Optional("one_peak_per_day"): bool,
+        vol.Required("fees"): vol.All(
+            {str: FEES_SCHEMA}, vol.Length(min=1, msg="at least one fuse size")
+        ),
+        vol.Optional("time_patterns", default=[]): [TIME_PATTERN_SCHEMA],
+        vol.Optional("versions", default=[]): [VERSION_SCHEMA],
+    }
+)
+
+# Compiled DSO classes keyed by the SHA-256 of the definition file
+_COMPILED_CLASSES: dict[str, type[DSOBase]] = {}
+
+
+def compile_tariff_schedule(time_patterns: list[dict[str, Any]]) -> TariffSchedule:
+    """Build the compiled schedule of validated time pattern definitions."""
+    return TariffSchedule(
+        [
+            TimePattern(
+                tariff_factor=pattern["tariff_factor"],
+                time_filters={
+                    period: pattern[period.value]
+                    for period in CalendarPeriods
+                    if period.value in pattern
+                },
+            )
+            for pattern in time_patterns
+        ]
+    )
+
+
+def compile_tariff_versions(definition: dict[str, Any]) -> TariffVersions:
+    """
+    Build the tariff versions of a validated tariff definition.
+
+    Args:
+        definition: Tariff definition validated by TARIFF_DEFINITION_SCHEMA
+
+    Returns:
+        Interval index with the top level fees and time patterns as the first
+        version followed by the dated versions
+
+    Raises:
+        vol.Invalid: If a version has other fuse sizes than the first version
+
+    """
+    fees = freeze_fees(definition["fees"])
+    schedule = compile_tariff_schedule(definition["time_patterns"])
+    versions = [TariffVersion(None, fees, schedule)]
+
+    for version in sorted(definition["versions"], key=lambda v: v["valid_from"]):
+        if "fees" in version:
+            if version["fees"].keys() != definition["fees"].keys():
+                msg = f"Fuse sizes of version {version['valid_from']} do not match"
+                raise vol.Invalid(msg)
+            fees = freeze_fees(version["fees"])
+        if "time_patterns" in version:
+            schedule = compile_tariff_schedule(version["time_patterns"])
+
+        # Versions take effect at local midnight
+        valid_from = datetime.combine(
+            date.fromisoformat(version["valid_from"]),
+            time(),
+            dt_util.DEFAULT_TIME_ZONE,
+        )
+        versions.append(TariffVersion(valid_from.timestamp(), fees, schedule))
+
+    try:
+        return TariffVersions(versions)
+    except ValueError as error:
+        raise vol.Invalid(str(error)) from error
+
+
+def compile_dso_class(definition: dict[str, Any], class_name: str) -> type[DSOBase]:
+    """
+    Compile a validated tariff definition into a DSO class.
+
+    Args:
+        definition: Tariff definition validated by TARIFF_DEFINITION_SCHEMA
+        class_name: Name of the generated class
+
+    Returns:
+        DSO class, combined with the pricing model when the tariff has one
+
+    Raises:
+        vol.Invalid: If a model parameter is set that the model does not have
+
+    """
+    attributes: dict[str, Any] = {
+        "__doc__": f"{definition['name']} DSO model.",
+        "__module__": __name__,
+        "name": definition["name"],
+        "currency": definition["currency"],
+        "tariff_versions": compile_tariff_versions(definition),
+    }
+
+    bases: tuple[type, ...] = (DSOBase,)
+    if "model" in definition:
+        model = MODELS[definition["model"]]
+        bases = (model, DSOBase)
+        for parameter, models in MODEL_PARAMETERS.items():
+            if parameter not in definition:
+                continue
+            if model not in models:
+                msg = f"Model {definition['model']} has no parameter {parameter}"
+                raise vol.Invalid(msg)
+            attributes[parameter] = definition[parameter]
+
+    return type(class_name, bases, attributes)
+
+
+def load_dso_class(definition_name: str, class_name: str) -> type[DSOBase]:
+    """
+    Load a DSO class from its definition file, compiling it when it changed.
+
+    Does blocking file I/O and must not be called from the event loop.
+
+    Args:
+        definition_name: File name in the tariffs folder without extension
+        class_name: Name of the generated class
+
+    Returns:
+        The compiled DSO class
+
+    Raises:
+        OSError: If the definition file cannot be read
+        ValueError: If the definition file is not valid JSON
+        vol.Invalid: If the definition does not match the schema
+
+    """
+    content = (TARIFFS_DIR / f"{definition_name}.json").read_bytes()
+    digest = hashlib.sha256(content).hexdigest()
+
+    if (dso_class := _COMPILED_CLASSES.get(digest)) is not None:
+        return dso_class
+
+    definition = TARIFF_DEFINITION_SCHEMA(json.loads(content))
+    dso_class = compile_dso_class(definition, class_name)
+    _COMPILED_CLASSES[digest] = dso_class
+    return dso_class
@@ -1,47 +1,29 @@
 """DSO discovery and management utilities."""
 
-import importlib
-import inspect
-from pathlib import Path
+from __future__ import annotations
 
-from custom_components.tariffiq.helpers import LOGGER
+from typing import TYPE_CHECKING
 
-from .dsobase import DSOBase
+from . import get_available_dsos as _get_available_dsos
+from . import get_dso_class as _get_dso_class
+
+if TYPE_CHECKING:
+    from .dsobase import DSOBase
 
 
 def discover_dso_classes() -> dict[str, type[DSOBase]]:
     """
-    Dynamically discover all DSO classes in the dso folder.
+    Load all DSO classes listed in the DSO index.
 
     Returns:
         Dictionary mapping DSO names to their class implementations.
 
     """
     dso_classes = {}
-
-    # Get the dso directory path
-    dso_dir = Path(__file__).parent
-
-    # Iterate through all Python files in the dso directory
-    for file_path in dso_dir.glob("*_dso.py"):
-        module_name = file_path.stem  # filename without .py
-
-        try:
-            # Import the module dynamically
-            module = importlib.import_module(
-                f".{module_name}", package="custom_components.tariffiq.dso"
-            )
-
-            # Find all classes in the module that inherit from DSOBase
-            for _name, obj in inspect.getmembers(module, inspect.isclass):
-                if issubclass(obj, DSOBase) and obj is not DSOBase:
-                    # Use the class's name attribute as the key
-                    dso_classes[obj.name] = obj
-
-        except (ImportError, AttributeError) as e:
-            # Log but don't fail if a DSO module can't be loaded
-            LOGGER.error(f"Could not load DSO module {module_name}: {e}")
-
+    for dso_name in _get_available_dsos():
+        dso_class = _get_dso_class(dso_name)
+        if dso_class is not None:
+            dso_classes[dso_name] = dso_class
     return dso_classes
 
 
@@ -56,8 +38,7 @@ def get_dso_class(dso_name: str) -> type[DSOBase] | None:
         The DSO class or None if not found
 
     """
-    dso_classes = discover_dso_classes()
-    return dso_classes.get(dso_name)
+    return _get_dso_class(dso_name)
 
 
 def get_available_dsos() -> list[str]:
@@ -68,4 +49,4 @@ def get_available_dsos() -> list[str]:
         List of DSO names
 
     """
-    return list(discover_dso_classes().keys())
+    return _get_available_dsos()
@@ -1,68 +1,266 @@
 """Base DSO class for TariffIQ."""
 
+from __future__ import annotations
+
 from abc import ABC
 from datetime import datetime
-from typing import ClassVar
+from functools import cache
+from typing import TYPE_CHECKING, Any, ClassVar
 
 from homeassistant.util import dt as dt_util
 
+from custom_components.tariffiq.dso.helpers.hourly_series import HourlySeries
 from custom_components.tariffiq.dso.helpers.tariff_schedule import TariffSchedule
+from custom_components.tariffiq.dso.helpers.tariff_versions import (
+    TariffVersion,
+    TariffVersions,
+    freeze_fees,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping, Sequence
+
+    from homeassistant.components.recorder.statistics import StatisticsRow
+
+    from custom_components.tariffiq.dso.helpers.peak_tracker import PeakTracker
 
 
 class DSOBase(ABC):
-    """Base class for Distribution System Operators."""
+    """
+    Base class for Distribution System Operators.
+
+    Class attributes (fees, compiled tariff schedule and its transition index)
+    are built once per DSO class, are read-only and shared by all config
+    entries. Each config entry gets its own instance holding only its fuse
+    size and peak tracking state.
+
+    The peak tracking methods are hooks a pricing model overrides, here they
+    are those of a DSO without a model, which tracks no peaks.
+
+    Fees and schedule can change over time, tariff_versions holds every
+    effective-dated version. fees and tariff_schedule are those of the latest
+    version, a DSO defining only them gets a single version. Everything
+    evaluated at a point in time reads the version in effect then instead.
+    """
 
     # Class attributes that each DSO must define
     name: ClassVar[str]
     currency: ClassVar[str]
-    fees: ClassVar[dict]  # Fuse size: fees
-    tariff_schedule: ClassVar[TariffSchedule]
-    selected_fees: dict
+    fees: ClassVar[Mapping[str, Mapping[str, float]]]  # Fuse size: fees
+    # DSOs without an effect tariff use a schedule that is never active
+    tariff_schedule: ClassVar[TariffSchedule] = TariffSchedule([])
+    tariff_versions: ClassVar[TariffVersions]
+
+    # Peaks are tracked from completed quarter-hours instead of hourly rows
+    tracks_quarter_hours: ClassVar[bool] = False
+    # Periods a peak is measured over per hour, peaks are their average power
+    peak_periods_per_hour: ClassVar[int] = 1
+
+    fuse_size: str
+    peak_tracker: PeakTracker | None
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        """Freeze the fee tables and build the versions shared by all instances."""
+        super().__init_subclass__(**kwargs)
+
+        if "tariff_versions" in cls.__dict__:
+            cls.fees = cls.tariff_versions.latest.fees
+            cls.tariff_schedule = cls.tariff_versions.latest.tariff_schedule
+        elif "fees" in cls.__dict__ or "tariff_schedule" in cls.__dict__:
+            cls.fees = freeze_fees(cls.fees)
+            cls.tariff_versions = TariffVersions(
+                [TariffVersion(None, cls.fees, cls.tariff_schedule)]
+            )
+
+    def __init__(self, fuse_size: str) -> None:
+        """Initialize the DSO for a config entry."""
+        self.fuse_size = fuse_size
+        self.peak_tracker = self.create_peak_tracker()
+
+    @property
+    def selected_fees(self) -> Mapping[str, float]:
+        """Return the fees of the fuse size in effect now."""
+        return self.fees_at()
+
+    def fees_at(self, when: datetime | float | None = None) -> Mapping[str, float]:
+        """Return the fees of the fuse size in effect at a point in time."""
+        return self.tariff_versions.at(when).fees[self.fuse_size]
+
+    @classmethod
+    def create_peak_tracker(cls) -> PeakTracker | None:
+        """Return an empty peak tracker, None when no peaks are tracked."""
+        return None
+
+    def update_peaks(  # noqa: B027
+        self,
+        statistics: HourlySeries | list[StatisticsRow],
+        generation: int | None = None,
+    ) -> None:
+        """Feed the closed hourly rows of the billing period to the peak tracker."""
+
+    def pending_peak_rows(
+        self,
+        statistics: HourlySeries | list[StatisticsRow],  # noqa: ARG002
+        generation: int | None = None,  # noqa: ARG002
+    ) -> int:
+        """Return the number of rows update_peaks would feed to the peak tracker."""
+        return 0
+
+    def updated_peak_tracker(
+        self,
+        statistics: HourlySeries | list[StatisticsRow],  # noqa: ARG002
+        generation: int | None = None,  # noqa: ARG002
+    ) -> PeakTracker | None:
+        """
+        Return a copy of the peak tracker fed with the closed hourly rows.
+
+        Unlike update_peaks this leaves the tracker in use untouched, so it can
+        run in an executor while the event loop keeps reading the tracker.
+        """
+        return self.peak_tracker
+
+    def update_quarter_hours(  # noqa: B027
+        self, quarter_hours: Iterable[tuple[float, float]], *, rebuild: bool = False
+    ) -> None:
+        """
+        Feed completed quarter-hours to the peak tracker.
+
+        Args:
+            quarter_hours: (start, energy) of the quarter-hours in order
+            rebuild: Clear the tracker first, to rebuild it from all
+                     quarter-hours of the billing period
+
+        """
+
+    def tracked_peak_value(self) -> float:
+        """Return the peak value of the tracked billing period."""
+        if self.peak_tracker is None:
+            return 0.0
+        return self.peak_tracker.peak_value()
+
+    def tracked_observed_peak(self) -> list[dict[datetime, float]]:
+        """Return the peaks of the tracked billing period."""
+        if self.peak_tracker is None:
+            return []
+        return self.peak_tracker.observed_peak()
+
+    def variable_cost_of_statistics(
+        self,
+        statistics: HourlySeries | list[StatisticsRow],
+        energy: Sequence[float] | None = None,
+    ) -> float:
+        """
+        Return the variable cost of hourly rows, each priced at its own version.
+
+        Args:
+            statistics: Hourly rows sorted by start
+            energy: Running totals of the change, one more than the rows, so
+                    the energy of rows first to end is energy[end] - energy[first].
+                    Summed from the rows when not given
+
+        Returns:
+            Sum of the change of the rows times the transfer fee in effect
+
+        """
+        statistics = HourlySeries.from_rows(statistics)
+        total = 0.0
+        for version, first, end in self.tariff_versions.slices(statistics):
+            transfer_fee = version.fees[self.fuse_size].get("transfer_fee", 0)
+            change = (
+                energy[end] - energy[first]
+                if energy is not None
+                else sum(statistics.change[first:end])
+            )
+            total += change * transfer_fee
+        return total
 
     @classmethod
-    def __init__(cls, fuse_size: str) -> None:
-        """Initialize the DSO class."""
-        cls.selected_fees = cls.fees[fuse_size]
+    def current_schedule(cls, when: datetime | None = None) -> TariffSchedule:
+        """Return the tariff schedule in effect at a point in time, default now."""
+        return cls.tariff_versions.at(when).tariff_schedule
 
     @classmethod
     def get_fuse_sizes(cls) -> list[str]:
-        """Return all available fuse sizes for this DSO (combined model approach)."""
-        return list(cls.fees.keys())
+        """Return the fuse sizes of the tariff version in effect now."""
+        return list(cls.tariff_versions.at().fees.keys())
+
+    @classmethod
+    def next_version_at(cls, current_time: datetime | None = None) -> datetime | None:
+        """Return when the next tariff version starts, None if none is known."""
+        if current_time is None:
+            current_time = dt_util.now()
+        next_start = cls.tariff_versions.next_start(current_time)
+        if next_start is None:
+            return None
+        return datetime.fromtimestamp(next_start, current_time.tzinfo)
+
+    @classmethod
+    def _next_transition(
+        cls, current_time: datetime | None, *, active: bool
+    ) -> datetime | None:
+        """
+        Return the first hour after a point in time the tariff has a state.
+
+        The search runs through the schedule of each version in turn. A
+        version starting counts as a transition when its schedule has the
+        requested state at its start.
+
+        Args:
+            current_time: Datetime to search from, default now
+            active: Whether to search for the tariff turning on or off
+
+        Returns:
+            The matching time, or None if the state never changes
+
+        """
+        if current_time is None:
+            current_time = dt_util.now()
+
+        search_from = current_time
+        for _ in range(len(cls.tariff_versions)):
+            schedule = cls.current_schedule(search_from)
+            found = (
+                schedule.starts_at(search_from)
+                if active
+                else schedule.ends_at(search_from)
+            )
+            version_start = cls.next_version_at(search_from)
+            if version_start is None or (found is not None and found < version_start):
+                return found
+
+            if cls.tariff_active(version_start) == active:
+                return version_start
+            search_from = version_start
+
+        return None
 
     @classmethod
-    def get_tariff_schedule(cls) -> list[dict[str, object]]:
-        """Return the tariff schedule for this DSO."""
-        return [
-            {
-                "tariff_factor": str(pattern.tariff_factor),
-                "hours": pattern.hour if pattern.hour != list(range(24)) else "all",
-                "weekdays": "pattern.weekday"
-                if pattern.weekday != list(range(7))
-                else "all",
-                "months": pattern.month
-                if pattern.month != list(range(1, 13))
-                else "all",
-            }
-            for pattern in cls.tariff_schedule.timepatterns
-        ]
+    def get_tariff_schedule(
+        cls, current_time: datetime | None = None
+    ) -> tuple[dict[str, object], ...]:
+        """
+        Return the tariff schedule in effect, built once per tariff version.
+
+        The returned description is shared and must not be modified.
+        """
+        return _describe_schedule(cls.current_schedule(current_time))
 
     @classmethod
     def tariff_starts_at(cls, current_time: datetime | None = None) -> datetime | None:
         """Return the start time of the tariff period."""
-        return cls.tariff_schedule.starts_at(current_time)
+        return cls._next_transition(current_time, active=True)
 
     @classmethod
     def tariff_ends_at(cls, current_time: datetime | None = None) -> datetime | None:
         """Return the end time of the tariff period."""
-        return cls.tariff_schedule.ends_at(current_time)
+        return cls._next_transition(current_time, active=False)
 
     @classmethod
     def tariff_active(cls, current_time: datetime | None = None) -> bool:
         """Determine if tariff is active."""
-        return cls.tariff_schedule.active(current_time)
+        return cls.current_schedule(current_time).active(current_time)
 
-    @classmethod
-    def fixed_cost(cls) -> float:
+    def fixed_cost(self) -> float:
         """Return the fixed cost for this DSO."""
         now = dt_util.now()
         start_of_year = now.replace(
@@ -73,39 +271,83 @@ class DSOBase(ABC):
             datetime(now.year + 1, 1, 1) - datetime(now.year, 1, 1)  # noqa: DTZ001
         ).total_seconds() // 3600
 
-        fixed_fee = cls.selected_fees.get("fixed_fee", 0)
+        fixed_fee = self.selected_fees.get("fixed_fee", 0)
 
         return fixed_fee * current_hour / total_hours_in_year
 
-    @classmethod
-    def variable_cost(cls, energy_value: float) -> float:
-        """Return the variable cost for this DSO based on energy consumption."""
-        # Calculate variable cost based on energy consumption
-        transfer_fee = cls.selected_fees.get("transfer_fee", 0)
+    def variable_cost(
+        self,
+        energy_value: float,
+        statistics: HourlySeries | list[StatisticsRow] | None = None,
+    ) -> float:
+        """
+        Return the variable cost for this DSO based on energy consumption.
 
-        return energy_value * transfer_fee
+        Args:
+            energy_value: Reading of the energy sensor
+            statistics: Closed hourly rows of the billing period, priced at the
+                        version in effect at their start. The rest of
+                        energy_value is priced at the version in effect now
 
-    @classmethod
-    def tariff_cost(cls) -> float:
+        """
+        transfer_fee = self.selected_fees.get("transfer_fee", 0)
+        if not statistics:
+            return energy_value * transfer_fee
+
+        statistics = HourlySeries.from_rows(statistics)
+        priced = sum(statistics.change)
+        return (
+            self.variable_cost_of_statistics(statistics)
+            + (energy_value - priced) * transfer_fee
+        )
+
+    def tariff_cost(self) -> float:
         """Return the tariff cost for this DSO."""
-        return cls.selected_fees.get("tariff_cost", 0.0)
+        return self.selected_fees.get("tariff_cost", 0.0)
+
+    @classmethod
+    def peaks_as_power(cls) -> bool:
+        """Return True if peaks are average power in kW, not hourly energy in kWh."""
+        return cls.peak_periods_per_hour > 1
 
     @classmethod
     def predicted_consumption(cls, energy_hour: float, power: float) -> float:
-        """Return the expected peak value."""
-        timepattern = cls.tariff_schedule.active_timepattern()
+        """
+        Return the expected peak value.
+
+        energy_hour is the consumption of the current peak period, a
+        quarter-hour for quarter-hour models, power is in W.
+        """
+        periods = cls.peak_periods_per_hour
+        predicted = (energy_hour + power / 1000 / periods) * periods
+        timepattern = cls.current_schedule().active_timepattern()
 
         if timepattern is not None:
-            return (energy_hour + power / 1000) * timepattern.tariff_factor
+            return predicted * timepattern.tariff_factor
 
-        return energy_hour + power / 1000 if cls.tariff_active() else 0.0
+        return predicted if cls.tariff_active() else 0.0
 
     @classmethod
     def calculated_peak(cls, energy_hour: float) -> float:
         """Return the charged peak value based on tariff schedule."""
-        timepattern = cls.tariff_schedule.active_timepattern()
+        peak = energy_hour * cls.peak_periods_per_hour
+        timepattern = cls.current_schedule().active_timepattern()
 
         if timepattern is not None:
-            return energy_hour * timepattern.tariff_factor
+            return peak * timepattern.tariff_factor
+
+        return peak if cls.tariff_active() else 0.0
+
 
-        return energy_hour if cls.tariff_active() else 0.0
+@cache
+def _describe_schedule(schedule: TariffSchedule) -> tuple[dict[str, object], ...]:
+    """Return the time patterns of a schedule as state attribute data."""
+    return tuple(
+        {
+            "tariff_factor": str(pattern.tariff_factor),
+            "hours": pattern.hour if pattern.hour != list(range(24)) else "all",
+            "weekdays": pattern.weekday if pattern.weekday != list(range(7)) else "all",
+            "months": pattern.month if pattern.month != list(range(1, 13)) else "all",
+        }
+        for pattern in schedule.timepatterns
+    )
@@ -0,0 +1,169 @@
+"""
+Columnar statistics helpers for TariffIQ peak models.
+
+Wraps the arrays of an hourly series as NumPy arrays without copying and
+derives the local calendar fields with vectorized arithmetic, so the schedule
+can be applied as a boolean mask and peaks selected without per-row Python
+work. The UTC offsets come from the same tables as local_calendar, so both
+paths put a row in the same calendar slot. NumPy is optional, without it the
+models use their per-row path.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.util import dt as dt_util
+
+from custom_components.tariffiq.dso.helpers.local_calendar import (
+    EPOCH_WEEKDAY,
+    SECONDS_PER_DAY,
+    SECONDS_PER_HOUR,
+    offset_changes,
+)
+from custom_components.tariffiq.dso.helpers.tariff_schedule import (
+    SLOTS_PER_MONTH,
+    SLOTS_PER_WEEKDAY,
+)
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+if TYPE_CHECKING:
+    from datetime import tzinfo
+
+    from custom_components.tariffiq.dso.helpers.hourly_series import HourlySeries
+
+NUMPY_AVAILABLE = np is not None
+
+# Below this many rows the per-row path is faster than building arrays
+COLUMNAR_MIN_ROWS = 500
+
+
+def utc_offsets(starts: Any, tz: tzinfo | None = None) -> Any:
+    """
+    Return the UTC offset in seconds for each timestamp.
+
+    The offsets of the years the timestamps span are mapped to all
+    timestamps with a binary search.
+
+    Args:
+        starts: Sorted NumPy array of UTC timestamps
+        tz: Timezone to use, default the Home Assistant timezone
+
+    Returns:
+        NumPy array with the offset of each timestamp
+
+    """
+    if len(starts) == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    change_times, offsets = offset_changes(float(starts[0]), float(starts[-1]), tz)
+    positions = np.searchsorted(np.array(change_times), starts, side="right") - 1
+    return np.array(offsets, dtype=np.int64)[positions]
+
+
+class StatisticsColumns:
+    """Hourly statistics as parallel NumPy arrays with local calendar fields."""
+
+    def __init__(self, start: Any, change: Any) -> None:
+        """
+        Initialize the columns.
+
+        Args:
+            start: NumPy array of UTC start timestamps, sorted ascending
+            change: NumPy array of the change of each hour, 0.0 when missing
+
+        """
+        self.start = start
+        self.change = change
+        self._calendar: dict[tzinfo, tuple[Any, Any, Any, Any]] = {}
+
+    @classmethod
+    def from_series(cls, statistics: HourlySeries) -> StatisticsColumns:
+        """Return the columns of an hourly series, sharing its arrays."""
+        return cls(
+            np.frombuffer(statistics.start, dtype=np.float64),
+            np.frombuffer(statistics.change, dtype=np.float64),
+        )
+
+    def __len__(self) -> int:
+        """Return the number of rows."""
+        return len(self.start)
+
+    def calendar(self, tz: tzinfo | None = None) -> tuple[Any, Any, Any, Any]:
+        """
+        Return the local calendar fields of each row.
+
+        Args:
+            tz: Timezone to use, default the Home Assistant timezone
+
+        Returns:
+            Arrays of day number since epoch, month (1-12), weekday (0=Monday)
+            and hour (0-23)
+
+        """
+        tz = tz or dt_util.DEFAULT_TIME_ZONE
+        if tz not in self._calendar:
+            local = self.start.astype(np.int64) + utc_offsets(self.start, tz)
+            days = local // SECONDS_PER_DAY
+            hour = (local - days * SECONDS_PER_DAY) // SECONDS_PER_HOUR
+            weekday = (days + EPOCH_WEEKDAY) % 7
+            month = (
+                days.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+                % 12
+                + 1
+            )
+            self._calendar[tz] = (days, month, weekday, hour)
+        return self._calendar[tz]
+
+    def slots(self, tz: tzinfo | None = None) -> Any:
+        """Return the calendar slot of each row, as used by the schedule tables."""
+        _days, month, weekday, hour = self.calendar(tz)
+        return (month - 1) * SLOTS_PER_MONTH + weekday * SLOTS_PER_WEEKDAY + hour
+
+    def table_mask(self, table: bytes, tz: tzinfo | None = None) -> Any:
+        """Return a boolean mask of the rows whose calendar slot is set in table."""
+        return table_lookup(table, self.slots(tz))
+
+
+def table_lookup(table: bytes, slots: Any) -> Any:
+    """Return a boolean mask of the slots that are set in a schedule table."""
+    return np.frombuffer(table, dtype=np.uint8)[slots] != 0
+
+
+def top_candidates(values: Any, count: int, margin: float = 0.0) -> Any:
+    """
+    Return the indices of all values that can be among the top count values.
+
+    Everything at or above the count-th largest value minus margin is kept, so
+    ties and values that may round up to the threshold are not lost. The
+    indices are returned in ascending order.
+    """
+    if len(values) <= count:
+        return np.arange(len(values))
+
+    threshold = values[np.argpartition(values, -count)[-count]] - margin
+    return np.nonzero(values >= threshold)[0]
+
+
+def daily_max_indices(days: Any, values: Any) -> Any:
+    """
+    Return the index of the maximum value of each day.
+
+    Args:
+        days: NumPy array of day numbers in ascending order
+        values: NumPy array of values, same length as days
+
+    Returns:
+        One index per day in ascending day order, the earliest index when a
+        day has several equal maxima
+
+    """
+    positions = np.arange(len(days))
+    order = np.lexsort((positions, -values, days))
+    first_of_day = np.ones(len(order), dtype=bool)
+    first_of_day[1:] = days[order][1:] != days[order][:-1]
+    return order[first_of_day]
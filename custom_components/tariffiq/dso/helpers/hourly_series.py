@@ -0,0 +1,221 @@
+"""
+Compact hourly statistics series for TariffIQ.
+
+The recorder returns a dict per hour. A year of those is thousands of dicts
+with boxed floats, so the rows are turned into parallel typed arrays once,
+right after they are read. Slices are views sharing the arrays, so a month or
+a time range of a long series costs nothing to cut and can be handed to an
+executor thread as is. The arrays are read-only and can be wrapped by NumPy
+without copying.
+"""
+
+from __future__ import annotations
+
+import math
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable, Sequence
+from typing import TYPE_CHECKING, Any, overload
+
+if TYPE_CHECKING:
+    from homeassistant.components.recorder.statistics import StatisticsRow
+
+# Statistic types kept only when the recorder result has them
+OPTIONAL_TYPES = ("max", "mean")
+
+NAN = math.nan
+
+
+def _column(values: Iterable[float]) -> memoryview:
+    """Return a read-only float64 column."""
+    return memoryview(array("d", values)).toreadonly()
+
+
+def _nan_to_none(value: float) -> float | None:
+    """Return None for a missing value stored as NaN."""
+    return None if math.isnan(value) else value
+
+
+class HourlySeries(Sequence["StatisticsRow"]):
+    """
+    Hourly statistics as parallel float64 arrays, sorted by start.
+
+    start holds the UTC timestamp of each hour and change its change, 0.0
+    when the recorder has none. state, max and mean are NaN when missing, max
+    and mean are None when the series was built without them. Indexing
+    returns the row as a StatisticsRow dict, slicing returns a view.
+    """
+
+    __slots__ = ("change", "max", "mean", "start", "state")
+
+    start: memoryview
+    change: memoryview
+    state: memoryview
+    max: memoryview | None
+    mean: memoryview | None
+
+    def __init__(
+        self,
+        start: memoryview,
+        change: memoryview,
+        state: memoryview,
+        max: memoryview | None = None,  # noqa: A002
+        mean: memoryview | None = None,
+    ) -> None:
+        """Initialize the series from columns of equal length."""
+        self.start = start
+        self.change = change
+        self.state = state
+        self.max = max
+        self.mean = mean
+
+    @classmethod
+    def empty(cls) -> HourlySeries:
+        """Return a series without rows."""
+        return cls(_column(()), _column(()), _column(()))
+
+    @classmethod
+    def from_rows(cls, statistics: Iterable[StatisticsRow]) -> HourlySeries:
+        """
+        Build a series from recorder statistics rows.
+
+        Args:
+            statistics: Rows sorted by start
+
+        Returns:
+            The series, with max and mean if the first row has them
+
+        """
+        if isinstance(statistics, HourlySeries):
+            return statistics
+        rows = statistics if isinstance(statistics, list) else list(statistics)
+        if not rows:
+            return cls.empty()
+
+        optional = {
+            statistic_type: _column(
+                NAN if (value := row.get(statistic_type)) is None else value
+                for row in rows
+            )
+            for statistic_type in OPTIONAL_TYPES
+            if statistic_type in rows[0]
+        }
+        return cls(
+            _column(row.get("start", 0.0) for row in rows),
+            _column(row.get("change", 0.0) or 0.0 for row in rows),
+            _column(
+                NAN if (value := row.get("state")) is None else value for row in rows
+            ),
+            **optional,
+        )
+
+    @classmethod
+    def concat(cls, parts: Sequence[HourlySeries]) -> HourlySeries:
+        """Return the rows of consecutive series as one series."""
+        parts = [part for part in parts if len(part)]
+        if not parts:
+            return cls.empty()
+        if len(parts) == 1:
+            return parts[0]
+
+        def joined(name: str) -> memoryview | None:
+            columns = [getattr(part, name) for part in parts]
+            if any(column is None for column in columns):
+                return None
+            values = array("d")
+            for column in columns:
+                values.frombytes(column.cast("B"))
+            return memoryview(values).toreadonly()
+
+        return cls(
+            joined("start"),
+            joined("change"),
+            joined("state"),
+            joined("max"),
+            joined("mean"),
+        )
+
+    def __len__(self) -> int:
+        """Return the number of hours."""
+        return len(self.start)
+
+    @overload
+    def __getitem__(self, index: int) -> StatisticsRow: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> HourlySeries: ...
+
+    def __getitem__(self, index: int | slice) -> StatisticsRow | HourlySeries:
+        """Return a row as a dict, or a slice as a view of the series."""
+        if isinstance(index, slice):
+            if index.step not in (None, 1):
+                msg = "HourlySeries slices do not support a step"
+                raise ValueError(msg)
+            return HourlySeries(
+                self.start[index],
+                self.change[index],
+                self.state[index],
+                self.max[index] if self.max is not None else None,
+                self.mean[index] if self.mean is not None else None,
+            )
+
+        row: dict[str, Any] = {
+            "start": self.start[index],
+            "change": self.change[index],
+            "state": _nan_to_none(self.state[index]),
+        }
+        if self.max is not None:
+            row["max"] = _nan_to_none(self.max[index])
+        if self.mean is not None:
+            row["mean"] = _nan_to_none(self.mean[index])
+        return row
+
+    def __repr__(self) -> str:
+        """Return the size and time range of the series."""
+        if not len(self):
+            return "HourlySeries(empty)"
+        return f"HourlySeries({len(self)} hours, {self.start[0]}..{self.start[-1]})"
+
+    def index_at(self, timestamp: float, *, after: bool = False) -> int:
+        """
+        Return the index of the first hour starting at or after a timestamp.
+
+        Args:
+            timestamp: UTC timestamp
+            after: Return the first hour starting strictly after it instead
+
+        """
+        if after:
+            return bisect_right(self.start, timestamp)
+        return bisect_left(self.start, timestamp)
+
+    def between(self, start: float | None, end: float | None) -> HourlySeries:
+        """Return a view of the hours starting within [start, end)."""
+        first = 0 if start is None else self.index_at(start)
+        last = len(self) if end is None else self.index_at(end)
+        return self[first:last]
+
+    def take(self, indices: Iterable[int]) -> HourlySeries:
+        """Return a new series of the hours at ascending indices."""
+        indices = list(indices)
+
+        def picked(column: memoryview | None) -> memoryview | None:
+            if column is None:
+                return None
+            return _column(column[index] for index in indices)
+
+        return HourlySeries(
+            picked(self.start),
+            picked(self.change),
+            picked(self.state),
+            picked(self.max),
+            picked(self.mean),
+        )
+
+    def nbytes(self) -> int:
+        """Return the size of the arrays of the series in bytes."""
+        return sum(
+            column.nbytes
+            for column in (self.start, self.change, self.state, self.max, self.mean)
+            if column is not None
+        )
@@ -0,0 +1,192 @@
+"""
+Local calendar of UTC timestamps for TariffIQ.
+
+Statistics rows start at UTC timestamps while tariffs are defined on the
+local calendar. Models, trackers and schedules map timestamps to local
+calendar fields through this module, always in the Home Assistant timezone
+unless told otherwise, so a row lands in the same slot everywhere.
+
+The UTC offsets of a timezone are computed once per year into a table of its
+transitions. A timestamp is shifted by its offset and split into a local day
+and hour arithmetically, only the date fields of a local day are kept in an
+LRU cache, a few hundred entries per year of rows. Timestamps are bucketed by
+the UTC hour they fall in, which is exact for timezones with whole-hour
+offsets.
+"""
+
+from __future__ import annotations
+
+import time as time_module
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import UTC, date, datetime
+from functools import lru_cache
+from typing import TYPE_CHECKING, NamedTuple
+
+from homeassistant.util import dt as dt_util
+
+if TYPE_CHECKING:
+    from datetime import tzinfo
+
+SECONDS_PER_HOUR = 3600
+SECONDS_PER_DAY = 86400
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+EPOCH_WEEKDAY = 3  # 1970-01-01 was a Thursday
+
+# Local days kept in the LRU cache, about ten years
+LOCAL_DAY_CACHE_SIZE = 4_000
+# Offset tables kept, a few years of a few timezones
+OFFSET_TABLE_CACHE_SIZE = 32
+
+
+class LocalHour(NamedTuple):
+    """Local calendar fields of an hour."""
+
+    day: date
+    month: int
+    weekday: int  # 0=Monday, 6=Sunday
+    hour: int
+    dst: bool
+
+
+@dataclass(frozen=True, slots=True)
+class OffsetTable:
+    """UTC offsets of a timezone during a UTC calendar year."""
+
+    starts: tuple[float, ...]  # UTC timestamp each offset starts at
+    offsets: tuple[int, ...]  # Seconds
+    dst: tuple[bool, ...]
+
+    def index(self, timestamp: float) -> int:
+        """Return the index of the offset in effect at a timestamp."""
+        return max(bisect_right(self.starts, timestamp) - 1, 0)
+
+
+def _offset(timestamp: float, tz: tzinfo) -> tuple[int, bool]:
+    """Return the UTC offset in seconds and DST flag at a timestamp."""
+    moment = datetime.fromtimestamp(timestamp, tz)
+    offset = moment.utcoffset()
+    return (
+        int(offset.total_seconds()) if offset is not None else 0,
+        bool(moment.dst()),
+    )
+
+
+def _utc_year(timestamp: float) -> int:
+    """Return the UTC year of a timestamp."""
+    return time_module.gmtime(timestamp).tm_year
+
+
+@lru_cache(maxsize=OFFSET_TABLE_CACHE_SIZE)
+def year_offsets(tz: tzinfo, year: int) -> OffsetTable:
+    """
+    Return the UTC offsets of a timezone during a UTC calendar year.
+
+    The offset is sampled once per day and only searched hour by hour on days
+    where it changes.
+
+    Args:
+        tz: Timezone
+        year: UTC calendar year
+
+    Returns:
+        Table starting with the offset at the start of the year
+
+    """
+    day = datetime(year, 1, 1, tzinfo=UTC).timestamp()
+    end = datetime(year + 1, 1, 1, tzinfo=UTC).timestamp()
+
+    offset, dst = _offset(day, tz)
+    starts, offsets, dsts = [day], [offset], [dst]
+    while day < end:
+        next_day = day + SECONDS_PER_DAY
+        next_offset = _offset(next_day, tz)
+        if next_offset != (offsets[-1], dsts[-1]):
+            # Offset changed during the day, find the first hour with the new one
+            change = next_day
+            for hour in range(1, 24):
+                moment = day + hour * SECONDS_PER_HOUR
+                if _offset(moment, tz) == next_offset:
+                    change = moment
+                    break
+            starts.append(change)
+            offsets.append(next_offset[0])
+            dsts.append(next_offset[1])
+        day = next_day
+
+    return OffsetTable(tuple(starts), tuple(offsets), tuple(dsts))
+
+
+def offset_changes(
+    first: float, last: float, tz: tzinfo | None = None
+) -> tuple[list[float], list[int]]:
+    """
+    Return the UTC offsets in effect between two timestamps.
+
+    Args:
+        first: UTC timestamp of the start of the range
+        last: UTC timestamp of the end of the range
+        tz: Timezone, default the Home Assistant timezone
+
+    Returns:
+        Sorted timestamps where an offset starts and the offsets, the first
+        one starting at or before first
+
+    """
+    tz = tz or dt_util.DEFAULT_TIME_ZONE
+    starts: list[float] = []
+    offsets: list[int] = []
+    for year in range(_utc_year(first), _utc_year(last) + 1):
+        table = year_offsets(tz, year)
+        starts.extend(table.starts)
+        offsets.extend(table.offsets)
+    return starts, offsets
+
+
+@lru_cache(maxsize=LOCAL_DAY_CACHE_SIZE)
+def _local_day(days: int) -> tuple[date, int, int]:
+    """Return the date, month and weekday of a local day since the epoch."""
+    day = date.fromordinal(EPOCH_ORDINAL + days)
+    return day, day.month, (days + EPOCH_WEEKDAY) % 7
+
+
+def local_hour(
+    when: datetime | float | None = None, tz: tzinfo | None = None
+) -> LocalHour:
+    """
+    Return the local calendar fields of the hour a moment falls in.
+
+    Args:
+        when: Datetime or UTC timestamp, None for now. A naive datetime is
+              taken to be in tz, like Home Assistant does
+        tz: Timezone, default the Home Assistant timezone
+
+    Returns:
+        Local date, month, weekday, hour and whether DST is in effect
+
+    """
+    tz = tz or dt_util.DEFAULT_TIME_ZONE
+    if when is None:
+        when = dt_util.utcnow()
+    if isinstance(when, datetime):
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=tz)
+        when = when.timestamp()
+
+    timestamp = when - when % SECONDS_PER_HOUR
+    table = year_offsets(tz, _utc_year(timestamp))
+    index = table.index(timestamp)
+    days, seconds = divmod(int(timestamp) + table.offsets[index], SECONDS_PER_DAY)
+    day, month, weekday = _local_day(days)
+    return LocalHour(day, month, weekday, seconds // SECONDS_PER_HOUR, table.dst[index])
+
+
+def cache_info() -> dict[str, int]:
+    """Return the hit and size counters of the local day cache."""
+    info = _local_day.cache_info()
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "size": info.currsize,
+        "max_size": info.maxsize or 0,
+    }
@@ -0,0 +1,238 @@
+"""Module for keeping track of the peaks within a billing period."""
+
+from __future__ import annotations
+
+import heapq
+from abc import ABC, abstractmethod
+from datetime import date, datetime, time, timedelta
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.util import dt as dt_util
+
+from custom_components.tariffiq.const import NOTIMPLEMENTED_MSG
+from custom_components.tariffiq.dso.helpers.local_calendar import local_hour
+
+if TYPE_CHECKING:
+    from custom_components.tariffiq.dso.helpers.hourly_series import HourlySeries
+
+
+class PeakTracker(ABC):
+    """
+    Base class for stateful peak trackers.
+
+    Trackers are fed closed hourly rows in chronological order and keep only
+    what is needed to answer peak queries for the current billing period.
+    """
+
+    def __init__(self, count: int) -> None:
+        """
+        Initialize the peak tracker.
+
+        Args:
+            count: Number of top peaks to keep
+
+        """
+        self.count = count
+        self.generation: int | None = None
+        self.last_start: float | None = None
+
+    def clear(self) -> None:
+        """Forget all tracked rows, used on billing period rollover."""
+        self.last_start = None
+
+    def unseen(self, statistics: HourlySeries) -> HourlySeries:
+        """Return the rows that are newer than the last tracked row."""
+        if self.last_start is None:
+            return statistics
+
+        return statistics[statistics.index_at(self.last_start, after=True) :]
+
+    @abstractmethod
+    def add(self, start: float, value: float) -> None:
+        """Add the value of a closed hour."""
+        raise NotImplementedError(NOTIMPLEMENTED_MSG)
+
+    @abstractmethod
+    def peaks(self) -> list[tuple[float, float]]:
+        """Return the tracked peaks as (start, value) tuples."""
+        raise NotImplementedError(NOTIMPLEMENTED_MSG)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the tracked state as JSON serializable data."""
+        return {"last_start": self.last_start}
+
+    def restore(self, data: dict[str, Any]) -> None:
+        """
+        Replace the tracked state with data returned by as_dict.
+
+        Raises:
+            KeyError: If the data misses a field
+            TypeError: If a field has the wrong type
+            ValueError: If a field has an invalid value
+
+        """
+        self.clear()
+        self.last_start = data["last_start"]
+
+    def peak_value(self) -> float:
+        """Return the average of the tracked peaks."""
+        values = sorted((value for _start, value in self.peaks()), reverse=True)
+        if not values:
+            return 0.0
+
+        return sum(values) / len(values)
+
+    def observed_peak(self) -> list[dict[datetime, float]]:
+        """Return the tracked peaks, latest first."""
+        return [
+            {datetime.fromtimestamp(start, dt_util.DEFAULT_TIME_ZONE): value}
+            for start, value in sorted(self.peaks(), reverse=True)
+        ]
+
+
+class TopPeaksTracker(PeakTracker):
+    """
+    Bounded top-K tracker of hourly peaks.
+
+    Backed by a min-heap of at most count entries, so adding a row is
+    O(log K) and reading the peaks is O(K). On equal values the earlier
+    hour is kept.
+    """
+
+    def __init__(self, count: int) -> None:
+        """Initialize the top peaks tracker."""
+        super().__init__(count)
+        self._heap: list[tuple[float, float]] = []  # (value, -start)
+
+    def clear(self) -> None:
+        """Forget all tracked rows, used on billing period rollover."""
+        super().clear()
+        self._heap = []
+
+    def add(self, start: float, value: float) -> None:
+        """Add the value of a closed hour."""
+        item = (value, -start)
+        if len(self._heap) < self.count:
+            heapq.heappush(self._heap, item)
+        elif item > self._heap[0]:
+            heapq.heapreplace(self._heap, item)
+
+        if self.last_start is None or start > self.last_start:
+            self.last_start = start
+
+    def peaks(self) -> list[tuple[float, float]]:
+        """Return the tracked peaks as (start, value) tuples."""
+        return [(-negative_start, value) for value, negative_start in self._heap]
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the tracked state as JSON serializable data."""
+        return {**super().as_dict(), "peaks": self.peaks()}
+
+    def restore(self, data: dict[str, Any]) -> None:
+        """Replace the tracked state with data returned by as_dict."""
+        super().restore(data)
+        self._heap = heapq.nlargest(
+            self.count,
+            ((float(value), -float(start)) for start, value in data["peaks"]),
+        )
+        heapq.heapify(self._heap)
+
+
+class DailyPeaksTracker(PeakTracker):
+    """
+    Tracker of the top-K days by their highest hour.
+
+    Only the maximum of the current day is updated as hours close. When a new
+    day starts the previous one is frozen into a bounded min-heap of the top
+    days, so adding a row is O(1) apart from once per day, and reading the
+    peaks is O(K). On equal values the earlier hour within a day and the
+    earlier day among days is kept.
+    """
+
+    def __init__(self, count: int) -> None:
+        """Initialize the daily peaks tracker."""
+        super().__init__(count)
+        self.daily_peaks: dict[date, tuple[float, float]] = {}  # day: (start, value)
+        self._heap: list[tuple[float, int, float]] = []  # (value, -day, start)
+        self._day: date | None = None
+        self._day_start = 0.0
+        self._day_end = 0.0
+
+    def clear(self) -> None:
+        """Forget all tracked rows, used on billing period rollover."""
+        super().clear()
+        self.daily_peaks = {}
+        self._heap = []
+        self._day = None
+        self._day_start = 0.0
+        self._day_end = 0.0
+
+    def _freeze(self, day: date) -> None:
+        """Move a finished day into the top days heap."""
+        start, value = self.daily_peaks[day]
+        item = (value, -day.toordinal(), start)
+        if len(self._heap) < self.count:
+            heapq.heappush(self._heap, item)
+        elif item > self._heap[0]:
+            heapq.heapreplace(self._heap, item)
+
+    def _set_day(self, day: date) -> None:
+        """Make a day the current one, whose maximum can still change."""
+        self._day = day
+        self._day_start = datetime.combine(
+            day, time(), dt_util.DEFAULT_TIME_ZONE
+        ).timestamp()
+        self._day_end = datetime.combine(
+            day + timedelta(days=1), time(), dt_util.DEFAULT_TIME_ZONE
+        ).timestamp()
+
+    def add(self, start: float, value: float) -> None:
+        """Add the value of a closed hour."""
+        if self._day is None or not self._day_start <= start < self._day_end:
+            if self._day is not None:
+                self._freeze(self._day)
+
+            self._set_day(local_hour(start).day)
+
+        current = self.daily_peaks.get(self._day)
+        if current is None or value > current[1]:
+            self.daily_peaks[self._day] = (start, value)
+
+        if self.last_start is None or start > self.last_start:
+            self.last_start = start
+
+    def peaks(self) -> list[tuple[float, float]]:
+        """Return the tracked peaks as (start, value) tuples."""
+        candidates = list(self._heap)
+        if self._day is not None and self._day in self.daily_peaks:
+            start, value = self.daily_peaks[self._day]
+            candidates.append((value, -self._day.toordinal(), start))
+
+        top_days = heapq.nlargest(self.count, candidates)
+        return [(start, value) for value, _day, start in top_days]
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the tracked state as JSON serializable data."""
+        return {
+            **super().as_dict(),
+            "day": self._day.isoformat() if self._day is not None else None,
+            "daily_peaks": [
+                [day.isoformat(), start, value]
+                for day, (start, value) in sorted(self.daily_peaks.items())
+            ],
+        }
+
+    def restore(self, data: dict[str, Any]) -> None:
+        """Replace the tracked state with data returned by as_dict."""
+        super().restore(data)
+        self.daily_peaks = {
+            date.fromisoformat(day): (float(start), float(value))
+            for day, start, value in data["daily_peaks"]
+        }
+        if data["day"] is not None:
+            self._set_day(date.fromisoformat(data["day"]))
+
+        # Every day but the current one is finished
+        for day in self.daily_peaks:
+            if day != self._day:
+                self._freeze(day)
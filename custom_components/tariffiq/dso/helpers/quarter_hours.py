@@ -0,0 +1,282 @@
+"""
+Quarter-hour buckets of short-term statistics for TariffIQ.
+
+The recorder keeps its 5-minute statistics for about ten days, too short to
+look back over a billing month. QuarterHourBuffer sums the 5-minute rows into
+quarter-hour buckets as they arrive and keeps the completed buckets of the
+billing period in two typed arrays, at most 2,976 buckets for a month.
+"""
+
+from __future__ import annotations
+
+from array import array
+from typing import TYPE_CHECKING, Any
+
+from custom_components.tariffiq.dso.helpers.local_calendar import SECONDS_PER_HOUR
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    from homeassistant.components.recorder.statistics import StatisticsRow
+
+    from custom_components.tariffiq.dso.helpers.hourly_series import HourlySeries
+
+SHORT_TERM_SECONDS = 300
+QUARTER_HOUR_SECONDS = 900
+QUARTER_HOURS_PER_HOUR = 4
+ROWS_PER_QUARTER_HOUR = QUARTER_HOUR_SECONDS // SHORT_TERM_SECONDS
+
+# Decimals of the bucket energy kept in the stored buffer, 1 mWh
+STORED_ENERGY_DECIMALS = 6
+
+
+class QuarterHourBuffer:
+    """
+    Rolling buffer of the completed quarter-hours of a billing period.
+
+    Rows are summed into the bucket of the quarter-hour they start in. A bucket
+    is completed by its third row, by a row of a later bucket or by
+    close_before once its end has passed, so a missing 5-minute row does not
+    hold it back. Rows at or before the last added row are ignored, fetches
+    may overlap.
+
+    A row arriving after close_before completed its bucket is folded into the
+    completed bucket instead of reopening it, and revised is set so the caller
+    rebuilds the peaks from the buffer.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty buffer."""
+        self.clear()
+
+    def clear(self, period_start: float | None = None) -> None:
+        """Drop all buckets and start a new billing period."""
+        self.period_start = period_start
+        self.start = array("d")
+        self.energy = array("d")
+        # Start of the last 5-minute row added
+        self.last_start: float | None = None
+        # Meter reading at the end of the last 5-minute row with a state
+        self.reading: float | None = None
+        self.reading_until: float | None = None
+        # Buckets before this timestamp were estimated from hourly rows
+        self.estimated_until: float | None = None
+        # Start of the last completed bucket
+        self.last_closed: float | None = None
+        # A completed bucket changed since the flag was cleared
+        self.revised = False
+        self._open_start: float | None = None
+        self._open_energy = 0.0
+        self._open_rows = 0
+
+    def __len__(self) -> int:
+        """Return the number of completed buckets."""
+        return len(self.start)
+
+    def __iter__(self) -> Iterator[tuple[float, float]]:
+        """Iterate over the completed buckets as (start, energy) tuples."""
+        return zip(self.start, self.energy, strict=True)
+
+    def _append(self, start: float, energy: float) -> tuple[float, float]:
+        """Add a completed bucket and return it."""
+        self.start.append(start)
+        self.energy.append(energy)
+        self.last_closed = start
+        return start, energy
+
+    def _complete(self) -> tuple[float, float]:
+        """Move the open bucket to the completed ones and return it."""
+        bucket = self._append(self._open_start or 0.0, self._open_energy)
+        self._open_start = None
+        self._open_energy = 0.0
+        self._open_rows = 0
+        return bucket
+
+    def add(self, start: float, change: float) -> list[tuple[float, float]]:
+        """
+        Add a 5-minute row.
+
+        Args:
+            start: UTC timestamp of the row
+            change: Energy of the row
+
+        Returns:
+            The buckets the row completed, a row of a completed bucket sets
+            revised instead
+
+        """
+        if (self.period_start is not None and start < self.period_start) or (
+            self.last_start is not None and start <= self.last_start
+        ):
+            return []
+        self.last_start = start
+
+        bucket_start = start - start % QUARTER_HOUR_SECONDS
+        if self.last_closed is not None and bucket_start <= self.last_closed:
+            # Late row of a bucket close_before already completed
+            if bucket_start == self.last_closed and change:
+                self.energy[-1] += change
+                self.revised = True
+            return []
+
+        completed = []
+        if self._open_start is not None and bucket_start != self._open_start:
+            completed.append(self._complete())
+
+        self._open_start = bucket_start
+        self._open_energy += change
+        self._open_rows += 1
+        if self._open_rows >= ROWS_PER_QUARTER_HOUR:
+            completed.append(self._complete())
+        return completed
+
+    def extend(self, statistics: Iterable[StatisticsRow]) -> list[tuple[float, float]]:
+        """Add 5-minute rows sorted by start and return the completed buckets."""
+        completed = []
+        for row in statistics:
+            start = row["start"]
+            state = row.get("state")
+            if state is not None and (
+                self.reading_until is None or start >= self.reading_until
+            ):
+                self.reading = state
+                self.reading_until = start + SHORT_TERM_SECONDS
+            completed += self.add(start, row.get("change") or 0.0)
+        return completed
+
+    def open_energy(self, start: float) -> float:
+        """Return the energy so far of the bucket starting at a timestamp."""
+        return self._open_energy if self._open_start == start else 0.0
+
+    def close_before(self, timestamp: float) -> list[tuple[float, float]]:
+        """Complete the open bucket if it ended at or before a timestamp."""
+        if (
+            self._open_start is None
+            or self._open_start + QUARTER_HOUR_SECONDS > timestamp
+        ):
+            return []
+        return [self._complete()]
+
+    def fill_hours(
+        self, statistics: HourlySeries, short_term: list[StatisticsRow]
+    ) -> list[tuple[float, float]]:
+        """
+        Estimate the quarter-hours before the first 5-minute row.
+
+        Each whole hour is split into four buckets of equal energy, so the
+        estimated quarter-hours have the average power of their hour. When the
+        first row starts within an hour, the energy of the hour its 5-minute
+        rows miss is spread evenly over the 5-minute slots before it. Only an
+        empty buffer is filled.
+
+        Args:
+            statistics: Hourly rows of the billing period
+            short_term: 5-minute rows sorted by start, from the first one kept
+
+        Returns:
+            The estimated buckets
+
+        """
+        if not short_term or len(self) or self.last_start is not None:
+            return []
+
+        until = short_term[0]["start"]
+        hour_start = until - until % SECONDS_PER_HOUR
+        first = (
+            0 if self.period_start is None else statistics.index_at(self.period_start)
+        )
+        end = statistics.index_at(hour_start)
+        completed = [
+            self._append(
+                statistics.start[index] + quarter * QUARTER_HOUR_SECONDS,
+                statistics.change[index] / QUARTER_HOURS_PER_HOUR,
+            )
+            for index in range(first, end)
+            for quarter in range(QUARTER_HOURS_PER_HOUR)
+        ]
+        if completed:
+            self.estimated_until = hour_start
+            self.last_start = hour_start - SHORT_TERM_SECONDS
+
+        if until > hour_start and end < len(statistics):
+            hour = statistics[end]
+            if hour["start"] == hour_start:
+                hour_end = hour_start + SECONDS_PER_HOUR
+                seen = sum(
+                    row.get("change") or 0.0
+                    for row in short_term
+                    if row["start"] < hour_end
+                )
+                slots = int((until - hour_start) // SHORT_TERM_SECONDS)
+                energy = max((hour.get("change") or 0.0) - seen, 0.0) / slots
+                for slot in range(slots):
+                    completed += self.add(
+                        hour_start + slot * SHORT_TERM_SECONDS, energy
+                    )
+                self.estimated_until = until
+        return completed
+
+    def nbytes(self) -> int:
+        """Return the size of the bucket arrays in bytes."""
+        return (
+            self.start.buffer_info()[1] * self.start.itemsize
+            + self.energy.buffer_info()[1] * self.energy.itemsize
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the buffer as JSON serializable data."""
+        origin = self.period_start or 0.0
+        return {
+            "period_start": self.period_start,
+            # Buckets as quarter-hours since the period start
+            "quarters": [
+                round((start - origin) / QUARTER_HOUR_SECONDS) for start in self.start
+            ],
+            "energy": [round(energy, STORED_ENERGY_DECIMALS) for energy in self.energy],
+            "last_start": self.last_start,
+            "estimated_until": self.estimated_until,
+            "last_closed": self.last_closed,
+            "reading": (
+                [self.reading_until, self.reading] if self.reading is not None else None
+            ),
+            "open": (
+                [self._open_start, self._open_energy, self._open_rows]
+                if self._open_start is not None
+                else None
+            ),
+        }
+
+    def restore(self, data: dict[str, Any]) -> None:
+        """
+        Replace the buffer with data returned by as_dict.
+
+        Raises:
+            KeyError: If the data misses a field
+            TypeError: If a field has the wrong type
+            ValueError: If a field has an invalid value
+
+        """
+        period_start = data["period_start"]
+        quarters, energy = data["quarters"], data["energy"]
+        if len(quarters) != len(energy):
+            msg = "Quarter-hours and energy differ in length"
+            raise ValueError(msg)
+
+        self.clear(period_start)
+        origin = period_start or 0.0
+        self.start = array(
+            "d", (origin + quarter * QUARTER_HOUR_SECONDS for quarter in quarters)
+        )
+        self.energy = array("d", energy)
+        self.last_start = data["last_start"]
+        self.estimated_until = data["estimated_until"]
+        self.last_closed = data.get(
+            "last_closed", self.start[-1] if self.start else None
+        )
+        if data.get("reading") is not None:
+            self.reading_until, self.reading = data["reading"]
+        if data["open"] is not None:
+            open_start, open_energy, open_rows = data["open"]
+            self._open_start = float(open_start)
+            self._open_energy = float(open_energy)
+            self._open_rows = int(open_rows)
@@ -1,14 +1,127 @@
 """Module for defining time patterns for DSO tariffs."""
 
-from datetime import datetime, timedelta
+from datetime import UTC, date, datetime, time, timedelta, tzinfo
 from enum import Enum
 
 from homeassistant.util import dt as dt_util
 
+from custom_components.tariffiq.dso.helpers.local_calendar import local_hour
+
 ALL_HOURS = list(range(24))
 ALL_WEEKDAYS = list(range(7))  # 0=Monday, 6=Sunday
 ALL_MONTHS = list(range(1, 13))
 
+# Size of the compiled month x weekday x hour lookup tables
+SLOTS_PER_WEEKDAY = 24
+SLOTS_PER_MONTH = 7 * SLOTS_PER_WEEKDAY
+SLOT_COUNT = 12 * SLOTS_PER_MONTH
+
+FULL_DAY_MASK = (1 << 24) - 1
+
+# Upper bound of days visited when searching for the next transition. Whole
+# months without a match are skipped, so real searches visit far fewer days.
+MAX_TRANSITION_SEARCH_DAYS = 400
+
+
+def calendar_slot(month: int, weekday: int, hour: int) -> int:
+    """Return the index in a compiled lookup table for a calendar slot."""
+    return (month - 1) * SLOTS_PER_MONTH + weekday * SLOTS_PER_WEEKDAY + hour
+
+
+def _bitmask(values: list[int]) -> int:
+    """Return an integer with the bits for each value set."""
+    mask = 0
+    for value in values:
+        mask |= 1 << value
+    return mask
+
+
+def _nonexistent_hours(day: date, tz: tzinfo | None) -> int:
+    """Return a bitmask of the wall clock hours skipped on a DST change day."""
+    if tz is None:
+        return 0
+
+    day_start = datetime.combine(day, time(), tz)
+    next_day_start = datetime.combine(day + timedelta(days=1), time(), tz)
+    if day_start.utcoffset() == next_day_start.utcoffset():
+        return 0
+
+    mask = 0
+    for hour in ALL_HOURS:
+        wall_time = datetime.combine(day, time(hour), tz)
+        if wall_time.astimezone(UTC).astimezone(tz).hour != hour:
+            mask |= 1 << hour
+    return mask
+
+
+class TransitionIndex:
+    """
+    Precomputed index for jumping to the next change of an active state.
+
+    Built from a bitmask of active hours per (month, weekday). A search steps a
+    day at a time through months where the requested state occurs and skips
+    all other months, so it never inspects single hours.
+    """
+
+    def __init__(self, day_masks: tuple[int, ...]) -> None:
+        """Initialize the index from the active hours per (month, weekday)."""
+        inactive_masks = tuple(~mask & FULL_DAY_MASK for mask in day_masks)
+        self._day_masks = {True: day_masks, False: inactive_masks}
+        self._month_matches = {
+            state: tuple(
+                any(masks[(month - 1) * 7 : month * 7]) for month in ALL_MONTHS
+            )
+            for state, masks in self._day_masks.items()
+        }
+        # Without both active and inactive hours the state never changes
+        self.has_transitions = any(day_masks) and any(inactive_masks)
+
+    def next_hour(self, from_date: datetime, *, active: bool) -> datetime | None:
+        """
+        Find the first whole hour after from_date with the requested state.
+
+        Args:
+            from_date: Datetime to search from, the search starts at the next hour
+            active: Whether to search for the next active or inactive hour
+
+        Returns:
+            The matching hour in the timezone of from_date, or None if the
+            state never changes
+
+        """
+        if not self.has_transitions:
+            return None
+
+        day_masks = self._day_masks[active]
+        month_matches = self._month_matches[active]
+
+        tz = from_date.tzinfo
+        start = from_date.replace(minute=0, second=0, microsecond=0) + timedelta(
+            hours=1
+        )
+        day = start.date()
+        first_hour = start.hour
+
+        for _ in range(MAX_TRANSITION_SEARCH_DAYS):
+            if not month_matches[day.month - 1]:
+                # Nothing matches this month, continue at the first of next month
+                day = date(day.year + day.month // 12, day.month % 12 + 1, 1)
+                first_hour = 0
+                continue
+
+            mask = day_masks[(day.month - 1) * 7 + day.weekday()]
+            mask &= ~((1 << first_hour) - 1)
+            if mask:
+                mask &= ~_nonexistent_hours(day, tz)
+            if mask:
+                hour = (mask & -mask).bit_length() - 1
+                return datetime.combine(day, time(hour), tz)
+
+            day += timedelta(days=1)
+            first_hour = 0
+
+        return None
+
 
 class CalendarPeriods(Enum):
     """Enumeration for calendar periods used in time patterns."""
@@ -45,44 +158,46 @@ class TimePattern:
         self.weekday = time_filters.get(CalendarPeriods.Weekday) or ALL_WEEKDAYS
         self.month = time_filters.get(CalendarPeriods.Month) or ALL_MONTHS
 
-    def active(self, date: datetime | None = None) -> bool:
-        """Check if a given datetime matches the time pattern."""
-        if date is None:
-            date = dt_util.now()
+        self._hour_mask = _bitmask(self.hour)
+        self._weekday_mask = _bitmask(self.weekday)
+        self._month_mask = _bitmask(self.month)
+        self._transitions = TransitionIndex(
+            tuple(
+                self._hour_mask
+                if month in self.month and weekday in self.weekday
+                else 0
+                for month in ALL_MONTHS
+                for weekday in ALL_WEEKDAYS
+            )
+        )
 
-        return (
-            date.hour in self.hour
-            and date.weekday() in self.weekday
-            and date.month in self.month
+    def active_at(self, month: int, weekday: int, hour: int) -> bool:
+        """Check if a calendar slot matches the time pattern."""
+        return bool(
+            (self._hour_mask >> hour)
+            & (self._weekday_mask >> weekday)
+            & (self._month_mask >> month)
+            & 1
         )
 
-    def starts_at(self, from_date: datetime | None = None) -> datetime:
+    def active(self, date: datetime | float | None = None) -> bool:
+        """Check if a datetime or UTC timestamp matches the time pattern."""
+        calendar = local_hour(date)
+        return self.active_at(calendar.month, calendar.weekday, calendar.hour)
+
+    def starts_at(self, from_date: datetime | None = None) -> datetime | None:
         """Get the next datetime when the time pattern becomes active."""
         if from_date is None:
             from_date = dt_util.now()
 
-        check_date = from_date.replace(minute=0, second=0, microsecond=0) + timedelta(
-            hours=1
-        )
+        return self._transitions.next_hour(from_date, active=True)
 
-        while True:
-            if self.active(check_date):
-                return check_date
-            check_date += timedelta(hours=1)
-
-    def ends_at(self, from_date: datetime | None = None) -> datetime:
+    def ends_at(self, from_date: datetime | None = None) -> datetime | None:
         """Get the datetime when the time pattern ends."""
         if from_date is None:
             from_date = dt_util.now()
 
-        check_date = from_date.replace(minute=0, second=0, microsecond=0) + timedelta(
-            hours=1
-        )
-
-        while True:
-            if not self.active(check_date):
-                return check_date
-            check_date += timedelta(hours=1)
+        return self._transitions.next_hour(from_date, active=False)
 
 
 class TariffSchedule:
@@ -105,63 +220,89 @@ class TariffSchedule:
             self.weekday = list(set(self.weekday) | set(pattern.weekday))
             self.month = list(set(self.month) | set(pattern.month))
 
+        self._compile()
+
+    def _compile(self) -> None:
+        """
+        Compile the time patterns into dense month x weekday x hour tables.
+
+        pattern_table holds the index + 1 of the first matching time pattern
+        (0 when no pattern matches), filter_table is 1 for slots within the
+        combined months, weekdays and hours of all patterns.
+        """
+        pattern_table = bytearray(SLOT_COUNT)
+        filter_table = bytearray(SLOT_COUNT)
+        hours = set(self.hour)
+        weekdays = set(self.weekday)
+        months = set(self.month)
+
+        for month in ALL_MONTHS:
+            for weekday in ALL_WEEKDAYS:
+                for hour in ALL_HOURS:
+                    slot = calendar_slot(month, weekday, hour)
+                    filter_table[slot] = (
+                        month in months and weekday in weekdays and hour in hours
+                    )
+                    for index, pattern in enumerate(self.timepatterns, start=1):
+                        if pattern.active_at(month, weekday, hour):
+                            pattern_table[slot] = index
+                            break
+
+        self.pattern_table = bytes(pattern_table)
+        self.filter_table = bytes(filter_table)
+
+        # Active hours per (month, weekday), used to jump to the next transition
+        self._transitions = TransitionIndex(
+            tuple(
+                sum(
+                    1 << hour
+                    for hour in ALL_HOURS
+                    if pattern_table[calendar_slot(month, weekday, hour)]
+                )
+                for month in ALL_MONTHS
+                for weekday in ALL_WEEKDAYS
+            )
+        )
+
     def get_timepatterns(self) -> list[TimePattern]:
         """Get all TimePatterns in the TariffSchedule."""
         return self.timepatterns
 
-    def active_timepattern(self, date: datetime | None = None) -> TimePattern | None:
-        """Get the active TimePattern for a given datetime."""
-        if date is None:
-            date = dt_util.now()
+    def active_timepattern(
+        self, date: datetime | float | None = None
+    ) -> TimePattern | None:
+        """Get the active TimePattern for a datetime or UTC timestamp."""
+        calendar = local_hour(date)
+        return self.timepattern_at(calendar.month, calendar.weekday, calendar.hour)
 
-        for timepattern in self.timepatterns:
-            if timepattern.active(date):
-                return timepattern
+    def timepattern_at(self, month: int, weekday: int, hour: int) -> TimePattern | None:
+        """Get the active TimePattern for a calendar slot."""
+        index = self.pattern_table[calendar_slot(month, weekday, hour)]
+        return self.timepatterns[index - 1] if index else None
 
-        return None
+    def active_at(self, month: int, weekday: int, hour: int) -> bool:
+        """Check if any time pattern is active for a calendar slot."""
+        return self.pattern_table[calendar_slot(month, weekday, hour)] != 0
+
+    def in_filter(self, month: int, weekday: int, hour: int) -> bool:
+        """Check if a calendar slot is within the schedule's months, days and hours."""
+        return self.filter_table[calendar_slot(month, weekday, hour)] != 0
 
-    def active(self, date: datetime | None = None) -> bool:
-        """Check if any time pattern is active for a given datetime."""
-        return self.active_timepattern(date) is not None
+    def active(self, date: datetime | float | None = None) -> bool:
+        """Check if any time pattern is active for a datetime or UTC timestamp."""
+        calendar = local_hour(date)
+        return self.active_at(calendar.month, calendar.weekday, calendar.hour)
 
     def starts_at(self, from_date: datetime | None = None) -> datetime | None:
         """Get the next datetime when the time pattern becomes active."""
-        if (
-            self.hour == ALL_HOURS
-            and self.weekday == ALL_WEEKDAYS
-            and self.month == ALL_MONTHS
-        ):
-            return None
-
         if from_date is None:
             from_date = dt_util.now()
 
-        check_date = from_date.replace(minute=0, second=0, microsecond=0) + timedelta(
-            hours=1
-        )
-
-        while True:
-            if self.active(check_date):
-                return check_date
-            check_date += timedelta(hours=1)
+        return self._transitions.next_hour(from_date, active=True)
 
     def ends_at(self, from_date: datetime | None = None) -> datetime | None:
         """Get the datetime when the time pattern ends."""
-        if (
-            self.hour == ALL_HOURS
-            and self.weekday == ALL_WEEKDAYS
-            and self.month == ALL_MONTHS
-        ):
-            return None
-
         if from_date is None:
             from_date = dt_util.now()
 
-        check_date = from_date.replace(minute=0, second=0, microsecond=0) + timedelta(
-            hours=1
-        )
-
-        while True:
-            if not self.active(check_date):
-                return check_date
-            check_date += timedelta(hours=1)
+        return self._transitions.next_hour(from_date, active=False)
@@ -0,0 +1,156 @@
+"""
+Effective-dated tariff versions for TariffIQ.
+
+A DSO changes its fees and sometimes its schedule over time. Each version is
+valid from a point in time until the next one starts, and the versions are
+kept sorted by start so a timestamp maps to its version by bisection and a
+chronological series of hourly rows is split by version with one bisection
+per version boundary.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_right
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import TYPE_CHECKING
+
+from homeassistant.util import dt as dt_util
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+    from datetime import datetime
+
+    from custom_components.tariffiq.dso.helpers.hourly_series import HourlySeries
+    from custom_components.tariffiq.dso.helpers.tariff_schedule import (
+        TariffSchedule,
+    )
+
+
+def freeze_fees(
+    fees: Mapping[str, Mapping[str, float]],
+) -> Mapping[str, Mapping[str, float]]:
+    """Return a read-only copy of a fee table keyed by fuse size."""
+    return MappingProxyType(
+        {
+            fuse_size: MappingProxyType(dict(values))
+            for fuse_size, values in fees.items()
+        }
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class TariffVersion:
+    """Fees and schedule of a DSO valid from a point in time."""
+
+    valid_from: float | None  # UTC timestamp, None for the first version
+    fees: Mapping[str, Mapping[str, float]]  # Fuse size: fees
+    tariff_schedule: TariffSchedule
+
+
+class TariffVersions:
+    """Sorted interval index of the tariff versions of a DSO."""
+
+    def __init__(self, versions: list[TariffVersion]) -> None:
+        """
+        Initialize the index.
+
+        Args:
+            versions: Tariff versions, exactly one of them without valid_from
+
+        Raises:
+            ValueError: If there is not exactly one open-ended first version or
+                        two versions start at the same time
+
+        """
+        first = [version for version in versions if version.valid_from is None]
+        dated = sorted(
+            (version for version in versions if version.valid_from is not None),
+            key=lambda version: version.valid_from or 0.0,
+        )
+        if len(first) != 1:
+            msg = "Exactly one tariff version must be valid without a start date"
+            raise ValueError(msg)
+
+        self.versions: tuple[TariffVersion, ...] = (first[0], *dated)
+        # Start of each version, the first one covers everything before
+        self._starts: list[float] = [float("-inf")] + [
+            version.valid_from or 0.0 for version in dated
+        ]
+        if len(set(self._starts)) != len(self._starts):
+            msg = "Two tariff versions cannot start at the same time"
+            raise ValueError(msg)
+
+    def __len__(self) -> int:
+        """Return the number of versions."""
+        return len(self.versions)
+
+    @property
+    def latest(self) -> TariffVersion:
+        """Return the version with the latest start."""
+        return self.versions[-1]
+
+    def at(self, when: datetime | float | None = None) -> TariffVersion:
+        """
+        Return the version in effect at a point in time.
+
+        Args:
+            when: Datetime or UTC timestamp, None for now
+
+        Returns:
+            The tariff version valid at that time
+
+        """
+        if when is None:
+            when = dt_util.utcnow()
+        timestamp = when if isinstance(when, (int, float)) else when.timestamp()
+        return self.versions[bisect_right(self._starts, timestamp) - 1]
+
+    def next_start(self, when: datetime | float | None = None) -> float | None:
+        """
+        Return when the version following the one in effect starts.
+
+        Args:
+            when: Datetime or UTC timestamp, None for now
+
+        Returns:
+            UTC timestamp of the next version, None if no later version exists
+
+        """
+        if when is None:
+            when = dt_util.utcnow()
+        timestamp = when if isinstance(when, (int, float)) else when.timestamp()
+        index = bisect_right(self._starts, timestamp)
+        return self._starts[index] if index < len(self._starts) else None
+
+    def slices(self, statistics: HourlySeries) -> list[tuple[TariffVersion, int, int]]:
+        """
+        Split chronological rows by the version in effect at their start.
+
+        Args:
+            statistics: Hourly rows sorted by start
+
+        Returns:
+            (version, first, end) for each version with rows, where
+            statistics[first:end] are the rows of that version
+
+        """
+        if not statistics:
+            return []
+        if len(self.versions) == 1:
+            return [(self.versions[0], 0, len(statistics))]
+
+        result = []
+        first_version = bisect_right(self._starts, statistics.start[0]) - 1
+        last_version = bisect_right(self._starts, statistics.start[-1]) - 1
+        first = 0
+        for index in range(first_version, last_version + 1):
+            if index < last_version:
+                end = statistics.index_at(self._starts[index + 1])
+            else:
+                end = len(statistics)
+            if end > first:
+                result.append((self.versions[index], first, end))
+            first = end
+
+        return result
@@ -0,0 +1,66 @@
+"""
+Index of the DSOs shipped with TariffIQ.
+
+The config flow only needs names, fuse sizes and currencies. Those are read
+from the tariff definition files in one scan, without validating or
+compiling them, and the full definition of a DSO is loaded on demand. Each
+entry is checked against its compiled class when the definition is loaded.
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from pathlib import Path
+
+from custom_components.tariffiq.helpers import LOGGER
+
+TARIFFS_DIR = Path(__file__).parent / "tariffs"
+
+
+@dataclass(frozen=True, slots=True)
+class DSOIndexEntry:
+    """Metadata of a DSO that can be read without loading its definition."""
+
+    name: str
+    definition: str
+    class_name: str
+    currency: str
+    fuse_sizes: tuple[str, ...]
+
+
+def _class_name(definition: str) -> str:
+    """Return the name of the class compiled from a definition file."""
+    return "".join(part.capitalize() for part in definition.split("_")) + "DSO"
+
+
+def scan_definitions(tariffs_dir: Path = TARIFFS_DIR) -> tuple[DSOIndexEntry, ...]:
+    """
+    Build the DSO index from the tariff definition files.
+
+    Does blocking file I/O and must not be called from the event loop.
+
+    Args:
+        tariffs_dir: Folder of the tariff definition files
+
+    Returns:
+        An entry for each readable definition, sorted by file name
+
+    """
+    entries = []
+    for path in sorted(tariffs_dir.glob("*.json")):
+        try:
+            definition = json.loads(path.read_bytes())
+            entry = DSOIndexEntry(
+                name=definition["name"],
+                definition=path.stem,
+                class_name=_class_name(path.stem),
+                currency=definition["currency"],
+                fuse_sizes=tuple(definition["fees"]),
+            )
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            LOGGER.warning("Could not index DSO definition %s: %s", path.name, e)
+            continue
+        entries.append(entry)
+
+    return tuple(entries)
@@ -1,11 +1,20 @@
 """Top Peak Once Per Day Average DSO pricing model."""
 
 from datetime import datetime
-from typing import ClassVar
+from typing import Any, ClassVar
 
 from homeassistant.components.recorder.statistics import StatisticsRow
-from homeassistant.util import dt as dt_util
 
+from custom_components.tariffiq.dso.helpers.columnar import (
+    StatisticsColumns,
+    daily_max_indices,
+    top_candidates,
+)
+from custom_components.tariffiq.dso.helpers.hourly_series import HourlySeries
+from custom_components.tariffiq.dso.helpers.peak_tracker import (
+    DailyPeaksTracker,
+    PeakTracker,
+)
 from custom_components.tariffiq.dso.models.modelbase import ModelBase
 
 
@@ -15,57 +24,48 @@ class AverageOfXDaysModel(ModelBase):
     count_top_peaks: ClassVar[int] = 3
 
     @classmethod
-    def peak_value(cls, statistics: list[StatisticsRow]) -> float:
-        """Return the peak value for the model."""
-        observed_peaks = cls.observed_peak(statistics)
-        if not observed_peaks:
-            return 0.0
-
-        # Extract float values from dictionaries and sort in descending order
-        peak_values = [next(iter(peak.values())) for peak in observed_peaks]
-        sorted_peaks = sorted(peak_values, reverse=True)
-        top_peaks = sorted_peaks[: cls.count_top_peaks]
-
-        return sum(top_peaks) / len(top_peaks)
+    def create_peak_tracker(cls) -> DailyPeaksTracker:
+        """Return an empty peak tracker for the model."""
+        return DailyPeaksTracker(cls.count_top_peaks)
 
     @classmethod
-    def observed_peak(
-        cls, statistics: list[StatisticsRow]
-    ) -> list[dict[datetime, float]]:
-        """Return the peak values for the model."""
-        filtered_stats = cls._filter_statistics(
-            statistics,
-            months=set(cls.tariff_schedule.month),
-            weekdays=set(cls.tariff_schedule.weekday),
-            hours=set(cls.tariff_schedule.hour),
-        )
-
-        daily_peaks = {}
-        for stat in filtered_stats:
-            change = stat.get("change", 0.0) or 0.0
-
+    def track_statistics(
+        cls, tracker: PeakTracker, statistics: HourlySeries | list[StatisticsRow]
+    ) -> None:
+        """Feed closed hourly rows to a peak tracker."""
+        statistics = HourlySeries.from_rows(statistics)
+        if cls._use_columnar(statistics):
+            statistics = cls._peak_candidates(statistics)
+
+        scheduled = cls._filter_scheduled_statistics(statistics)
+        for start, change in zip(scheduled.start, scheduled.change, strict=True):
             if change == 0.0:  # Skip zero change entries
                 continue
 
-            start_time = datetime.fromtimestamp(
-                stat.get("start", 0.0), dt_util.DEFAULT_TIME_ZONE
-            )
+            tracker.add(start, change)
 
-            date_key = start_time.date()
-            if date_key not in daily_peaks or change > daily_peaks[date_key]["change"]:
-                daily_peaks[date_key] = {"datetime": start_time, "change": change}
+    @classmethod
+    def candidate_indices(cls, columns: StatisticsColumns, rows: Any) -> Any:
+        """Return the daily maximum rows that can be among the top days, in order."""
+        days = columns.calendar()[0][rows]
 
-        peaks = [
-            {peak_data["datetime"]: peak_data["change"]}
-            for peak_data in daily_peaks.values()
+        day_max_rows = rows[daily_max_indices(days, columns.change[rows])]
+        return day_max_rows[
+            top_candidates(columns.change[day_max_rows], cls.count_top_peaks)
         ]
 
-        selected_peaks = sorted(
-            peaks,
-            key=lambda peak: next(iter(peak.values())),
-            reverse=True,
-        )[: cls.count_top_peaks]
+    @classmethod
+    def peak_value(cls, statistics: HourlySeries | list[StatisticsRow]) -> float:
+        """Return the peak value for the model."""
+        tracker = cls.create_peak_tracker()
+        cls.track_statistics(tracker, statistics)
+        return tracker.peak_value()
 
-        return sorted(
-            selected_peaks, key=lambda peak: next(iter(peak.keys())), reverse=True
-        )
+    @classmethod
+    def observed_peak(
+        cls, statistics: HourlySeries | list[StatisticsRow]
+    ) -> list[dict[datetime, float]]:
+        """Return the peak values for the model."""
+        tracker = cls.create_peak_tracker()
+        cls.track_statistics(tracker, statistics)
+        return tracker.observed_peak()
@@ -1,13 +1,25 @@
 """Top Peaks Average DSO model."""
 
 from datetime import datetime
-from typing import ClassVar
+from typing import Any, ClassVar
 
 from homeassistant.components.recorder.statistics import StatisticsRow
-from homeassistant.util import dt as dt_util
 
+from custom_components.tariffiq.dso.helpers.columnar import (
+    StatisticsColumns,
+    top_candidates,
+)
+from custom_components.tariffiq.dso.helpers.hourly_series import HourlySeries
+from custom_components.tariffiq.dso.helpers.peak_tracker import (
+    PeakTracker,
+    TopPeaksTracker,
+)
 from custom_components.tariffiq.dso.models.modelbase import ModelBase
 
+# Peaks are rounded to two decimals, so values this close to the top peaks
+# may still tie with them after rounding
+ROUNDING_MARGIN = 0.01
+
 
 class AverageOfXHoursModel(ModelBase):
     """Top Peaks Average DSO model."""
@@ -15,49 +27,47 @@ class AverageOfXHoursModel(ModelBase):
     count_top_peaks: ClassVar[int] = 3
 
     @classmethod
-    def peak_value(cls, statistics: list[StatisticsRow]) -> float:
-        """Return the peak value for the model."""
-        observed_peaks = cls.observed_peak(statistics)
-        if not observed_peaks:
-            return 0.0
-
-        # Extract float values from dictionaries and sort in descending order
-        peak_values = [next(iter(peak.values())) for peak in observed_peaks]
-        sorted_peaks = sorted(peak_values, reverse=True)
-        top_peaks = sorted_peaks[: cls.count_top_peaks]
-
-        return sum(top_peaks) / len(top_peaks)
+    def create_peak_tracker(cls) -> TopPeaksTracker:
+        """Return an empty peak tracker for the model."""
+        return TopPeaksTracker(cls.count_top_peaks)
 
     @classmethod
-    def observed_peak(
-        cls, statistics: list[StatisticsRow]
-    ) -> list[dict[datetime, float]]:
-        """Return the peak values for the model."""
-        filtered_stats = cls._filter_statistics(
-            statistics,
-            months=set(cls.tariff_schedule.month),
-            weekdays=set(cls.tariff_schedule.weekday),
-            hours=set(cls.tariff_schedule.hour),
-        )
-
-        peaks = []
-        for stat in filtered_stats:
-            change = stat.get("change", 0.0) or 0.0
+    def track_statistics(
+        cls, tracker: PeakTracker, statistics: HourlySeries | list[StatisticsRow]
+    ) -> None:
+        """Feed closed hourly rows to a peak tracker."""
+        statistics = HourlySeries.from_rows(statistics)
+        if cls._use_columnar(statistics):
+            statistics = cls._peak_candidates(statistics)
 
+        scheduled = cls._filter_scheduled_statistics(statistics)
+        for start, change in zip(scheduled.start, scheduled.change, strict=True):
             if change == 0.0:  # Skip zero change entries
                 continue
 
-            start_time = datetime.fromtimestamp(
-                stat.get("start", 0.0), dt_util.DEFAULT_TIME_ZONE
+            tracker.add(start, round(change, 2))
+
+    @classmethod
+    def candidate_indices(cls, columns: StatisticsColumns, rows: Any) -> Any:
+        """Return the scheduled rows that can be among the top peaks, in order."""
+        return rows[
+            top_candidates(
+                columns.change[rows], cls.count_top_peaks, margin=ROUNDING_MARGIN
             )
-            peaks.append({start_time: round(change, 2)})
+        ]
 
-        selected_peaks = sorted(
-            peaks,
-            key=lambda peak: next(iter(peak.values())),
-            reverse=True,
-        )[: cls.count_top_peaks]
+    @classmethod
+    def peak_value(cls, statistics: HourlySeries | list[StatisticsRow]) -> float:
+        """Return the peak value for the model."""
+        tracker = cls.create_peak_tracker()
+        cls.track_statistics(tracker, statistics)
+        return tracker.peak_value()
 
-        return sorted(
-            selected_peaks, key=lambda peak: next(iter(peak.keys())), reverse=True
-        )
+    @classmethod
+    def observed_peak(
+        cls, statistics: HourlySeries | list[StatisticsRow]
+    ) -> list[dict[datetime, float]]:
+        """Return the peak values for the model."""
+        tracker = cls.create_peak_tracker()
+        cls.track_statistics(tracker, statistics)
+        return tracker.observed_peak()
@@ -0,0 +1,147 @@
+"""Top Quarter-Hour Peaks Average DSO pricing model."""
+
+from collections.abc import Iterable
+from datetime import datetime
+from typing import Any, ClassVar
+
+from homeassistant.components.recorder.statistics import StatisticsRow
+
+from custom_components.tariffiq.dso.helpers.columnar import (
+    StatisticsColumns,
+    daily_max_indices,
+    top_candidates,
+)
+from custom_components.tariffiq.dso.helpers.hourly_series import HourlySeries
+from custom_components.tariffiq.dso.helpers.local_calendar import local_hour
+from custom_components.tariffiq.dso.helpers.peak_tracker import (
+    DailyPeaksTracker,
+    PeakTracker,
+    TopPeaksTracker,
+)
+from custom_components.tariffiq.dso.helpers.quarter_hours import (
+    QUARTER_HOURS_PER_HOUR,
+)
+from custom_components.tariffiq.dso.models.modelbase import ModelBase
+
+# Peaks are rounded to two decimals, so values this close to the top peaks
+# may still tie with them after rounding
+ROUNDING_MARGIN = 0.01
+
+
+class AverageOfXQuarterHoursModel(ModelBase):
+    """
+    Top Quarter-Hour Peaks Average DSO pricing model.
+
+    Peaks are the average power of a quarter-hour in kW, its energy times
+    four. With one_peak_per_day only the highest quarter-hour of each day
+    counts like in AverageOfXDaysModel, otherwise the peaks are rounded to
+    two decimals like in AverageOfXHoursModel.
+
+    The quarter-hours come from the 5-minute statistics through a
+    QuarterHourBuffer. Hourly rows, as used by backtests, count with the
+    average power of the hour, a lower bound of its highest quarter-hour.
+    """
+
+    count_top_peaks: ClassVar[int] = 3
+    one_peak_per_day: ClassVar[bool] = False
+    tracks_quarter_hours: ClassVar[bool] = True
+    peak_periods_per_hour: ClassVar[int] = QUARTER_HOURS_PER_HOUR
+
+    @classmethod
+    def create_peak_tracker(cls) -> PeakTracker:
+        """Return an empty peak tracker for the model."""
+        if cls.one_peak_per_day:
+            return DailyPeaksTracker(cls.count_top_peaks)
+        return TopPeaksTracker(cls.count_top_peaks)
+
+    @classmethod
+    def _peak(cls, power: float) -> float:
+        """Return the value a peak of an average power is tracked with."""
+        return power if cls.one_peak_per_day else round(power, 2)
+
+    @classmethod
+    def track_statistics(
+        cls, tracker: PeakTracker, statistics: HourlySeries | list[StatisticsRow]
+    ) -> None:
+        """Feed closed hourly rows to a peak tracker."""
+        statistics = HourlySeries.from_rows(statistics)
+        if cls._use_columnar(statistics):
+            statistics = cls._peak_candidates(statistics)
+
+        scheduled = cls._filter_scheduled_statistics(statistics)
+        for start, change in zip(scheduled.start, scheduled.change, strict=True):
+            if change == 0.0:  # Skip zero change entries
+                continue
+
+            tracker.add(start, cls._peak(change))
+
+    @classmethod
+    def track_quarter_hours(
+        cls, tracker: PeakTracker, quarter_hours: Iterable[tuple[float, float]]
+    ) -> None:
+        """
+        Feed completed quarter-hours to a peak tracker.
+
+        Args:
+            tracker: Peak tracker for the current billing period
+            quarter_hours: (start, energy) of the quarter-hours in order
+
+        """
+        for start, energy in quarter_hours:
+            tracker.last_start = start
+            if energy == 0.0:  # Skip zero change entries
+                continue
+
+            calendar = local_hour(start)
+            schedule = cls.tariff_versions.at(start).tariff_schedule
+            if schedule.in_filter(calendar.month, calendar.weekday, calendar.hour):
+                tracker.add(start, cls._peak(energy * QUARTER_HOURS_PER_HOUR))
+
+    def update_quarter_hours(
+        self, quarter_hours: Iterable[tuple[float, float]], *, rebuild: bool = False
+    ) -> None:
+        """
+        Feed completed quarter-hours to the peak tracker.
+
+        Args:
+            quarter_hours: (start, energy) of the quarter-hours in order
+            rebuild: Clear the tracker first, to rebuild it from all
+                     quarter-hours of the billing period
+
+        """
+        if self.peak_tracker is None:
+            return
+
+        if rebuild:
+            self.peak_tracker.clear()
+        self.track_quarter_hours(self.peak_tracker, quarter_hours)
+
+    @classmethod
+    def candidate_indices(cls, columns: StatisticsColumns, rows: Any) -> Any:
+        """Return the scheduled rows that can set the peaks, in order."""
+        if cls.one_peak_per_day:
+            days = columns.calendar()[0][rows]
+            rows = rows[daily_max_indices(days, columns.change[rows])]
+            return rows[top_candidates(columns.change[rows], cls.count_top_peaks)]
+
+        return rows[
+            top_candidates(
+                columns.change[rows], cls.count_top_peaks, margin=ROUNDING_MARGIN
+            )
+        ]
+
+    @classmethod
+    def peak_value(cls, statistics: HourlySeries | list[StatisticsRow]) -> float:
+        """Return the peak value for the model."""
+        tracker = cls.create_peak_tracker()
+        cls.track_statistics(tracker, statistics)
+        return tracker.peak_value()
+
+    @classmethod
+    def observed_peak(
+        cls, statistics: HourlySeries | list[StatisticsRow]
+    ) -> list[dict[datetime, float]]:
+        """Return the peak values for the model."""
+        tracker = cls.create_peak_tracker()
+        cls.track_statistics(tracker, statistics)
+        return tracker.observed_peak()
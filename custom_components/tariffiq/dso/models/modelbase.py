@@ -1,75 +1,203 @@
 """Base model classes for DSO (Distribution System Operator) pricing models."""
 
+import copy
 from abc import ABC, abstractmethod
-from datetime import date, datetime
-from typing import ClassVar
+from datetime import datetime
+from typing import Any, ClassVar
 
 from homeassistant.components.recorder.statistics import StatisticsRow
 
-from custom_components.tariffiq.const import LOGGER, NOTIMPLEMENTED_MSG
+from custom_components.tariffiq.const import NOTIMPLEMENTED_MSG
+from custom_components.tariffiq.dso.helpers.columnar import (
+    COLUMNAR_MIN_ROWS,
+    NUMPY_AVAILABLE,
+    StatisticsColumns,
+    table_lookup,
+)
+from custom_components.tariffiq.dso.helpers.hourly_series import HourlySeries
+from custom_components.tariffiq.dso.helpers.local_calendar import local_hour
+from custom_components.tariffiq.dso.helpers.peak_tracker import PeakTracker
 from custom_components.tariffiq.dso.helpers.tariff_schedule import TariffSchedule
+from custom_components.tariffiq.dso.helpers.tariff_versions import TariffVersions
 
 
 class ModelBase(ABC):
-    """Base class for DSO pricing models."""
+    """
+    Base class for DSO pricing models.
+
+    A DSO class combines a model with DSOBase, the model first so its peak
+    tracking overrides the hooks of DSOBase.
+    """
 
     tariff_schedule: ClassVar[TariffSchedule]
+    tariff_versions: ClassVar[TariffVersions]
+
+    peak_tracker: PeakTracker | None
 
     @classmethod
     @abstractmethod
-    def peak_value(cls, statistics: dict[str, list[StatisticsRow]]) -> float:
+    def peak_value(cls, statistics: HourlySeries | list[StatisticsRow]) -> float:
         """Return the peak value for the model."""
         raise NotImplementedError(NOTIMPLEMENTED_MSG)
 
     @classmethod
     @abstractmethod
     def observed_peak(
-        cls, statistics: dict[str, list[StatisticsRow]]
-    ) -> list[dict[str, float]]:
+        cls, statistics: HourlySeries | list[StatisticsRow]
+    ) -> list[dict[datetime, float]]:
         """Return the peak values for the model."""
         raise NotImplementedError(NOTIMPLEMENTED_MSG)
 
     @classmethod
-    def _filter_statistics(
+    @abstractmethod
+    def create_peak_tracker(cls) -> PeakTracker:
+        """Return an empty peak tracker for the model."""
+        raise NotImplementedError(NOTIMPLEMENTED_MSG)
+
+    @classmethod
+    @abstractmethod
+    def track_statistics(
+        cls, tracker: PeakTracker, statistics: HourlySeries | list[StatisticsRow]
+    ) -> None:
+        """Feed closed hourly rows to a peak tracker."""
+        raise NotImplementedError(NOTIMPLEMENTED_MSG)
+
+    @classmethod
+    def update_peak_tracker(
+        cls,
+        tracker: PeakTracker,
+        statistics: HourlySeries | list[StatisticsRow],
+        generation: int | None = None,
+    ) -> None:
+        """
+        Feed the rows a peak tracker has not seen yet.
+
+        Args:
+            tracker: Peak tracker for the current billing period
+            statistics: All closed hourly rows of the current billing period
+            generation: Version of the rows, when it changes the rows have been
+                        replaced and the tracker is rebuilt from all of them
+
+        """
+        statistics = HourlySeries.from_rows(statistics)
+        if generation != tracker.generation:
+            tracker.clear()
+            tracker.generation = generation
+            rows = statistics
+        else:
+            rows = tracker.unseen(statistics)
+
+        if not rows:
+            return
+
+        cls.track_statistics(tracker, rows)
+        tracker.last_start = rows.start[-1]
+
+    @classmethod
+    def pending_rows(
         cls,
-        statistics: list[StatisticsRow],
-        months: set[int] | None = None,
-        weekdays: set[int] | None = None,
-        hours: set[int] | None = None,
-    ) -> list[StatisticsRow]:
+        tracker: PeakTracker,
+        statistics: HourlySeries | list[StatisticsRow],
+        generation: int | None = None,
+    ) -> int:
+        """Return the number of rows update_peak_tracker would feed to a tracker."""
+        if generation != tracker.generation:
+            return len(statistics)
+        return len(tracker.unseen(HourlySeries.from_rows(statistics)))
+
+    def update_peaks(
+        self,
+        statistics: HourlySeries | list[StatisticsRow],
+        generation: int | None = None,
+    ) -> None:
+        """Feed the closed hourly rows of the billing period to the peak tracker."""
+        if self.peak_tracker is not None:
+            self.update_peak_tracker(self.peak_tracker, statistics, generation)
+
+    def pending_peak_rows(
+        self,
+        statistics: HourlySeries | list[StatisticsRow],
+        generation: int | None = None,
+    ) -> int:
+        """Return the number of rows update_peaks would feed to the peak tracker."""
+        if self.peak_tracker is None:
+            return 0
+        return self.pending_rows(self.peak_tracker, statistics, generation)
+
+    def updated_peak_tracker(
+        self,
+        statistics: HourlySeries | list[StatisticsRow],
+        generation: int | None = None,
+    ) -> PeakTracker | None:
+        """
+        Return a copy of the peak tracker fed with the closed hourly rows.
+
+        Unlike update_peaks this leaves the tracker in use untouched, so it can
+        run in an executor while the event loop keeps reading the tracker.
+        """
+        if self.peak_tracker is None:
+            return None
+
+        tracker = copy.deepcopy(self.peak_tracker)
+        self.update_peak_tracker(tracker, statistics, generation)
+        return tracker
+
+    @classmethod
+    @abstractmethod
+    def candidate_indices(cls, columns: StatisticsColumns, rows: Any) -> Any:
         """
-        Filter statistics by months, days of week, and hours.
+        Return the rows that can set the peaks, without the rest.
 
         Args:
-            statistics: List of StatisticsRow objects
-            months: Set of months (1-12) to include, None for all
-            weekdays: Set of weekdays (0=Monday, 6=Sunday) to include, None for all
-            hours: Set of hours (0-23) to include, None for all
+            columns: Columns of the statistics
+            rows: Ascending indices of the rows within the schedule
 
         Returns:
-            Filtered list of StatisticsRow objects
+            Ascending indices, a subset of rows
 
         """
-        filtered = []
+        raise NotImplementedError(NOTIMPLEMENTED_MSG)
 
-        for stat in statistics:
-            start_time = datetime.fromtimestamp(stat.get("start", 0.0))  # noqa: DTZ006
-            if start_time is None or not isinstance(start_time, (datetime, date)):
-                LOGGER.debug("Skipping statistic with invalid start time: %s", stat)
-                continue
+    @classmethod
+    def _peak_candidates(cls, statistics: HourlySeries) -> HourlySeries:
+        """Return the rows that can set the peaks, in order."""
+        columns = StatisticsColumns.from_series(statistics)
+        rows = cls.scheduled_mask(columns, statistics).nonzero()[0]
+        return statistics.take(cls.candidate_indices(columns, rows))
 
-            # Check month filter
-            if months is not None and start_time.month not in months:
-                continue
+    @classmethod
+    def _filter_scheduled_statistics(cls, statistics: HourlySeries) -> HourlySeries:
+        """
+        Filter statistics to the months, weekdays and hours of the schedule.
 
-            # Check weekday filter (0=Monday, 6=Sunday)
-            if weekdays is not None and start_time.weekday() not in weekdays:
-                continue
+        Each row is matched against the schedule of the tariff version in
+        effect at its start.
+        """
+        filtered = []
+        starts = statistics.start
+        for version, first, end in cls.tariff_versions.slices(statistics):
+            in_filter = version.tariff_schedule.in_filter
+            for index in range(first, end):
+                calendar = local_hour(starts[index])
+                if in_filter(calendar.month, calendar.weekday, calendar.hour):
+                    filtered.append(index)
 
-            # Check hour filter
-            if hours is not None and start_time.hour not in hours:
-                continue
+        return statistics.take(filtered)
 
-            filtered.append(stat)
+    @classmethod
+    def _use_columnar(cls, statistics: HourlySeries) -> bool:
+        """Return True if statistics are large enough for the columnar path."""
+        return NUMPY_AVAILABLE and len(statistics) >= COLUMNAR_MIN_ROWS
 
-        return filtered
+    @classmethod
+    def scheduled_mask(
+        cls, columns: StatisticsColumns, statistics: HourlySeries
+    ) -> Any:
+        """Return a mask of the rows with a change within the schedule."""
+        slots = columns.slots()
+        mask = columns.change != 0.0
+        for version, first, end in cls.tariff_versions.slices(statistics):
+            mask[first:end] &= table_lookup(
+                version.tariff_schedule.filter_table, slots[first:end]
+            )
+        return mask
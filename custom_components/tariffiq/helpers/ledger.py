@@ -0,0 +1,53 @@
+"""Peak ledger of a config entry that survives restarts."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import callback
+from homeassistant.helpers.storage import Store
+
+from custom_components.tariffiq.const import DOMAIN
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from homeassistant.core import HomeAssistant
+
+LEDGER_VERSION = 1
+# Seconds a ledger change waits before it is written, later changes within
+# this window are combined into the same write
+LEDGER_SAVE_DELAY = 30
+
+
+class PeakLedger:
+    """
+    Storage of the peaks of the current billing period of a config entry.
+
+    The ledger holds the billing period, the state of the peak tracker with
+    its top peaks or per-day maxima, and the last processed hour. Writes are
+    debounced and flushed when Home Assistant stops or the entry is unloaded.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the peak ledger."""
+        self._store: Store[dict[str, Any]] = Store(
+            hass, LEDGER_VERSION, f"{DOMAIN}.{entry_id}.ledger"
+        )
+
+    async def async_load(self) -> dict[str, Any] | None:
+        """Return the saved ledger, None if there is none."""
+        return await self._store.async_load()
+
+    @callback
+    def async_save(self, data_func: Callable[[], dict[str, Any]]) -> None:
+        """Schedule a write of the data the function returns at write time."""
+        self._store.async_delay_save(data_func, LEDGER_SAVE_DELAY)
+
+    async def async_flush(self, data_func: Callable[[], dict[str, Any]]) -> None:
+        """Write the data now, replacing a scheduled write."""
+        await self._store.async_save(data_func())
+
+    async def async_remove(self) -> None:
+        """Remove the saved ledger."""
+        await self._store.async_remove()
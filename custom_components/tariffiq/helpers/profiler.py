@@ -0,0 +1,135 @@
+"""On-demand profiling of coordinator refreshes."""
+
+from __future__ import annotations
+
+import cProfile
+from contextlib import contextmanager
+from typing import TYPE_CHECKING
+
+from homeassistant.components import persistent_notification
+from homeassistant.core import callback
+from homeassistant.helpers.event import async_call_later
+
+from custom_components.tariffiq.helpers import LOGGER
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+    from datetime import datetime
+
+    from homeassistant.core import HomeAssistant
+
+PROFILE_DEFAULT_REFRESHES = 5
+PROFILE_MAX_REFRESHES = 100
+# Seconds after which a profile is written even if not all refreshes happened
+PROFILE_TIMEOUT = 2 * 60 * 60
+
+
+class RefreshProfiler:
+    """
+    cProfile capture of the next refreshes of a coordinator.
+
+    Only the work the coordinator does in the event loop is captured, the
+    profiler is disabled while a refresh awaits the recorder so other tasks
+    running in the meantime are left out. The profile is written in the
+    standard pstats format once the requested number of refreshes is done,
+    or when PROFILE_TIMEOUT has passed, whichever comes first.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        path: str,
+        refreshes: int,
+        *,
+        between_refreshes: bool,
+        on_stop: Callable[[], None],
+    ) -> None:
+        """
+        Initialize and start the profiler.
+
+        Args:
+            hass: Home Assistant instance
+            path: File the profile is written to
+            refreshes: Number of refreshes to capture
+            between_refreshes: Also capture the tariff boundary and push
+                               updates between the refreshes
+            on_stop: Called when the capture stops
+
+        """
+        self.hass = hass
+        self.path = path
+        self.refreshes = refreshes
+        self.between_refreshes = between_refreshes
+        self.captured = 0
+        self.active = True
+        self.profile = cProfile.Profile()
+        self._on_stop = on_stop
+        self._unsub_timeout: Callable[[], None] | None = async_call_later(
+            hass, PROFILE_TIMEOUT, self._async_timeout
+        )
+
+    @contextmanager
+    def capture(self) -> Iterator[None]:
+        """Profile the code run within the context."""
+        if not self.active:
+            yield
+            return
+
+        try:
+            self.profile.enable()
+        except ValueError as error:
+            # Only one profiler can run at a time, like the profiler integration
+            LOGGER.warning("Profiling of TariffIQ refreshes stopped: %s", error)
+            self.async_stop()
+            yield
+            return
+
+        try:
+            yield
+        finally:
+            self.profile.disable()
+
+    @callback
+    def async_refresh_done(self) -> None:
+        """Count a captured refresh and stop after the last one."""
+        self.captured += 1
+        if self.captured >= self.refreshes:
+            self.async_stop()
+
+    @callback
+    def _async_timeout(self, _now: datetime) -> None:
+        """Stop a capture that did not see all refreshes in time."""
+        self._unsub_timeout = None
+        LOGGER.warning(
+            "Profiling stopped after %s of %s refreshes, the time limit was reached",
+            self.captured,
+            self.refreshes,
+        )
+        self.async_stop()
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop capturing and write the profile in the background."""
+        if not self.active:
+            return
+        self.active = False
+        if self._unsub_timeout is not None:
+            self._unsub_timeout()
+            self._unsub_timeout = None
+        self._on_stop()
+        self.hass.async_create_background_task(
+            self._async_write(), "tariffiq write profile"
+        )
+
+    async def _async_write(self) -> None:
+        """Write the profile to its file."""
+        await self.hass.async_add_executor_job(self.profile.dump_stats, self.path)
+        LOGGER.info(
+            "Profile of %s TariffIQ refreshes written to %s", self.captured, self.path
+        )
+        persistent_notification.async_create(
+            self.hass,
+            f"Profile of {self.captured} refreshes written to {self.path}. "
+            "Open it with pstats or a viewer like snakeviz.",
+            title="TariffIQ profile",
+        )
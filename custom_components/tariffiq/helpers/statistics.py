@@ -2,27 +2,244 @@
 
 from __future__ import annotations
 
-from datetime import datetime, timedelta
-from typing import TYPE_CHECKING
+import asyncio
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+from typing import TYPE_CHECKING, Literal
 
 from homeassistant.components.recorder.statistics import (
     StatisticsRow,
     statistics_during_period,
 )
+from homeassistant.core import callback
+from homeassistant.helpers.event import async_call_later
 from homeassistant.helpers.recorder import get_instance
+from homeassistant.helpers.singleton import singleton
 from homeassistant.util import dt as dt_util
 
+from custom_components.tariffiq.const import DATA_STATISTICS_BROKER
+from custom_components.tariffiq.dso.helpers.hourly_series import HourlySeries
+from custom_components.tariffiq.helpers import LOGGER
+
 if TYPE_CHECKING:
+    from collections.abc import Callable
+
     from homeassistant.core import HomeAssistant
 
+# Number of already cached hours that are fetched again on every refresh, so
+# that rows the recorder has corrected after the fact are picked up.
+STATISTICS_RECONCILE_HOURS = 2
 
-class TariffIQStatisticsHelper:
-    """Helper class for retrieving sensor statistics."""
+# Seconds the broker waits for requests from other config entries before
+# querying the recorder. Coordinators set up together refresh within this window,
+# one-shot requests such as service calls are not batched and do not wait.
+# The batch is read at once when every registered entry has joined it.
+STATISTICS_BATCH_DELAY = 1.0
+
+StatisticsPeriod = Literal["5minute", "day", "hour", "week", "month"]
+
+
+@dataclass
+class _StatisticsRequest:
+    """A single statistics request waiting for the next batch."""
+
+    statistic_id: str
+    start_date: datetime | None
+    end_date: datetime | None
+    future: asyncio.Future[list[StatisticsRow]] = field(repr=False)
+
+
+class TariffIQStatisticsBroker:
+    """
+    Hass-wide batching of statistics requests from all TariffIQ entries.
+
+    Requests arriving within STATISTICS_BATCH_DELAY of each other are grouped by
+    period and statistic types, and each group is read with one multi-entity
+    statistics_during_period call covering the union of the requested windows.
+    Every requester then gets the rows of its own statistic id and window.
+    Only the periodic refreshes of the coordinators are batched, any other
+    request is read from the recorder right away.
+
+    Config entries register with the broker while loaded. Once each of them has
+    a request waiting nothing else can join the batch, so it is read without
+    waiting out the delay. With a single entry that is the case at once.
+    """
 
     def __init__(self, hass: HomeAssistant) -> None:
-        """Initialize the statistics helper."""
+        """Initialize the statistics broker."""
         self.hass = hass
         self.recorder = get_instance(hass)
+        self._pending: dict[
+            tuple[StatisticsPeriod, frozenset[str]], list[_StatisticsRequest]
+        ] = {}
+        self._unsub_flush: Callable[[], None] | None = None
+        self._clients: set[str] = set()
+        # Registered entries with a request in the pending batch
+        self._waiting: set[str] = set()
+
+    @callback
+    def async_register(self, client: str) -> Callable[[], None]:
+        """Register a config entry that batches requests, return the unregister."""
+        self._clients.add(client)
+
+        @callback
+        def _unregister() -> None:
+            self._clients.discard(client)
+            if self._pending and self._clients <= self._waiting:
+                self._schedule_flush(0)
+
+        return _unregister
+
+    @callback
+    def _schedule_flush(self, delay: float) -> None:
+        """Read the pending batch after a delay, replacing an earlier schedule."""
+        if self._unsub_flush is not None:
+            self._unsub_flush()
+        self._unsub_flush = async_call_later(self.hass, delay, self._async_flush)
+
+    async def async_fetch(  # noqa: PLR0913
+        self,
+        statistic_id: str,
+        start_date: datetime | None,
+        end_date: datetime | None,
+        period: StatisticsPeriod,
+        types: set[str],
+        *,
+        client: str | None = None,
+    ) -> list[StatisticsRow]:
+        """
+        Fetch the rows of a statistic id.
+
+        Args:
+            statistic_id: Statistic id to fetch
+            start_date: Start of the window, None for the first row
+            end_date: End of the window, None for now
+            period: Statistics period
+            types: Statistic types to fetch
+            client: Config entry to queue the request for the next batch for,
+                    None to read it right away
+
+        """
+        future: asyncio.Future[list[StatisticsRow]] = self.hass.loop.create_future()
+        request = _StatisticsRequest(statistic_id, start_date, end_date, future)
+        if client is None:
+            await self._async_fetch_group(period, frozenset(types), [request])
+            return await future
+
+        self._pending.setdefault((period, frozenset(types)), []).append(request)
+        self._waiting.add(client)
+
+        if self._clients <= self._waiting:
+            # Every entry is waiting, requests queued in the same loop
+            # iteration still join before the batch is read
+            self._schedule_flush(0)
+        elif self._unsub_flush is None:
+            self._schedule_flush(STATISTICS_BATCH_DELAY)
+
+        return await future
+
+    async def _async_flush(self, _now: datetime) -> None:
+        """Run one recorder query per pending period and types pair."""
+        self._unsub_flush = None
+        pending, self._pending = self._pending, {}
+        self._waiting = set()
+
+        await asyncio.gather(
+            *(
+                self._async_fetch_group(period, types, requests)
+                for (period, types), requests in pending.items()
+            )
+        )
+
+    async def _async_fetch_group(
+        self,
+        period: StatisticsPeriod,
+        types: frozenset[str],
+        requests: list[_StatisticsRequest],
+    ) -> None:
+        """Fetch the union window of a group and hand out the slices."""
+        starts = [r.start_date for r in requests if r.start_date is not None]
+        ends = [r.end_date for r in requests if r.end_date is not None]
+        start_date = min(starts) if len(starts) == len(requests) else None
+        end_date = max(ends) if len(ends) == len(requests) else None
+        statistic_ids = {request.statistic_id for request in requests}
+
+        try:
+            result = await self.recorder.async_add_executor_job(
+                statistics_during_period,
+                self.hass,
+                start_date,
+                end_date,
+                statistic_ids,
+                period,
+                None,
+                set(types),
+            )
+        except Exception as error:  # noqa: BLE001
+            for request in requests:
+                if not request.future.done():
+                    request.future.set_exception(error)
+            return
+
+        LOGGER.debug(
+            "Fetched %s statistics for %d entities in one query for %d requests",
+            period,
+            len(statistic_ids),
+            len(requests),
+        )
+
+        for request in requests:
+            if not request.future.done():
+                request.future.set_result(
+                    _slice_rows(
+                        result.get(request.statistic_id, []),
+                        request.start_date,
+                        request.end_date,
+                    )
+                )
+
+
+def _slice_rows(
+    rows: list[StatisticsRow],
+    start_date: datetime | None,
+    end_date: datetime | None,
+) -> list[StatisticsRow]:
+    """Return the rows starting within [start_date, end_date)."""
+    first = (
+        0
+        if start_date is None
+        else bisect_left(rows, start_date.timestamp(), key=lambda row: row["start"])
+    )
+    last = (
+        len(rows)
+        if end_date is None
+        else bisect_left(rows, end_date.timestamp(), key=lambda row: row["start"])
+    )
+    return rows[first:last]
+
+
+@singleton(DATA_STATISTICS_BROKER)
+def get_statistics_broker(hass: HomeAssistant) -> TariffIQStatisticsBroker:
+    """Return the statistics broker shared by all TariffIQ entries."""
+    return TariffIQStatisticsBroker(hass)
+
+
+class TariffIQStatisticsHelper:
+    """Helper class for retrieving sensor statistics."""
+
+    def __init__(self, hass: HomeAssistant, client: str | None = None) -> None:
+        """
+        Initialize the statistics helper.
+
+        Args:
+            hass: Home Assistant instance
+            client: Config entry batched requests are queued for
+
+        """
+        self.hass = hass
+        self.client = client
+        self.broker = get_statistics_broker(hass)
 
     async def get_hourly_stats(
         self,
@@ -30,23 +247,54 @@ class TariffIQStatisticsHelper:
         start_date: datetime | None = None,
         end_date: datetime | None = None,
         types: set[str] | None = None,
+        *,
+        batch: bool = False,
+    ) -> HourlySeries:
+        """
+        Fetch hourly statistics for any sensor as a compact series.
+
+        With batch the request waits for those of other config entries and
+        is read together with them, see TariffIQStatisticsBroker.
+        """
+        if types is None:
+            types = {"change"}
+
+        rows = await self.broker.async_fetch(
+            entity_id,
+            start_date,
+            end_date,
+            "hour",
+            types,
+            client=self.client if batch else None,
+        )
+        return HourlySeries.from_rows(rows)
+
+    async def get_short_term_stats(
+        self,
+        entity_id: str,
+        start_date: datetime | None = None,
+        end_date: datetime | None = None,
+        types: set[str] | None = None,
+        *,
+        batch: bool = False,
     ) -> list[StatisticsRow]:
-        """Fetch hourly statistics for any sensor."""
+        """
+        Fetch 5-minute statistics for any sensor.
+
+        The recorder keeps these for about ten days, older rows are only
+        available as hourly statistics.
+        """
         if types is None:
             types = {"change"}
 
-        return (
-            await self.recorder.async_add_executor_job(
-                statistics_during_period,
-                self.hass,
-                start_date,
-                end_date,
-                {entity_id},
-                "hour",
-                None,
-                types,
-            )
-        ).get(entity_id, [])
+        return await self.broker.async_fetch(
+            entity_id,
+            start_date,
+            end_date,
+            "5minute",
+            types,
+            client=self.client if batch else None,
+        )
 
     async def get_latest(self, entity_id: str, type: str | None = None) -> float:  # noqa: A002
         """Fetch statistics specifically for last change calculations."""
@@ -58,16 +306,57 @@ class TariffIQStatisticsHelper:
         )
 
         if len(stats) > 0:
-            return stats.pop().get(type, 0.0) or 0.0
+            return stats[-1].get(type, 0.0) or 0.0
 
         return 0.0
 
+    async def get_hourly_stats_and_latest(
+        self,
+        entity_id: str,
+        series_start: datetime,
+        fetch_start: datetime | None = None,
+        end_date: datetime | None = None,
+        *,
+        batch: bool = False,
+    ) -> tuple[HourlySeries, StatisticsRow | None]:
+        """
+        Fetch change and state statistics in a single recorder round-trip.
+
+        Args:
+            entity_id: Statistic id to fetch
+            series_start: Start of the returned series
+            fetch_start: Start of the recorder query, defaults to one day before
+                         series_start so a latest reading is found at the very
+                         beginning of the series
+            end_date: End of the recorder query, None for now
+            batch: Read the request together with those of other entries
+
+        Returns:
+            The rows since series_start and the latest row, which may be older
+            than series_start
+
+        """
+        if fetch_start is None:
+            fetch_start = series_start - timedelta(days=1)
+
+        stats = await self.get_hourly_stats(
+            entity_id,
+            fetch_start,
+            end_date,
+            {"change", "state"},
+            batch=batch,
+        )
+        if not stats:
+            return stats, None
+
+        return stats.between(series_start.timestamp(), None), stats[-1]
+
     async def get_peak_stats(
         self,
         entity_id: str,
         start_date: datetime | None = None,
         end_date: datetime | None = None,
-    ) -> list[StatisticsRow]:
+    ) -> HourlySeries:
         """Fetch statistics specifically for peak calculations."""
         return await self.get_hourly_stats(
             entity_id, start_date, end_date, {"max", "mean"}
@@ -78,8 +367,165 @@ class TariffIQStatisticsHelper:
         entity_id: str,
         start_date: datetime | None = None,
         end_date: datetime | None = None,
-    ) -> list[StatisticsRow]:
+    ) -> HourlySeries:
         """Fetch statistics for consumption sensors."""
         return await self.get_hourly_stats(
             entity_id, start_date, end_date, {"sum", "change"}
         )
+
+
+class TariffIQStatisticsCache:
+    """
+    Incremental cache of closed hourly statistics for the current month.
+
+    The first fetch of a month reads every hour since the 1st, after that only
+    hours from the last cached rows and onwards are requested from the
+    recorder. The cache is dropped when the month rolls over. Each fetch also
+    returns the meter state of the latest closed hour. The rows are held as a
+    HourlySeries, a merge replaces the series rather than changing it.
+
+    A cache resumed after a restart only holds the hours of the reconcile
+    window saved before it and those since, the earlier ones were processed
+    before the restart. If the recorder corrects one of the resumed rows the
+    whole month is read again.
+    """
+
+    def __init__(
+        self,
+        statistics_helper: TariffIQStatisticsHelper,
+        entity_id: str,
+    ) -> None:
+        """Initialize the statistics cache."""
+        self.statistics_helper = statistics_helper
+        self.entity_id = entity_id
+        self.month_start: datetime | None = None
+        self.rows = HourlySeries.empty()
+        self.latest_state: float | None = None
+        self.latest_start: float | None = None
+        # Incremented whenever cached rows are dropped or replaced
+        self.generation = 0
+        # Rows the latest fetch read from the recorder
+        self.fetched_rows = 0
+        # Start of the rows of a resumed month, None when they start at the 1st
+        self.resumed_start: datetime | None = None
+
+    def clear(self) -> None:
+        """Drop all cached rows."""
+        self.generation += 1
+        self.month_start = None
+        self.rows = HourlySeries.empty()
+        self.latest_state = None
+        self.latest_start = None
+        self.resumed_start = None
+
+    def reconcile_rows(self) -> list[list[float | None]]:
+        """Return the rows of the reconcile window as [start, change, state]."""
+        return [
+            [row["start"], row["change"], row["state"]]
+            for row in self.rows[-STATISTICS_RECONCILE_HOURS:]
+        ]
+
+    def resume(
+        self,
+        month_start: datetime,
+        last_start: float,
+        latest_state: float | None,
+        reconcile_rows: list[list[float | None]] | None = None,
+    ) -> None:
+        """
+        Continue a month whose rows were processed until a restart.
+
+        Args:
+            month_start: Start of the month the rows belong to
+            last_start: Start of the last processed hour
+            latest_state: Meter state at the end of the last processed hour
+            reconcile_rows: Rows returned by reconcile_rows before the restart,
+                            compared with the recorder to detect corrections
+
+        """
+        self.clear()
+        self.month_start = month_start
+        self.latest_start = last_start
+        self.latest_state = latest_state
+        self.resumed_start = datetime.fromtimestamp(last_start, UTC) - timedelta(
+            hours=STATISTICS_RECONCILE_HOURS - 1
+        )
+        if reconcile_rows:
+            self.rows = HourlySeries.from_rows(
+                [
+                    {"start": start, "change": change, "state": state}
+                    for start, change, state in reconcile_rows
+                    if start <= last_start
+                ]
+            )
+
+    def _fetch_start(self) -> datetime | None:
+        """Return the start of the window that has to be read from the recorder."""
+        if not self.rows:
+            return self.resumed_start
+
+        reconcile_start = self.rows.start[
+            -min(len(self.rows), STATISTICS_RECONCILE_HOURS)
+        ]
+        return datetime.fromtimestamp(reconcile_start, UTC)
+
+    def _merge(self, fetch_start: datetime, fetched: HourlySeries) -> None:
+        """Merge freshly fetched rows into the cache."""
+        if not fetched:
+            return
+
+        keep = self.rows.index_at(fetch_start.timestamp())
+
+        replaced = {row["start"]: row for row in self.rows[keep:]}
+        for row in fetched:
+            cached = replaced.get(row["start"])
+            if cached is not None and cached != row:
+                self.generation += 1
+                LOGGER.debug(
+                    "Recorder corrected statistics for %s at %s: %s -> %s",
+                    self.entity_id,
+                    datetime.fromtimestamp(row["start"], UTC),
+                    cached,
+                    row,
+                )
+
+        self.rows = HourlySeries.concat([self.rows[:keep], fetched])
+
+    async def async_get_month(self, now: datetime | None = None) -> HourlySeries:
+        """
+        Return all closed hourly rows since the start of the current month.
+
+        The returned series is immutable and stays valid after later fetches.
+        """
+        if now is None:
+            now = dt_util.now()
+
+        month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        if month_start != self.month_start:
+            self.clear()
+            self.month_start = month_start
+
+        generation = self.generation
+        fetch_start = self._fetch_start()
+        helper = self.statistics_helper
+        fetched, latest = await helper.get_hourly_stats_and_latest(
+            self.entity_id, month_start, fetch_start, batch=True
+        )
+        self.fetched_rows = len(fetched)
+        self._merge(fetch_start or month_start, fetched)
+
+        if self.resumed_start is not None and generation != self.generation:
+            # Rows were replaced, rebuilding needs the hours before the restart
+            LOGGER.debug("Reading the whole month of %s again", self.entity_id)
+            self.clear()
+            self.month_start = month_start
+            fetched, latest = await helper.get_hourly_stats_and_latest(
+                self.entity_id, month_start
+            )
+            self.fetched_rows += len(fetched)
+            self._merge(month_start, fetched)
+        if latest is not None:
+            self.latest_start = latest["start"]
+            self.latest_state = latest.get("state")
+
+        return self.rows
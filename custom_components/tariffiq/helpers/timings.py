@@ -0,0 +1,145 @@
+"""Timing instrumentation of coordinator refreshes."""
+
+from __future__ import annotations
+
+import math
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+    from contextlib import AbstractContextManager
+
+# Number of refreshes the rolling percentiles are calculated over
+TIMINGS_WINDOW = 100
+PERCENTILES = (50, 90, 99)
+
+# Stages of a refresh
+STAGE_SENSOR_READ = "sensor_read"
+STAGE_RECORDER_FETCH = "recorder_fetch"
+STAGE_MODEL = "model"
+STAGE_COST = "cost"
+# Writing the entity states after the data changed
+STAGE_ENTITY_UPDATE = "entity_update"
+# Whole refresh, and the part of it that ran in the event loop
+STAGE_TOTAL = "total"
+STAGE_LOOP_BLOCKED = "loop_blocked"
+
+
+def percentile(sorted_values: list[float], percent: float) -> float:
+    """Return the nearest-rank percentile of sorted values."""
+    rank = math.ceil(percent / 100 * len(sorted_values))
+    return sorted_values[max(rank, 1) - 1]
+
+
+@dataclass
+class RefreshTimer:
+    """
+    Stage timings of a single refresh.
+
+    Stages run in the event loop unless they are marked as awaited, the time
+    spent in awaited stages waits on the recorder and does not block the loop.
+    With a capture, the stages that run in the event loop are also profiled.
+    """
+
+    capture: Callable[[], AbstractContextManager[None]] | None = None
+    started: float = field(default_factory=perf_counter)
+    stages: dict[str, float] = field(default_factory=dict)
+    rows: dict[str, int] = field(default_factory=dict)
+    awaited: float = 0.0
+
+    @contextmanager
+    def stage(self, name: str, *, awaited: bool = False) -> Iterator[None]:
+        """Time a stage, adding to it if it runs more than once."""
+        start = perf_counter()
+        try:
+            if self.capture is not None and not awaited:
+                with self.capture():
+                    yield
+            else:
+                yield
+        finally:
+            elapsed = perf_counter() - start
+            self.stages[name] = self.stages.get(name, 0.0) + elapsed
+            if awaited:
+                self.awaited += elapsed
+
+    def add_rows(self, name: str, rows: int) -> None:
+        """Count rows a stage read from the recorder."""
+        self.rows[name] = self.rows.get(name, 0) + rows
+
+    def finish(self) -> None:
+        """Add the total and event loop blocking time of the refresh."""
+        total = perf_counter() - self.started
+        self.stages[STAGE_TOTAL] = total
+        self.stages[STAGE_LOOP_BLOCKED] = max(total - self.awaited, 0.0)
+
+
+class RefreshTimings:
+    """Rolling stage timings of the latest refreshes of a coordinator."""
+
+    def __init__(self, window: int = TIMINGS_WINDOW) -> None:
+        """Initialize the rolling timings."""
+        self.window = window
+        self.refreshes = 0
+        self.failures = 0
+        self._samples: dict[str, deque[float]] = {}
+        self._rows: dict[str, deque[int]] = {}
+        self._last_samples: dict[str, float] = {}
+
+    def start(
+        self, capture: Callable[[], AbstractContextManager[None]] | None = None
+    ) -> RefreshTimer:
+        """Return a timer for a new refresh, optionally profiling its stages."""
+        return RefreshTimer(capture)
+
+    def record(self, timer: RefreshTimer, *, success: bool = True) -> None:
+        """Add the timings of a finished refresh."""
+        timer.finish()
+        self.refreshes += 1
+        if not success:
+            self.failures += 1
+
+        for name, elapsed in timer.stages.items():
+            self.add_sample(name, elapsed)
+        for name, rows in timer.rows.items():
+            self._rows.setdefault(name, deque(maxlen=self.window)).append(rows)
+
+    def add_sample(self, stage: str, elapsed: float) -> None:
+        """Add the time of a stage that runs outside of the refresh timer."""
+        self._samples.setdefault(stage, deque(maxlen=self.window)).append(elapsed)
+        self._last_samples[stage] = elapsed
+
+    def last_ms(self, stage: str) -> float | None:
+        """Return the time of a stage in the latest refresh in milliseconds."""
+        if stage not in self._last_samples:
+            return None
+        return round(self._last_samples[stage] * 1000, 3)
+
+    def stage_summary(self, stage: str) -> dict[str, Any]:
+        """Return the latest time and rolling percentiles of a stage."""
+        samples = sorted(self._samples.get(stage, ()))
+        if not samples:
+            return {}
+
+        summary: dict[str, Any] = {"last_ms": self.last_ms(stage)}
+        for percent in PERCENTILES:
+            summary[f"p{percent}_ms"] = round(percentile(samples, percent) * 1000, 3)
+        summary["max_ms"] = round(samples[-1] * 1000, 3)
+
+        if rows := self._rows.get(stage):
+            summary["last_rows"] = rows[-1]
+            summary["max_rows"] = max(rows)
+        return summary
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return all stage summaries."""
+        return {
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+            "window": min(self.refreshes, self.window),
+            "stages": {stage: self.stage_summary(stage) for stage in self._samples},
+        }
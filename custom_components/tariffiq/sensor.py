@@ -12,9 +12,13 @@ from custom_components.tariffiq.sensors.peaks_sensor import TariffIQPeaksSensor
 from custom_components.tariffiq.sensors.predicted_consumption_sensor import (
     TariffIQPredictedConsumptionSensor,
 )
+from custom_components.tariffiq.sensors.refresh_timing_sensor import (
+    TariffIQRefreshTimingSensor,
+)
 
-from .const import DOMAIN
+from .const import CONF_TIMING_SENSORS, DOMAIN
 from .coordinator import TariffIQDataCoordinator  # noqa: TC001
+from .helpers.timings import STAGE_LOOP_BLOCKED, STAGE_TOTAL
 from .sensors.sensorbase import SensorBase  # noqa: TC001
 
 if TYPE_CHECKING:
@@ -30,6 +34,11 @@ cost_sensors = [
     ("Costs Total DSO", "total_dso_cost"),
 ]
 
+timing_sensors = [
+    ("Refresh Duration", STAGE_TOTAL),
+    ("Refresh Loop Blocked", STAGE_LOOP_BLOCKED),
+]
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -49,4 +58,11 @@ async def async_setup_entry(
     for name, coordinator_key in cost_sensors:
         entities.append(TariffIQCostSensor(config, coordinator, name, coordinator_key))
 
+    # Diagnostic timing sensors, only when enabled in the options
+    if config.options.get(CONF_TIMING_SENSORS, False):
+        for name, stage in timing_sensors:
+            entities.append(
+                TariffIQRefreshTimingSensor(config, coordinator, name, stage)
+            )
+
     async_add_entities(entities)
@@ -27,6 +27,8 @@ class TariffIQCalculatedPeakSensor(SensorBase, RestoreEntity):
     suggested_display_precision: int = 2
     icon: str = "mdi:chart-line"
 
+    _coordinator_keys = frozenset({"calculated_peak"})
+
     def __init__(
         self,
         entry: ConfigEntry,
@@ -34,6 +36,7 @@ class TariffIQCalculatedPeakSensor(SensorBase, RestoreEntity):
     ) -> None:
         """Initialize the predicted consumption sensor."""
         super().__init__(entry, coordinator, "Calculated Peak")
+        self._publish_peaks_as_power()
 
     @property
     def state(self) -> float:
@@ -36,6 +36,7 @@ class TariffIQCostSensor(SensorBase):
     ) -> None:
         """Initialize the cost sensor."""
         self._coordinator_key = coordinator_key
+        self._coordinator_keys = frozenset({coordinator_key, "currency"})
 
         super().__init__(entry, coordinator, name)
 
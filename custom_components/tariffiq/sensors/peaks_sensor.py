@@ -8,7 +8,6 @@ from homeassistant.components.sensor import SensorDeviceClass, SensorStateClass
 from homeassistant.const import (
     UnitOfEnergy,
 )
-from homeassistant.helpers.restore_state import RestoreEntity
 
 from custom_components.tariffiq.sensors.sensorbase import SensorBase
 
@@ -18,7 +17,7 @@ if TYPE_CHECKING:
     from custom_components.tariffiq.coordinator import TariffIQDataCoordinator
 
 
-class TariffIQPeaksSensor(SensorBase, RestoreEntity):
+class TariffIQPeaksSensor(SensorBase):
     """TariffIQ Peaks Sensor class."""
 
     device_class: SensorDeviceClass = SensorDeviceClass.ENERGY
@@ -27,6 +26,8 @@ class TariffIQPeaksSensor(SensorBase, RestoreEntity):
     suggested_display_precision: int = 1
     icon: str = "mdi:chart-line"
 
+    _coordinator_keys = frozenset({"peaks", "peaks_dictionary"})
+
     def __init__(
         self,
         entry: ConfigEntry,
@@ -34,6 +35,7 @@ class TariffIQPeaksSensor(SensorBase, RestoreEntity):
     ) -> None:
         """Initialize the peak sensor."""
         super().__init__(entry, coordinator, "Peaks")
+        self._publish_peaks_as_power()
 
     @property
     def extra_state_attributes(self) -> dict:
@@ -56,6 +58,3 @@ class TariffIQPeaksSensor(SensorBase, RestoreEntity):
         return (
             self.coordinator.last_update_success and self.coordinator.data is not None
         )
-
-    async def async_update(self) -> None:
-        """Update the peak sensor state."""
@@ -27,6 +27,10 @@ class TariffIQPredictedConsumptionSensor(SensorBase, RestoreEntity):
     suggested_display_precision: int = 1
     icon: str = "mdi:chart-line"
 
+    _coordinator_keys = frozenset(
+        {"predicted_consumption", "current_hour_consumption_formatted"}
+    )
+
     def __init__(
         self,
         entry: ConfigEntry,
@@ -34,6 +38,7 @@ class TariffIQPredictedConsumptionSensor(SensorBase, RestoreEntity):
     ) -> None:
         """Initialize the predicted consumption sensor."""
         super().__init__(entry, coordinator, "Predicted Consumption")
+        self._publish_peaks_as_power()
 
     @property
     def extra_state_attributes(self) -> dict:
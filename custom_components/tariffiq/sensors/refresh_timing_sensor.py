@@ -0,0 +1,58 @@
+"""TariffIQ Refresh Timing Sensor integration."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.components.sensor import SensorDeviceClass, SensorStateClass
+from homeassistant.const import EntityCategory, UnitOfTime
+
+from custom_components.tariffiq.sensors.sensorbase import SensorBase
+
+if TYPE_CHECKING:
+    from homeassistant.config_entries import ConfigEntry
+
+    from custom_components.tariffiq.coordinator import TariffIQDataCoordinator
+
+
+class TariffIQRefreshTimingSensor(SensorBase):
+    """TariffIQ Refresh Timing Sensor class."""
+
+    device_class: SensorDeviceClass = SensorDeviceClass.DURATION
+    state_class: SensorStateClass = SensorStateClass.MEASUREMENT
+    native_unit_of_measurement: str = UnitOfTime.MILLISECONDS
+    suggested_display_precision: int = 1
+    icon: str = "mdi:timer-outline"
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    _stage: str
+
+    def __init__(
+        self,
+        entry: ConfigEntry,
+        coordinator: TariffIQDataCoordinator,
+        name: str,
+        stage: str,
+    ) -> None:
+        """Initialize the refresh timing sensor."""
+        self._stage = stage
+
+        super().__init__(entry, coordinator, name)
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the time of the stage in the latest refresh."""
+        return self.coordinator.timings.last_ms(self._stage)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the rolling percentiles of the stage."""
+        summary = self.coordinator.timings.stage_summary(self._stage)
+        summary.pop("last_ms", None)
+        return summary
+
+    @property
+    def available(self) -> bool:
+        """Return if entity is available."""
+        return self.native_value is not None
@@ -11,8 +11,11 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 
 from homeassistant.components.sensor import (
+    SensorDeviceClass,
     SensorEntity,
 )
+from homeassistant.const import UnitOfPower
+from homeassistant.core import callback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from custom_components.tariffiq.const import (
@@ -36,6 +39,8 @@ class SensorBase(SensorEntity, CoordinatorEntity[TariffIQDataCoordinator]):
 
     _entry: ConfigEntry
     _entry_id: str
+    # Coordinator data keys the entity shows, None to write on every update
+    _coordinator_keys: frozenset[str] | None = None
 
     def __init__(
         self,
@@ -49,6 +54,12 @@ class SensorBase(SensorEntity, CoordinatorEntity[TariffIQDataCoordinator]):
 
         super().__init__(coordinator)
 
+    def _publish_peaks_as_power(self) -> None:
+        """Publish peak values in kW for DSOs whose peaks are average power."""
+        if self.dso_instance.peaks_as_power():
+            self.device_class = SensorDeviceClass.POWER
+            self.native_unit_of_measurement = UnitOfPower.KILO_WATT
+
     @property
     def dso_instance(self) -> DSOBase:
         """Return the DSO instance from coordinator."""
@@ -71,6 +82,12 @@ class SensorBase(SensorEntity, CoordinatorEntity[TariffIQDataCoordinator]):
             ),
         }
 
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state only if the data the entity shows changed."""
+        if self.coordinator.data_changed(self._coordinator_keys):
+            super()._handle_coordinator_update()
+
     @property
     def available(self) -> bool:
         """Return if entity is available."""
@@ -2,9 +2,230 @@
 
 from __future__ import annotations
 
-from homeassistant.core import HomeAssistant, callback
+import asyncio
+from datetime import date, datetime, time
+from typing import TYPE_CHECKING
+
+import voluptuous as vol
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    ATTR_BETWEEN_REFRESHES,
+    ATTR_CONFIG_ENTRY_ID,
+    ATTR_END,
+    ATTR_REFRESHES,
+    ATTR_START,
+    DOMAIN,
+    SERVICE_BACKTEST,
+    SERVICE_COMPARE,
+    SERVICE_PROFILE,
+)
+from .dso import (
+    async_get_dso_index,
+    async_load_dso_class,
+    get_available_dsos,
+    get_dso_fuse_sizes,
+)
+from .dso.backtest import (
+    BacktestSeries,
+    backtest,
+    backtest_series,
+    chunk_statistics,
+    summarize,
+)
+from .helpers.profiler import PROFILE_DEFAULT_REFRESHES, PROFILE_MAX_REFRESHES
+
+if TYPE_CHECKING:
+    from .coordinator import TariffIQDataCoordinator
+
+PERIOD_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_START): cv.date,
+        vol.Optional(ATTR_END): cv.date,
+    }
+)
+
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_REFRESHES, default=PROFILE_DEFAULT_REFRESHES): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=PROFILE_MAX_REFRESHES)
+        ),
+        vol.Optional(ATTR_BETWEEN_REFRESHES, default=False): cv.boolean,
+    }
+)
+
+
+def _get_coordinator(hass: HomeAssistant, call: ServiceCall) -> TariffIQDataCoordinator:
+    """Return the coordinator of the config entry a service call targets."""
+    entry_id = call.data[ATTR_CONFIG_ENTRY_ID]
+    coordinator = hass.data.get(DOMAIN, {}).get(entry_id)
+    if coordinator is None:
+        msg = f"No loaded TariffIQ config entry with id {entry_id}"
+        raise ServiceValidationError(msg)
+    return coordinator
+
+
+def _local_midnight(day: date) -> datetime:
+    """Return local midnight of a date in the Home Assistant timezone."""
+    return datetime.combine(day, time(), dt_util.DEFAULT_TIME_ZONE)
+
+
+def _get_period(call: ServiceCall) -> tuple[datetime, datetime]:
+    """Return the period of a service call, default the last year until now."""
+    now = dt_util.now()
+    start_date = (
+        _local_midnight(call.data[ATTR_START])
+        if ATTR_START in call.data
+        else now.replace(
+            year=now.year - 1, day=1, hour=0, minute=0, second=0, microsecond=0
+        )
+    )
+    end_date = _local_midnight(call.data[ATTR_END]) if ATTR_END in call.data else now
+    if start_date >= end_date:
+        msg = "The start date must be before the end date"
+        raise ServiceValidationError(msg)
+    return start_date, end_date
+
+
+async def _async_backtest(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    """Price the history of the energy sensor month by month."""
+    coordinator = _get_coordinator(hass, call)
+    start_date, end_date = _get_period(call)
+
+    statistics = await coordinator.async_get_energy_statistics(start_date, end_date)
+
+    # Price a year at a time so a long history does not hold one executor job
+    dso = coordinator.dso_instance
+    bills = []
+    for chunk in chunk_statistics(statistics):
+        bills.extend(await hass.async_add_executor_job(backtest, dso, chunk))
+
+    return {
+        "dso": dso.name,
+        "fuse_size": dso.fuse_size,
+        "currency": dso.currency,
+        "start": start_date.isoformat(),
+        "end": end_date.isoformat(),
+        "total_cost": sum(bill.total_cost for bill in bills),
+        "months": [bill.as_dict() for bill in bills],
+    }
+
+
+async def _async_compare(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    """Price the history of the energy sensor with every DSO and fuse size."""
+    coordinator = _get_coordinator(hass, call)
+    start_date, end_date = _get_period(call)
+
+    statistics = await coordinator.async_get_energy_statistics(start_date, end_date)
+
+    await async_get_dso_index(hass)
+    dso_names = get_available_dsos()
+    dso_classes = await asyncio.gather(
+        *(async_load_dso_class(hass, dso_name) for dso_name in dso_names)
+    )
+    candidates = [
+        dso_class(fuse_size)
+        for dso_name, dso_class in zip(dso_names, dso_classes, strict=True)
+        if dso_class is not None
+        for fuse_size in get_dso_fuse_sizes(dso_name)
+    ]
+
+    # Month split, sums and calendar fields are computed once for all DSOs,
+    # the DSOs are then priced in parallel on the executor
+    series = await hass.async_add_executor_job(BacktestSeries, statistics)
+    results = await asyncio.gather(
+        *(
+            hass.async_add_executor_job(backtest_series, dso, series)
+            for dso in candidates
+        )
+    )
+
+    current = coordinator.dso_instance
+    ranking = sorted(
+        (
+            {
+                "dso": dso.name,
+                "fuse_size": dso.fuse_size,
+                "currency": dso.currency,
+                "current": dso.name == current.name
+                and dso.fuse_size == current.fuse_size,
+                **summarize(bills),
+            }
+            for dso, bills in zip(candidates, results, strict=True)
+        ),
+        key=lambda result: result["total_cost"],
+    )
+
+    return {
+        "start": start_date.isoformat(),
+        "end": end_date.isoformat(),
+        "months": len(series.months),
+        "results": [
+            {"rank": rank, **result} for rank, result in enumerate(ranking, start=1)
+        ],
+    }
+
+
+async def _async_profile(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    """Profile the next refreshes of an entry."""
+    coordinator = _get_coordinator(hass, call)
+
+    # cProfile allows one active profiler at a time
+    if any(other.profiler is not None for other in hass.data.get(DOMAIN, {}).values()):
+        msg = "A TariffIQ profile is already being captured"
+        raise ServiceValidationError(msg)
+
+    path = coordinator.async_start_profiler(
+        call.data[ATTR_REFRESHES],
+        between_refreshes=call.data[ATTR_BETWEEN_REFRESHES],
+    )
+    return {"path": path, "refreshes": call.data[ATTR_REFRESHES]}
 
 
 @callback
 def async_setup_services(hass: HomeAssistant) -> None:
     """Set up services for the TariffIQ component."""
+
+    async def async_backtest(call: ServiceCall) -> ServiceResponse:
+        return await _async_backtest(hass, call)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_BACKTEST,
+        async_backtest,
+        schema=PERIOD_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    async def async_compare(call: ServiceCall) -> ServiceResponse:
+        return await _async_compare(hass, call)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_COMPARE,
+        async_compare,
+        schema=PERIOD_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    async def async_profile(call: ServiceCall) -> ServiceResponse:
+        return await _async_profile(hass, call)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROFILE,
+        async_profile,
+        schema=PROFILE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )